@@ -96,4 +96,28 @@ class ReleaseOnRemissionAdmin(admin.ModelAdmin):
     list_display = ('prisoner', 'release_date', 'original_sentence', 'remission_months', 'reduction_months')
     list_filter = ('release_date',)
     search_fields = ('prisoner__prisoner_number', 'prisoner__first_name', 'prisoner__surname')
-    readonly_fields = ('processed_date',)
\ No newline at end of file
+    readonly_fields = ('processed_date',)
+
+
+@admin.register(StationPopulationSnapshot)
+class StationPopulationSnapshotAdmin(admin.ModelAdmin):
+    list_display = ('station', 'date', 'total', 'convicted', 'remand', 'capacity', 'occupancy_rate')
+    list_filter = ('station', 'date')
+    date_hierarchy = 'date'
+
+
+@admin.register(StationCounters)
+class StationCountersAdmin(admin.ModelAdmin):
+    list_display = ('station', 'total', 'convicted', 'remand', 'male', 'female', 'foreigners', 'updated_at')
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'progress', 'requested_by', 'attempts', 'created_at', 'finished_at')
+    list_filter = ('kind', 'status')
+    readonly_fields = ('created_at', 'started_at', 'finished_at')
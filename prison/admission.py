@@ -0,0 +1,85 @@
+from .counters import tracking_station_counters
+from .forms import (
+    ConvictedPrisonerForm, PhysicalCharacteristicsForm, PrisonerForm, PrisonerParticularsForm,
+    RehabilitationProgramForm, RemandPrisonerForm, RiskAssessmentForm,
+)
+from .models import ActivityLog
+
+# Form prefix -> form class for the records created with each prisoner class
+ADMISSION_FORMS = {
+    'convicted': {
+        'convicted': ConvictedPrisonerForm,
+        'particulars': PrisonerParticularsForm,
+        'physical': PhysicalCharacteristicsForm,
+        'risk': RiskAssessmentForm,
+        'rehab': RehabilitationProgramForm,
+    },
+    'remand': {
+        'remand': RemandPrisonerForm,
+        'particulars': PrisonerParticularsForm,
+        'physical': PhysicalCharacteristicsForm,
+    },
+}
+ADMISSION_SECTIONS = ['prisoner', 'convicted', 'remand', 'particulars', 'physical', 'risk', 'rehab']
+
+
+def flatten_admission(payload):
+    """Turn {"prisoner": {...}, "particulars": {...}, ...} into prefixed form data."""
+    return {
+        f'{section}-{field}': value
+        for section, values in payload.items() if section in ADMISSION_SECTIONS and isinstance(values, dict)
+        for field, value in values.items()
+    }
+
+
+class Admission:
+    """
+    The prisoner form and every detail form for one admission, bound and
+    validated together. With no data, all sections are unbound so the page
+    can show both the convicted and remand forms.
+    """
+
+    def __init__(self, data=None, files=None, user=None):
+        self.user = user
+        self.prisoner_form = PrisonerForm(data, files, user=user, prefix='prisoner')
+        prisoner_class = (data or {}).get('prisoner-prisoner_class')
+        sections = ADMISSION_FORMS.get(prisoner_class) if data is not None else None
+        if sections is None:
+            sections = {**ADMISSION_FORMS['convicted'], **ADMISSION_FORMS['remand']}
+        self.detail_forms = {prefix: form_class(data, prefix=prefix) for prefix, form_class in sections.items()}
+
+    def __getitem__(self, prefix):
+        return self.detail_forms[prefix]
+
+    def is_valid(self):
+        # Validate every form so each one carries its own errors
+        results = [self.prisoner_form.is_valid()] + [form.is_valid() for form in self.detail_forms.values()]
+        return all(results) and self.prisoner_form.cleaned_data['prisoner_class'] in ADMISSION_FORMS
+
+    @property
+    def errors(self):
+        errors = {}
+        for prefix, form in [('prisoner', self.prisoner_form), *self.detail_forms.items()]:
+            if form.errors:
+                errors[prefix] = form.errors.get_json_data()
+        return errors
+
+    def save(self):
+        """Create the prisoner, its detail records and the ActivityLog entry in one transaction."""
+        prisoner = self.prisoner_form.save(commit=False)
+        prisoner.created_by = self.user
+        with tracking_station_counters(prisoner):
+            prisoner.save()
+            for form in self.detail_forms.values():
+                record = form.save(commit=False)
+                record.prisoner = prisoner
+                record.save()
+
+            ActivityLog.objects.create(
+                user=self.user,
+                action='create',
+                model='Prisoner',
+                object_id=prisoner.id,
+                details=f'Admitted {prisoner.get_prisoner_class_display().lower()} prisoner {prisoner.prisoner_number}'
+            )
+        return prisoner
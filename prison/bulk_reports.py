@@ -0,0 +1,121 @@
+import os
+import shutil
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import closing
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import connections
+from django.db.models import Q
+
+from .dossier import load_dossier
+from .models import Prisoner, PrisonStation
+from .reports import ReportError, prisoner_report_path
+
+COPY_CHUNK = 64 * 1024
+
+
+def find_station(identifier):
+    """The station whose id, code or name (case-insensitive) is `identifier`, or None."""
+    identifier = str(identifier)
+    lookup = Q(code__iexact=identifier) | Q(name__iexact=identifier)
+    if identifier.isdigit():
+        lookup |= Q(pk=int(identifier))
+    return PrisonStation.objects.filter(lookup).first()
+
+
+def _start_worker():
+    # Spawned workers start without Django configured
+    import django
+    django.setup()
+
+
+def render_report_file(prisoner_id):
+    """
+    Render (or find in the PDF cache) one prisoner's report and return
+    (prisoner_number, path, error). Runs in a worker process, so only the
+    path travels back to the parent, never the PDF bytes.
+    """
+    try:
+        prisoner = load_dossier(prisoner_id, cached=False)
+        return prisoner.prisoner_number, str(prisoner_report_path(prisoner)), None
+    except (ReportError, ObjectDoesNotExist) as error:
+        number = Prisoner.objects.filter(pk=prisoner_id).values_list('prisoner_number', flat=True).first()
+        return number or str(prisoner_id), None, str(error)
+
+
+def rendered_reports(prisoner_ids, workers=None):
+    """
+    Yield render_report_file() results in completion order. `workers`
+    defaults to the host's CPU count; 0 renders in this process.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers == 0:
+        for prisoner_id in prisoner_ids:
+            yield render_report_file(prisoner_id)
+        return
+
+    connections.close_all()
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_start_worker)
+    try:
+        futures = [executor.submit(render_report_file, prisoner_id) for prisoner_id in prisoner_ids]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        # Closed early when a download is abandoned: drop the queued reports
+        # rather than hold the caller until every one of them has rendered
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+class _ChunkStream:
+    """Write-only file object that hands written bytes back to the caller in chunks."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def station_reports_zip(station, workers=None):
+    """
+    Yield the bytes of a ZIP holding the report of every active prisoner at
+    `station`. Each PDF is copied into the archive from disk as soon as it
+    is rendered and the archive is emitted as it grows, so memory holds one
+    copy buffer rather than every report.
+    """
+    prisoner_ids = list(
+        Prisoner.objects.filter(prison_station=station, is_active=True).order_by('id').values_list('id', flat=True)
+    )
+    stream = _ChunkStream()
+    failures = []
+    reports = rendered_reports(prisoner_ids, workers)
+    with closing(reports), zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for number, path, error in reports:
+            if path is None:
+                failures.append(f'{number}: {error}')
+                continue
+            arcname = f"{number.replace('/', '-')}.pdf"
+            try:
+                source = open(path, 'rb')
+            except FileNotFoundError:
+                # Evicted from the PDF cache before it could be copied
+                failures.append(f'{number}: rendered report was evicted from the cache')
+                continue
+            with source, archive.open(arcname, 'w', force_zip64=True) as target:
+                shutil.copyfileobj(source, target, COPY_CHUNK)
+            yield stream.drain()
+
+        if failures:
+            archive.writestr('errors.txt', '\n'.join(failures) + '\n')
+    yield stream.drain()
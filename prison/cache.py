@@ -0,0 +1,105 @@
+import hashlib
+import time
+
+from django.core.cache import caches
+from django.db import transaction
+
+STATISTICS_CACHE = 'statistics'
+# Kept apart from the cached values so culling them never drops a counter
+VERSION_CACHE = 'station_versions'
+VERSION_KEY = 'prison:station-version:{}'
+
+
+def statistics_cache():
+    return caches[STATISTICS_CACHE]
+
+
+def version_cache():
+    return caches[VERSION_CACHE]
+
+
+def _now_version():
+    # Versions are change timestamps in nanoseconds. Seeding a missing counter
+    # from the clock means a key evicted or lost on restart never reuses a
+    # number that older cached entries were stored under.
+    return time.time_ns()
+
+
+def station_versions(station_ids):
+    """Return {station_id: version} for `station_ids`, initialising any missing counters."""
+    cache = version_cache()
+    keys = {station_id: VERSION_KEY.format(station_id) for station_id in station_ids}
+    found = cache.get_many(keys.values())
+
+    versions = {}
+    for station_id, key in keys.items():
+        if key not in found:
+            cache.add(key, _now_version(), None)
+            found[key] = cache.get(key)
+        versions[station_id] = found[key]
+    return versions
+
+
+def _bump(station_ids):
+    cache = version_cache()
+    keys = {station_id: VERSION_KEY.format(station_id) for station_id in station_ids}
+    current = cache.get_many(keys.values())
+    now = _now_version()
+    changes = {
+        station_id: (current.get(key), max(now, current.get(key, 0) + 1))
+        for station_id, key in keys.items()
+    }
+    cache.set_many({keys[station_id]: new for station_id, (_, new) in changes.items()}, None)
+    return changes
+
+
+def bump_station_versions(*station_ids, committed=None):
+    """
+    Mark every cached aggregate that covers `station_ids` as stale, now and
+    again once the current transaction commits.
+
+    The first bump stops this transaction reading entries cached before the
+    change. Until the commit, though, other requests still see the old rows
+    and may cache them under the new version; the second bump orphans
+    anything cached that way.
+
+    `committed`, if given, is called after the second bump with
+    {station_id: (versions, new_version)}, where `versions` are the station's
+    versions from before the first bump up to the second (None for a
+    station that had no counter yet).
+    """
+    station_ids = {station_id for station_id in station_ids if station_id is not None}
+    if not station_ids:
+        return
+    first = _bump(station_ids)
+
+    def bump_again():
+        second = _bump(station_ids)
+        if committed is not None:
+            committed({
+                station_id: ((first[station_id][0], second[station_id][0]), new)
+                for station_id, (_, new) in second.items()
+            })
+
+    transaction.on_commit(bump_again)
+
+
+def versioned_key(name, versions):
+    digest = hashlib.md5(
+        ','.join(f'{station_id}.{version}' for station_id, version in sorted(versions.items())).encode()
+    ).hexdigest()
+    return f'prison:{name}:{digest}'
+
+
+def cached_station_aggregate(name, station_ids, compute):
+    """
+    Return `compute()` for the stations in `station_ids`, cached under the
+    stations' current versions so a change at any of them forces a recompute.
+    """
+    cache = statistics_cache()
+    key = versioned_key(name, station_versions(station_ids))
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value)
+    return value
@@ -0,0 +1,96 @@
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from .models import Prisoner, StationCounters
+from .statistics import FOREIGN_NATIONALITIES
+
+SEX_FIELDS = {'male': 'male', 'female': 'female', 'other': 'other_sex'}
+
+COUNTER_FIELDS = [
+    'total', 'convicted', 'remand', 'male', 'female', 'other_sex', 'foreigners',
+    'risk_high', 'risk_medium', 'risk_low', 'risk_need_support',
+]
+
+COUNTER_AGGREGATES = {
+    'total': Count('id'),
+    'convicted': Count('id', filter=Q(prisoner_class='convicted')),
+    'remand': Count('id', filter=Q(prisoner_class='remand')),
+    'male': Count('id', filter=Q(sex='male')),
+    'female': Count('id', filter=Q(sex='female')),
+    'other_sex': Count('id', filter=Q(sex='other')),
+    'foreigners': Count('id', filter=Q(particulars__nationality__in=FOREIGN_NATIONALITIES)),
+    'risk_high': Count('id', filter=Q(risk_assessment__risk_level='high')),
+    'risk_medium': Count('id', filter=Q(risk_assessment__risk_level='medium')),
+    'risk_low': Count('id', filter=Q(risk_assessment__risk_level='low')),
+    'risk_need_support': Count('id', filter=Q(risk_assessment__risk_level='need_support')),
+}
+
+
+def prisoner_contribution(prisoner_id):
+    """Return (station_id, Counter) of what the stored prisoner adds to its station's counters."""
+    row = Prisoner.objects.filter(pk=prisoner_id).values(
+        'prison_station_id', 'is_active', 'prisoner_class', 'sex',
+        'particulars__nationality', 'risk_assessment__risk_level',
+    ).first()
+    if row is None or not row['is_active']:
+        return None, Counter()
+
+    fields = ['total', row['prisoner_class'], SEX_FIELDS.get(row['sex'])]
+    if row['particulars__nationality'] in FOREIGN_NATIONALITIES:
+        fields.append('foreigners')
+    if row['risk_assessment__risk_level']:
+        fields.append(f"risk_{row['risk_assessment__risk_level']}")
+    return row['prison_station_id'], Counter(field for field in fields if field in COUNTER_FIELDS)
+
+
+def recount_station(station_id):
+    """Rebuild one station's counters from the Prisoner table and return the row."""
+    counts = Prisoner.objects.filter(is_active=True, prison_station_id=station_id).aggregate(**COUNTER_AGGREGATES)
+    counters, _ = StationCounters.objects.update_or_create(station_id=station_id, defaults=counts)
+    return counters
+
+
+def adjust_station_counters(station_id, deltas):
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if station_id is None or not deltas:
+        return
+    updated = StationCounters.objects.filter(station_id=station_id).update(
+        **{field: F(field) + delta for field, delta in deltas.items()}
+    )
+    if not updated:
+        # No row yet: counting from scratch already includes this change
+        recount_station(station_id)
+
+
+@contextmanager
+def tracking_station_counters(prisoner):
+    """
+    Keep StationCounters in step with whatever the block does to `prisoner`.
+
+    The prisoner's stored contribution is read before and after the block
+    and the difference is applied with F() updates in the same transaction
+    as the block's own writes.
+    """
+    with transaction.atomic():
+        before_station, before = prisoner_contribution(prisoner.pk) if prisoner.pk else (None, Counter())
+        yield
+        after_station, after = prisoner_contribution(prisoner.pk)
+
+        if before_station == after_station:
+            after.subtract(before)
+            adjust_station_counters(after_station, after)
+        else:
+            adjust_station_counters(before_station, {field: -count for field, count in before.items()})
+            adjust_station_counters(after_station, after)
+
+
+def station_counters(station_ids):
+    """Return {station_id: StationCounters}, counting any station that has no row yet."""
+    counters = StationCounters.objects.select_related('station').in_bulk(station_ids)
+    for station_id in station_ids:
+        if station_id not in counters:
+            counters[station_id] = recount_station(station_id)
+    return counters
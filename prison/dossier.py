@@ -0,0 +1,91 @@
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.db.models import Prefetch
+from django.http import Http404
+
+from .cache import statistics_cache
+from .models import Prisoner, PrisonerTransfer
+
+DOSSIER_RELATIONS = (
+    'prison_station', 'physical', 'particulars', 'convicted_details',
+    'risk_assessment', 'rehabilitation', 'remand_details',
+)
+DOSSIER_KEY = 'prison:dossier:{}:{}'
+DOSSIER_GENERATION_KEY = 'prison:dossier-generation'
+
+
+def _dossier_key(prisoner_id):
+    cache = statistics_cache()
+    cache.add(DOSSIER_GENERATION_KEY, 1, None)
+    return DOSSIER_KEY.format(cache.get(DOSSIER_GENERATION_KEY, 1), prisoner_id)
+
+
+def dossier_queryset(transfers=True):
+    prisoners = Prisoner.objects.select_related(*DOSSIER_RELATIONS)
+    if transfers:
+        prisoners = prisoners.prefetch_related(Prefetch(
+            'transfers',
+            queryset=PrisonerTransfer.objects.select_related('from_prison', 'to_prison', 'transferred_by'),
+        ))
+    return prisoners
+
+
+def load_dossier(prisoner_id, cached=True, transfers=True):
+    """
+    Return the prisoner with every one-to-one detail record and their
+    transfers loaded: one joined query plus one for the transfers.
+
+    With `cached`, the loaded dossier is kept in the statistics cache until
+    a change to the prisoner or its records forgets it. Views that go on to
+    save the instance should pass cached=False, and can skip the transfers
+    query with transfers=False.
+    """
+    if not transfers:
+        cached = False
+    key = _dossier_key(prisoner_id) if cached else None
+    if cached:
+        prisoner = statistics_cache().get(key)
+        if prisoner is not None:
+            return prisoner
+
+    prisoner = dossier_queryset(transfers).filter(pk=prisoner_id).first()
+    if prisoner is None:
+        raise Prisoner.DoesNotExist(f'No prisoner with id {prisoner_id}')
+    if cached:
+        statistics_cache().set(key, prisoner)
+    return prisoner
+
+
+def get_dossier_or_404(prisoner_id, cached=True, transfers=True):
+    try:
+        return load_dossier(prisoner_id, cached=cached, transfers=transfers)
+    except Prisoner.DoesNotExist:
+        raise Http404('No Prisoner matches the given query.')
+
+
+def related_or_none(prisoner, name):
+    """A one-to-one record already loaded on `prisoner`, or None if it doesn't exist."""
+    try:
+        return getattr(prisoner, name)
+    except ObjectDoesNotExist:
+        return None
+
+
+def forget_dossier(prisoner_id):
+    """Drop the cached dossier now and again once the current transaction commits."""
+    if prisoner_id is None:
+        return
+    cache = statistics_cache()
+    key = _dossier_key(prisoner_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def forget_all_dossiers():
+    """Invalidate every cached dossier, e.g. after a station is renamed."""
+    cache = statistics_cache()
+    cache.add(DOSSIER_GENERATION_KEY, 1, None)
+    try:
+        cache.incr(DOSSIER_GENERATION_KEY)
+    except ValueError:
+        cache.set(DOSSIER_GENERATION_KEY, 2, None)
@@ -0,0 +1,88 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.db.models import Count
+from django.utils import timezone
+
+from .cache import cached_station_aggregate
+from .models import Prisoner, PrisonStation, RemandPrisoner, StationReleaseDay
+from .sentences import shift
+
+# Days of admissions the daily admission rate is averaged over
+ADMISSION_WINDOW_DAYS = 180
+# Share of remand prisoners expected to leave custody at their next court date
+REMAND_DISCHARGE_SHARE = 0.5
+
+
+def admission_rate(station_id, today, window=ADMISSION_WINDOW_DAYS):
+    """Prisoners admitted to the station per day over the `window` days up to `today`."""
+    admitted = Prisoner.objects.filter(
+        prison_station_id=station_id, date_admitted__gt=today - timedelta(days=window), date_admitted__lte=today,
+    ).count()
+    return admitted / window
+
+
+def station_forecast(station, today, days):
+    """
+    Projected end-of-day headcount at `station` for each of the `days` days
+    after `today`, starting from its active prisoners.
+
+    Convicted prisoners leave on their release date on remission, read from
+    the release calendar. REMAND_DISCHARGE_SHARE of remand prisoners leave
+    at their next court date. Arrivals come at the station's recent
+    admission rate. Releases of prisoners not yet admitted are not
+    projected, so the forecast leans towards overcrowding.
+    """
+    current = Prisoner.objects.filter(prison_station=station, is_active=True).count()
+    end = today + timedelta(days=days)
+    departures = Counter(dict(
+        StationReleaseDay.objects.filter(station=station, date__gt=today, date__lte=end).values_list('date', 'releases')
+    ))
+    court_dates = (
+        RemandPrisoner.objects.filter(
+            prisoner__is_active=True, prisoner__prisoner_class='remand', prisoner__prison_station=station,
+            next_court_date__gt=today, next_court_date__lte=end,
+        )
+        .values_list('next_court_date').annotate(Count('pk')).order_by()
+    )
+    for day, remanded in court_dates:
+        departures[day] += remanded * REMAND_DISCHARGE_SHARE
+    arrivals = admission_rate(station.pk, today)
+
+    series = []
+    population = current
+    for offset in range(1, days + 1):
+        population += arrivals - departures.get(today + timedelta(days=offset), 0)
+        series.append(max(round(population), 0))
+
+    peak = max(series, default=current)
+    over = next((offset for offset, count in enumerate(series, 1) if count > station.capacity), None)
+    return {
+        'station_id': station.pk,
+        'name': station.name,
+        'capacity': station.capacity,
+        'current': current,
+        'admissions_per_day': round(arrivals, 2),
+        'series': series,
+        'peak': peak,
+        'peak_date': today + timedelta(days=series.index(peak) + 1) if series else today,
+        'over_capacity_from': None if over is None else today + timedelta(days=over),
+    }
+
+
+def occupancy_forecasts(station_ids, months=6, today=None):
+    """
+    station_forecast() for every station in `station_ids` over the next
+    `months` months. Each station is cached under its own version, so an
+    admission, transfer or release only recomputes the stations it touched.
+    """
+    today = today or timezone.localdate()
+    days = (shift(today, months, 0) - today).days
+    stations = PrisonStation.objects.in_bulk(station_ids)
+    return [
+        cached_station_aggregate(
+            f'forecast:{today}:{days}', [station_id],
+            lambda station=stations[station_id]: station_forecast(station, today, days),
+        )
+        for station_id in station_ids
+    ]
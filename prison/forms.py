@@ -35,7 +35,7 @@ class PrisonerForm(forms.ModelForm):
 class ConvictedPrisonerForm(forms.ModelForm):
     class Meta:
         model = ConvictedPrisoner
-        exclude = ['prisoner', 'release_date', 'date_of_release_on_remission']
+        exclude = ['prisoner', 'date_of_release', 'date_of_release_on_remission']
         widgets = {
             'date_of_committal': forms.DateInput(attrs={'type': 'date'}),
             'wef_date': forms.DateInput(attrs={'type': 'date'}),
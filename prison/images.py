@@ -0,0 +1,92 @@
+import io
+import posixpath
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+# kind -> (box in pixels, crop to fill the box rather than fit inside it)
+DERIVATIVES = {
+    'thumbnail': ((80, 80), True),    # 40px list avatar at 2x
+    'detail': ((300, 300), True),     # 150px detail photo at 2x
+    'report': ((240, 240), False),    # 4cm printed at 150dpi
+}
+DERIVATIVE_QUALITY = 85
+# Part of every derivative's name, so a derivative's bytes never change
+# under a given name: bump it whenever the sizes or encoding above change,
+# then run backfill_image_derivatives.
+DERIVATIVE_VERSION = 1
+
+
+def derivative_name(image_name, kind):
+    """Storage name of the `kind` derivative of the image stored as `image_name`."""
+    directory, filename = posixpath.split(image_name)
+    return posixpath.join(directory, 'derivatives', f'v{DERIVATIVE_VERSION}', kind, f'{filename}.jpg')
+
+
+def original_name(name):
+    """The stored image `name` is a derivative of, `name` itself if it is not a derivative, or None if malformed."""
+    parts = name.split('/')
+    if len(parts) >= 5 and parts[-4] == 'derivatives' and parts[-1].endswith('.jpg'):
+        original = '/'.join(parts[:-4] + [parts[-1][:-len('.jpg')]])
+        if parts[-2] in DERIVATIVES and derivative_name(original, parts[-2]) == name:
+            return original
+        return None
+    return name
+
+
+def normalise_upload(upload):
+    """
+    Re-encode an uploaded photo upright and without its EXIF block (camera,
+    GPS and orientation tags), keeping its format and resolution.
+    """
+    upload.seek(0)
+    original = Image.open(upload)
+    # Phone cameras label their JPEGs MPO
+    image_format = 'JPEG' if original.format in ('JPEG', 'MPO') else original.format or 'PNG'
+    image = ImageOps.exif_transpose(original)
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L', 'CMYK'):
+        image = image.convert('RGB')
+    output = io.BytesIO()
+    image.save(output, image_format, **({'quality': 95} if image_format == 'JPEG' else {}))
+    return ContentFile(output.getvalue())
+
+
+def render_derivative(image, kind):
+    """JPEG bytes of the upright Pillow `image` resized for `kind`."""
+    box, crop = DERIVATIVES[kind]
+    image = image.convert('RGBA')
+    if crop:
+        image = ImageOps.fit(image, box, Image.Resampling.LANCZOS)
+    else:
+        image = ImageOps.contain(image, box, Image.Resampling.LANCZOS)
+    # Flatten any transparency onto white rather than black
+    flattened = Image.new('RGB', image.size, 'white')
+    flattened.paste(image, mask=image.getchannel('A'))
+    output = io.BytesIO()
+    flattened.save(output, 'JPEG', quality=DERIVATIVE_QUALITY, optimize=True)
+    return output.getvalue()
+
+
+def generate_derivatives(field_file):
+    """Write every derivative of the stored image `field_file`, replacing any existing ones."""
+    storage = field_file.storage
+    largest = max(max(box) for box, _ in DERIVATIVES.values())
+    with field_file.open('rb') as source:
+        image = Image.open(source)
+        # Let the JPEG decoder downscale by a power of two while decoding
+        image.draft('RGB', (largest * 2, largest * 2))
+        image = ImageOps.exif_transpose(image)
+    return [
+        storage.save_derived(derivative_name(field_file.name, kind), ContentFile(render_derivative(image, kind)))
+        for kind in DERIVATIVES
+    ]
+
+
+def derivatives_exist(field_file):
+    return all(field_file.storage.exists(derivative_name(field_file.name, kind)) for kind in DERIVATIVES)
+
+
+def delete_image(storage, name):
+    """Delete the stored image `name` together with its derivatives."""
+    for stored in [name, *(derivative_name(name, kind) for kind in DERIVATIVES)]:
+        storage.delete(stored)
@@ -0,0 +1,174 @@
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import timedelta
+
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import ReportJob
+from .reports import render_lockup_list, render_prisoner_report, render_transfer_list, render_upcoming_releases
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 3
+# A running job whose worker has not checked in for STALE_AFTER is presumed dead
+HEARTBEAT_INTERVAL = timedelta(seconds=30)
+STALE_AFTER = timedelta(minutes=10)
+# Finished jobs and their PDFs are kept this long, checked every PRUNE_INTERVAL
+RETENTION = timedelta(days=7)
+PRUNE_INTERVAL = timedelta(hours=1)
+
+# kind -> (renderer called with the job's params, download filename)
+REPORT_RENDERERS = {
+    'prisoner_report': (
+        lambda params: render_prisoner_report(params['prisoner_id']),
+        lambda params: f"prisoner_{params['prisoner_number']}_report.pdf",
+    ),
+    'upcoming_releases': (
+        lambda params: render_upcoming_releases(params.get('station_id'), params.get('days', 30)),
+        lambda params: 'upcoming_releases_report.pdf',
+    ),
+    'lockup_list': (
+        lambda params: render_lockup_list(params.get('station_id')),
+        lambda params: 'lockup_list.pdf',
+    ),
+    'transfer_list': (
+        lambda params: render_transfer_list(params.get('station_id'), params.get('days', 30)),
+        lambda params: 'transfer_list.pdf',
+    ),
+}
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def enqueue_report(kind, params, user):
+    """
+    Queue a report and return its job. A matching job that is still queued
+    or running for the same user is returned instead of queueing a duplicate.
+    """
+    pending = ReportJob.objects.filter(
+        kind=kind, params=params, requested_by=user, status__in=['queued', 'running'],
+    ).first()
+    if pending is not None:
+        return pending
+    return ReportJob.objects.create(
+        kind=kind, params=params, requested_by=user, filename=REPORT_RENDERERS[kind][1](params),
+    )
+
+
+def queue_position(job):
+    """How many queued jobs are ahead of `job`."""
+    if job.status != 'queued':
+        return 0
+    return ReportJob.objects.filter(status='queued', created_at__lt=job.created_at).count()
+
+
+def claim_next_job(worker):
+    """
+    Mark the oldest queued job as running for `worker` and return it, or None.
+
+    The claim is a conditional UPDATE, so two workers racing for the same
+    job cannot both win it; the loser simply tries the next one.
+    """
+    while True:
+        job_id = ReportJob.objects.filter(status='queued').order_by('created_at').values_list('id', flat=True).first()
+        if job_id is None:
+            return None
+        claimed = ReportJob.objects.filter(pk=job_id, status='queued').update(
+            status='running', worker=worker, started_at=timezone.now(), heartbeat_at=timezone.now(), progress=5,
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return ReportJob.objects.get(pk=job_id)
+
+
+def requeue_stale_jobs(stale_after=STALE_AFTER):
+    """
+    Give jobs whose worker stopped sending heartbeats mid-render another
+    try, or fail them after MAX_ATTEMPTS. A slow render whose worker is
+    still alive keeps its claim however long it takes.
+    """
+    cutoff = timezone.now() - stale_after
+    stale = ReportJob.objects.filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at=None, started_at__lt=cutoff), status='running',
+    )
+    stale.filter(attempts__gte=MAX_ATTEMPTS).update(
+        status='failed', error='Worker stopped responding', finished_at=timezone.now(),
+    )
+    return stale.update(status='queued', worker='', progress=0)
+
+
+def prune_finished_jobs(retention=RETENTION):
+    """Delete jobs that finished more than `retention` ago, with their PDFs, and return how many."""
+    expired = list(ReportJob.objects.filter(
+        status__in=['done', 'failed'], finished_at__lt=timezone.now() - retention,
+    ))
+    for job in expired:
+        if job.output:
+            job.output.delete(save=False)
+    ReportJob.objects.filter(pk__in=[job.pk for job in expired]).delete()
+    return len(expired)
+
+
+def _send_heartbeats(job_id, stopped, interval):
+    try:
+        while not stopped.wait(interval.total_seconds()):
+            ReportJob.objects.filter(pk=job_id, status='running').update(heartbeat_at=timezone.now())
+    finally:
+        # This thread's connection is its own; nothing else will close it
+        connection.close()
+
+
+def run_job(job, heartbeat_interval=HEARTBEAT_INTERVAL):
+    """Render `job`'s PDF to storage and record the outcome, checking in every `heartbeat_interval`."""
+    render, _ = REPORT_RENDERERS[job.kind]
+    stopped = threading.Event()
+    heartbeat = threading.Thread(
+        target=_send_heartbeats, args=(job.pk, stopped, heartbeat_interval), daemon=True,
+    )
+    heartbeat.start()
+    try:
+        pdf = render(job.params)
+        ReportJob.objects.filter(pk=job.pk).update(progress=90)
+        job.output.save(f'{job.pk}.pdf', ContentFile(pdf), save=False)
+    except Exception as error:
+        logger.exception('Report job %s failed', job.pk)
+        job.status = 'failed'
+        job.error = str(error) or error.__class__.__name__
+    else:
+        job.status = 'done'
+        job.progress = 100
+    finally:
+        stopped.set()
+        heartbeat.join()
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'progress', 'output', 'error', 'finished_at'])
+    return job
+
+
+def work(worker=None, once=False, poll_interval=1.0):
+    """Claim and run jobs until stopped; with `once`, return when the queue is empty."""
+    worker = worker or worker_name()
+    processed = 0
+    pruned_at = None
+    while True:
+        close_old_connections()
+        requeue_stale_jobs()
+        if pruned_at is None or timezone.now() - pruned_at >= PRUNE_INTERVAL:
+            prune_finished_jobs()
+            pruned_at = timezone.now()
+        job = claim_next_job(worker)
+        if job is None:
+            if once:
+                return processed
+            time.sleep(poll_interval)
+            continue
+        run_job(job)
+        processed += 1
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from prison.images import derivatives_exist, generate_derivatives
+from prison.models import Prisoner
+
+
+class Command(BaseCommand):
+    help = 'Generate the thumbnail, detail and report copies of prisoner photos that do not have them yet.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate derivatives even where they already exist.',
+        )
+
+    def handle(self, *args, **options):
+        prisoners = Prisoner.objects.exclude(image='').exclude(image__isnull=True).only('image').order_by('id')
+        generated = skipped = failed = 0
+        for prisoner in prisoners.iterator(chunk_size=200):
+            if not options['force'] and derivatives_exist(prisoner.image):
+                skipped += 1
+                continue
+            try:
+                generate_derivatives(prisoner.image)
+            except OSError as error:  # missing files and unreadable images alike
+                failed += 1
+                self.stderr.write(f'{prisoner.image.name}: {error}')
+            else:
+                generated += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated derivatives for {generated} photo(s), {skipped} already done, {failed} failed.'
+        ))
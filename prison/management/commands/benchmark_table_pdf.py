@@ -0,0 +1,83 @@
+import time
+import tracemalloc
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+
+from prison.reports import RELEASE_COLUMNS, release_row, render_pdf
+from prison.tabular_pdf import render_table_pdf
+
+
+def fake_releases(count):
+    """`count` objects shaped like ConvictedPrisoner rows for the upcoming releases report."""
+    station = SimpleNamespace(name='Zomba Central Prison')
+    today = date.today()
+    for index in range(count):
+        yield SimpleNamespace(
+            prisoner=SimpleNamespace(
+                prisoner_number=f'ZA/{index:06d}', full_name=f'Prisoner {index} Banda', prison_station=station,
+            ),
+            date_of_release_on_remission=today + timedelta(days=index % 365),
+            sentence=12 + index % 240,
+            offense='Theft contrary to section 278 of the Penal Code',
+        )
+
+
+class Command(BaseCommand):
+    help = "Compare the ReportLab table renderer with the xhtml2pdf template for the upcoming releases report."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 50000])
+        parser.add_argument(
+            '--html-limit', type=int, default=10000,
+            help='Only run the xhtml2pdf baseline up to this many rows; larger runs are reported as not run (default: 10000).',
+        )
+        parser.add_argument('--memory', action='store_true', help='Also trace peak Python memory (slower).')
+
+    def measure(self, render, trace_memory):
+        if trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        pdf = render()
+        elapsed = time.perf_counter() - started
+        peak = None
+        if trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        return elapsed, len(pdf), peak
+
+    def report(self, renderer, rows, result):
+        elapsed, size, peak = result
+        line = f'{renderer:<10} {rows:>7} rows  {elapsed:8.2f}s  {size / 1024:9.0f} KiB'
+        if peak is not None:
+            line += f'  peak {peak / 2 ** 20:7.1f} MiB'
+        self.stdout.write(line)
+
+    def handle(self, *args, **options):
+        today = date.today()
+        skipped = []
+        for rows in options['rows']:
+            result = self.measure(
+                lambda: render_table_pdf(
+                    'Upcoming Releases', RELEASE_COLUMNS, (release_row(release) for release in fake_releases(rows)),
+                ),
+                options['memory'],
+            )
+            self.report('reportlab', rows, result)
+
+            if rows > options['html_limit']:
+                self.stdout.write(self.style.WARNING(
+                    f'{"xhtml2pdf":<10} {rows:>7} rows  NOT RUN: above --html-limit {options["html_limit"]}'
+                ))
+                skipped.append(rows)
+                continue
+            context = {'releases': list(fake_releases(rows)), 'today': today, 'next_month': today + timedelta(days=30)}
+            result = self.measure(lambda: render_pdf('prison/upcoming_releases_pdf.html', context), options['memory'])
+            self.report('xhtml2pdf', rows, result)
+
+        if skipped:
+            self.stdout.write(self.style.WARNING(
+                f'The xhtml2pdf baseline was not measured for {", ".join(map(str, skipped))} rows. '
+                f'Raise --html-limit to compare against it there.'
+            ))
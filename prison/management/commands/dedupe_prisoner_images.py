@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from prison.dossier import forget_all_dossiers
+from prison.images import delete_image, derivatives_exist, generate_derivatives
+from prison.models import Prisoner
+from prison.storage import content_digest, name_digest
+
+
+class Command(BaseCommand):
+    help = (
+        'Move prisoner photos stored under upload names into content-addressed storage, '
+        'so byte-identical copies collapse into one file.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report how many photos would move and how many are duplicates without changing anything.',
+        )
+
+    def handle(self, *args, **options):
+        field = Prisoner._meta.get_field('image')
+        storage = field.storage
+        names = (
+            Prisoner.objects.exclude(image='').exclude(image__isnull=True)
+            .values_list('image', flat=True).distinct().order_by('image')
+        )
+
+        moves = {}
+        digests = set()
+        missing = duplicate_bytes = 0
+        for name in names:
+            if name_digest(name):
+                continue
+            if not storage.exists(name):
+                missing += 1
+                self.stderr.write(f'{name}: file is missing')
+                continue
+            with storage.open(name) as photo:
+                digest = content_digest(photo)
+                if digest in digests:
+                    duplicate_bytes += storage.size(name)
+                digests.add(digest)
+                if not options['dry_run']:
+                    moves[name] = storage.save(name, photo, max_length=field.max_length)
+
+        if options['dry_run']:
+            self.stdout.write(
+                f'Would move photos into {len(digests)} content-addressed file(s), '
+                f'freeing {duplicate_bytes} bytes of duplicates; {missing} missing.'
+            )
+            return
+
+        with transaction.atomic():
+            for old, new in moves.items():
+                Prisoner.objects.filter(image=old).update(image=new)
+        forget_all_dossiers()
+
+        for old, new in moves.items():
+            photo = field.attr_class(None, field, new)
+            if not derivatives_exist(photo):
+                generate_derivatives(photo)
+            delete_image(storage, old)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Moved {len(moves)} photo(s) into {len(set(moves.values()))} content-addressed file(s), '
+            f'freeing {duplicate_bytes} bytes of duplicates; {missing} missing. '
+            'Run gc_prisoner_images to remove copies no prisoner refers to.'
+        ))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from prison.bulk_reports import find_station, station_reports_zip
+
+
+class Command(BaseCommand):
+    help = "Render the report of every active prisoner at a station into one ZIP file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('station', help='Station id, code or name.')
+        parser.add_argument('--output', help='ZIP file to write (default: <station code>_reports.zip).')
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help='Render processes to use (default: one per CPU core; 0 renders in this process).',
+        )
+
+    def handle(self, *args, **options):
+        station = find_station(options['station'])
+        if station is None:
+            raise CommandError(f"No prison station matches '{options['station']}'.")
+
+        output = options['output'] or f'{station.code}_reports.zip'
+        written = 0
+        with open(output, 'wb') as archive:
+            for chunk in station_reports_zip(station, workers=options['workers']):
+                archive.write(chunk)
+                written += len(chunk)
+
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} bytes of reports for {station} to {output}.'))
@@ -0,0 +1,49 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from prison.images import DERIVATIVES, derivative_name
+from prison.models import Prisoner
+from prison.storage import walk_files
+
+
+class Command(BaseCommand):
+    help = 'Delete prisoner photos and derivatives that no prisoner refers to any more.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List the orphaned files without deleting them.',
+        )
+        parser.add_argument(
+            '--grace-minutes',
+            type=int,
+            default=60,
+            help='Leave files younger than this alone, as their upload may not be committed yet (default: 60).',
+        )
+
+    def handle(self, *args, **options):
+        field = Prisoner._meta.get_field('image')
+        storage = field.storage
+        referenced = set()
+        for name in Prisoner.objects.exclude(image='').exclude(image__isnull=True).values_list('image', flat=True):
+            referenced.add(name)
+            referenced.update(derivative_name(name, kind) for kind in DERIVATIVES)
+
+        cutoff = timezone.now() - timedelta(minutes=options['grace_minutes'])
+        removed = reclaimed = 0
+        for name in walk_files(storage, field.upload_to.rstrip('/')):
+            if name in referenced or storage.get_modified_time(name) > cutoff:
+                continue
+            size = storage.size(name)
+            if options['dry_run']:
+                self.stdout.write(f'Orphaned: {name} ({size} bytes)')
+            else:
+                storage.delete(name)
+            removed += 1
+            reclaimed += size
+
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {removed} orphaned file(s), {reclaimed} bytes.'))
@@ -0,0 +1,38 @@
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.management.base import BaseCommand, CommandError
+
+from prison.bulk_reports import find_station
+from prison.dossier import dossier_queryset
+from prison.pdf_cache import evict, get_cached_pdf, report_fingerprint
+from prison.reports import ReportError, prisoner_report_path
+
+
+class Command(BaseCommand):
+    help = "Render and cache the PDF report of every active prisoner at a station."
+
+    def add_arguments(self, parser):
+        parser.add_argument('station', help='Station id, code or name.')
+
+    def handle(self, *args, **options):
+        station = find_station(options['station'])
+        if station is None:
+            raise CommandError(f"No prison station matches '{options['station']}'.")
+
+        prisoners = dossier_queryset().filter(prison_station=station, is_active=True).order_by('id')
+        rendered = cached = failed = 0
+        for prisoner in prisoners.iterator(chunk_size=200):
+            if get_cached_pdf(report_fingerprint(prisoner)) is not None:
+                cached += 1
+                continue
+            try:
+                prisoner_report_path(prisoner)
+            except (ReportError, ObjectDoesNotExist) as error:
+                failed += 1
+                self.stderr.write(f'{prisoner.prisoner_number}: {error}')
+            else:
+                rendered += 1
+        evict()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{station}: rendered {rendered}, already cached {cached}, failed {failed}.'
+        ))
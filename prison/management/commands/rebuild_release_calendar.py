@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from prison.release_calendar import rebuild_release_calendar
+
+
+class Command(BaseCommand):
+    help = 'Recount the per-station release calendar from the ConvictedPrisoner table.'
+
+    def handle(self, *args, **options):
+        days = rebuild_release_calendar()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt the release calendar: {days} station day(s) with releases.'))
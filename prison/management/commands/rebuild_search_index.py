@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from prison.models import Prisoner
+from prison.search import SEARCH_TABLE, phonetic_name, search_index_available
+
+
+class Command(BaseCommand):
+    help = 'Recompute prisoner phonetic names and rebuild the full-text search index.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            prisoners = list(Prisoner.objects.only('first_name', 'middle_name', 'surname', 'phonetic_name'))
+            changed = []
+            for prisoner in prisoners:
+                key = phonetic_name(prisoner.first_name, prisoner.middle_name, prisoner.surname)
+                if key != prisoner.phonetic_name:
+                    prisoner.phonetic_name = key
+                    changed.append(prisoner)
+            Prisoner.objects.bulk_update(changed, ['phonetic_name'], batch_size=1000)
+
+            if search_index_available():
+                with connection.cursor() as cursor:
+                    cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')")
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Updated {len(changed)} phonetic name(s) and rebuilt the index for {len(prisoners)} prisoner(s).'
+        ))
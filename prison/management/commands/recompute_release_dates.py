@@ -0,0 +1,109 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from prison.cache import bump_station_versions
+from prison.dossier import forget_all_dossiers
+from prison.models import ConvictedPrisoner
+from prison.release_calendar import rebuild_release_calendar
+from prison.sentences import bulk_release_dates
+
+COLUMNS = (
+    'pk', 'prisoner__prisoner_number', 'prisoner__prison_station_id',
+    'wef_date', 'sentence', 'reduction_months', 'date_of_release', 'date_of_release_on_remission',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute every convicted prisoner\'s release date and release date on remission '
+        'with the current sentence rules and store the ones that changed. Release dates '
+        'entered by hand before they were computed are overwritten too; use --dry-run to list them first.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report the changes without writing them.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=5000,
+            help='Rows read, recomputed and written per batch (default: 5000).',
+        )
+        parser.add_argument(
+            '--show',
+            type=int,
+            default=20,
+            help='How many individual changes to list (default: 20).',
+        )
+
+    def chunks(self, chunk_size):
+        # Keyset batches rather than one open cursor, since each batch is
+        # written back before the next is read
+        rows = ConvictedPrisoner.objects.exclude(wef_date=None).order_by('pk').values_list(*COLUMNS)
+        last_pk = None
+        while True:
+            chunk = list((rows if last_pk is None else rows.filter(pk__gt=last_pk))[:chunk_size])
+            if not chunk:
+                return
+            last_pk = chunk[-1][0]
+            yield chunk
+
+    def write(self, updates):
+        """
+        Store (release date, release date on remission, pk) rows with one
+        prepared UPDATE run for every row. bulk_update() would build a CASE
+        expression per column with a branch per row, which takes several
+        times longer to compile and for the database to evaluate than the
+        rows themselves take to write.
+        """
+        ops = connection.ops
+        table = ops.quote_name(ConvictedPrisoner._meta.db_table)
+        release, on_remission = (
+            ops.quote_name(ConvictedPrisoner._meta.get_field(name).column)
+            for name in ('date_of_release', 'date_of_release_on_remission')
+        )
+        pk = ops.quote_name(ConvictedPrisoner._meta.pk.column)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(f'UPDATE {table} SET {release} = %s, {on_remission} = %s WHERE {pk} = %s', updates)
+
+    def handle(self, *args, **options):
+        scanned = changed = 0
+        stations = set()
+        for chunk in self.chunks(options['chunk_size']):
+            pks, numbers, station_ids, wef_dates, sentences, reductions, releases, remissions = zip(*chunk)
+            stored = zip(releases, remissions)
+            recomputed = zip(*bulk_release_dates(wef_dates, sentences, [months or 0 for months in reductions]))
+
+            updates = []
+            for pk, number, station_id, old, new in zip(pks, numbers, station_ids, stored, recomputed):
+                if old == new:
+                    continue
+                if changed < options['show']:
+                    self.stdout.write(
+                        f'{number}: release {old[0] or "none"} -> {new[0]}, '
+                        f'on remission {old[1] or "none"} -> {new[1]}'
+                    )
+                changed += 1
+                stations.add(station_id)
+                updates.append((*map(connection.ops.adapt_datefield_value, new), pk))
+            scanned += len(chunk)
+
+            if updates and not options['dry_run']:
+                self.write(updates)
+
+        if changed > options['show']:
+            self.stdout.write(f'... and {changed - options["show"]} more.')
+
+        if options['dry_run']:
+            self.stdout.write(f'{changed} of {scanned} release date(s) would change; run without --dry-run to store them.')
+            return
+
+        if changed:
+            # The raw UPDATE sends no signals, so redo what they would have
+            rebuild_release_calendar()
+            bump_station_versions(*stations)
+            forget_all_dossiers()
+        self.stdout.write(self.style.SUCCESS(f'Updated {changed} of {scanned} release date(s).'))
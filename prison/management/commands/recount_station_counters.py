@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from prison.counters import COUNTER_AGGREGATES, COUNTER_FIELDS
+from prison.models import Prisoner, PrisonStation, StationCounters
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the StationCounters table from the Prisoner table and report any drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drift without writing the recounted values.',
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            actual = {
+                row.pop('prison_station'): row
+                for row in Prisoner.objects.filter(is_active=True)
+                .values('prison_station')
+                .annotate(**COUNTER_AGGREGATES)
+            }
+            stored = StationCounters.objects.select_for_update().in_bulk()
+
+            drifted = 0
+            for station in PrisonStation.objects.all():
+                counts = {field: actual.get(station.id, {}).get(field, 0) for field in COUNTER_FIELDS}
+                counters = stored.get(station.pk)
+                if counters is None:
+                    differences = [f'{field}: missing -> {value}' for field, value in counts.items()]
+                else:
+                    differences = [
+                        f'{field}: {getattr(counters, field)} -> {value}'
+                        for field, value in counts.items()
+                        if getattr(counters, field) != value
+                    ]
+                if not differences:
+                    continue
+
+                drifted += 1
+                self.stdout.write(self.style.WARNING(f'{station}: ' + ', '.join(differences)))
+                if not options['dry_run']:
+                    StationCounters.objects.update_or_create(station=station, defaults=counts)
+
+        if drifted == 0:
+            self.stdout.write(self.style.SUCCESS('All station counters match.'))
+        elif options['dry_run']:
+            self.stdout.write(f'{drifted} station(s) drifted; run without --dry-run to fix them.')
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt counters for {drifted} station(s).'))
@@ -0,0 +1,48 @@
+import multiprocessing
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from prison.jobs import work, worker_name
+
+
+def _work_in_process(once, poll_interval):
+    # Spawned children start without Django configured
+    import django
+    django.setup()
+    work(worker_name(), once=once, poll_interval=poll_interval)
+
+
+class Command(BaseCommand):
+    help = 'Render queued PDF report jobs in one or more worker processes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1, help='Number of worker processes to run.')
+        parser.add_argument('--once', action='store_true', help='Exit when the queue is empty.')
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Seconds to wait before checking an empty queue again.',
+        )
+
+    def handle(self, *args, **options):
+        if options['processes'] <= 1:
+            processed = work(once=options['once'], poll_interval=options['poll_interval'])
+            if options['once']:
+                self.stdout.write(self.style.SUCCESS(f'Rendered {processed} report job(s).'))
+            return
+
+        # Children must not share the parent's database connections
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(target=_work_in_process, args=(options['once'], options['poll_interval']))
+            for _ in range(options['processes'])
+        ]
+        for process in processes:
+            process.start()
+        self.stdout.write(f"Started {len(processes)} report workers.")
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.terminate()
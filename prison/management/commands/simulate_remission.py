@@ -0,0 +1,93 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from prison.bulk_reports import find_station
+from prison.models import ConvictedPrisoner, PrisonStation
+from prison.sentences import REMISSION_DIVISOR
+from prison.simulation import RemissionPolicy, SentencePopulation
+
+
+class Command(BaseCommand):
+    help = (
+        'Project the prison population under a different remission rule or an amnesty, '
+        'next to the current rule. Nothing is written to the database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--divisor',
+            type=float,
+            default=REMISSION_DIVISOR,
+            help=f'Remission is 1/DIVISOR of the sentence; 0 for none (default: {REMISSION_DIVISOR}).',
+        )
+        parser.add_argument(
+            '--amnesty-months',
+            type=float,
+            default=0,
+            help='Months taken off every covered sentence on top of remission.',
+        )
+        parser.add_argument(
+            '--offense',
+            action='append',
+            default=[],
+            help='Limit the amnesty to offences containing this text; repeat for several.',
+        )
+        parser.add_argument(
+            '--ignore-reductions',
+            action='store_true',
+            help='Drop the reductions already granted to individual prisoners.',
+        )
+        parser.add_argument('--station', help='Station id, code or name (default: every station).')
+        parser.add_argument('--days', type=int, default=365, help='Days to project (default: 365).')
+        parser.add_argument('--step', type=int, default=30, help='Days between listed points (default: 30).')
+
+    def amnesty_offenses(self, patterns):
+        offenses = set()
+        for pattern in patterns:
+            matches = {value for value, _ in ConvictedPrisoner.OFFENSE_CHOICES if pattern.lower() in value.lower()}
+            if not matches:
+                raise CommandError(f"No offence matches '{pattern}'.")
+            offenses |= matches
+        return frozenset(offenses)
+
+    def handle(self, *args, **options):
+        station_ids = None
+        if options['station']:
+            station = find_station(options['station'])
+            if station is None:
+                raise CommandError(f"No prison station matches '{options['station']}'.")
+            station_ids = [station.pk]
+        if options['days'] < 1 or options['step'] < 1:
+            raise CommandError('--days and --step must be at least 1.')
+
+        policy = RemissionPolicy(
+            remission_divisor=options['divisor'],
+            amnesty_months=options['amnesty_months'],
+            amnesty_offenses=self.amnesty_offenses(options['offense']),
+            keep_reductions=not options['ignore_reductions'],
+        )
+
+        started = time.perf_counter()
+        population = SentencePopulation.load(station_ids)
+        loaded = time.perf_counter()
+        current = population.simulate(days=options['days'], step=options['step'])
+        projected = population.simulate(policy, days=options['days'], step=options['step'])
+        finished = time.perf_counter()
+
+        self.stdout.write(f"{'Date':<12}{'Current rule':>14}{'Policy':>10}{'Change':>10}")
+        for day, before, after in zip(current.dates, current.totals, projected.totals):
+            self.stdout.write(f'{day:%Y-%m-%d}  {before:>12}{after:>10}{after - before:>+10}')
+
+        names = dict(PrisonStation.objects.filter(pk__in=current.stations).values_list('pk', 'name'))
+        self.stdout.write('')
+        self.stdout.write(f'Releases on remission within {options["days"]} day(s):')
+        self.stdout.write(f"{'Station':<24}{'Current rule':>14}{'Policy':>10}{'Change':>10}")
+        for station_id in sorted(current.stations, key=names.get):
+            before, after = current.releases[station_id], projected.releases[station_id]
+            self.stdout.write(f'{names[station_id][:22]:<24}{before:>14}{after:>10}{after - before:>+10}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Projected {len(population)} sentence(s) over {options["days"]} day(s): '
+            f'loaded in {(loaded - started) * 1000:.0f} ms, simulated in {(finished - loaded) * 1000:.0f} ms.'
+        ))
@@ -0,0 +1,34 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from prison.population import backfill_population, capture_population
+
+
+class Command(BaseCommand):
+    help = (
+        "Record today's population snapshot for every prison station. "
+        "Run nightly from cron; use --backfill-from to rebuild history from "
+        "admissions, transfers and releases."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--backfill-from',
+            type=date.fromisoformat,
+            help='Rebuild daily snapshots from this date (YYYY-MM-DD) up to yesterday.',
+        )
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        start = options['backfill_from']
+
+        if start:
+            if start >= today:
+                raise CommandError('--backfill-from must be a date before today.')
+            rows = backfill_population(start, today - timedelta(days=1))
+            self.stdout.write(f'Backfilled {len(rows)} snapshots from {start} to {today - timedelta(days=1)}.')
+
+        rows = capture_population(today)
+        self.stdout.write(self.style.SUCCESS(f'Recorded {len(rows)} station snapshots for {today}.'))
@@ -0,0 +1,125 @@
+import hashlib
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+SENDFILE_HEADERS = ('X-Sendfile', 'X-Accel-Redirect')
+
+SINGLE_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class UnsatisfiableRange(Exception):
+    pass
+
+
+def byte_range(header, size):
+    """
+    The inclusive (first, last) byte positions a `Range` header asks for
+    from a file of `size` bytes, or None to send the whole file. Multiple
+    and malformed ranges are ignored, as RFC 9110 allows.
+    """
+    match = SINGLE_RANGE.match(header.strip()) if header else None
+    if match is None or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        # bytes=-N: the final N bytes
+        if int(last) == 0:
+            raise UnsatisfiableRange
+        return max(size - int(last), 0), size - 1
+    if last and int(last) < int(first):
+        return None
+    if int(first) >= size:
+        raise UnsatisfiableRange
+    return int(first), min(int(last), size - 1) if last else size - 1
+
+
+def _read_span(path, start, length, block_size=FileResponse.block_size):
+    with open(path, 'rb') as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(block_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _sendfile_response(path, name, content_type):
+    header = settings.MEDIA_SENDFILE_HEADER
+    if header not in SENDFILE_HEADERS:
+        raise ImproperlyConfigured(f'MEDIA_SENDFILE_HEADER must be one of {SENDFILE_HEADERS} or empty.')
+    response = HttpResponse(content_type=content_type)
+    if header == 'X-Sendfile':
+        response[header] = path
+    else:
+        response[header] = settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip('/') + '/' + quote(name)
+    return response
+
+
+def _file_response(request, path, size, content_type, etag, last_modified):
+    span = None
+    if_range = request.headers.get('If-Range')
+    # A stale If-Range means the client's partial copy is outdated: send it all
+    if if_range is None or if_range in (etag, http_date(last_modified)):
+        try:
+            span = byte_range(request.headers.get('Range'), size)
+        except UnsatisfiableRange:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    if span is None:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+    else:
+        first, last = span
+        response = StreamingHttpResponse(
+            _read_span(path, first, last - first + 1), status=206, content_type=content_type,
+        )
+        response['Content-Length'] = last - first + 1
+        response['Content-Range'] = f'bytes {first}-{last}/{size}'
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def serve_stored_file(request, storage, name, immutable=False):
+    """
+    Response for the file `name` in the filesystem `storage`, once the
+    caller has checked the user may see it.
+
+    Validators and caching are always set here, so conditional requests are
+    answered without touching the file. The transfer itself goes to the
+    front server when MEDIA_SENDFILE_HEADER is configured; otherwise Django
+    streams it, honouring single byte ranges. `immutable` marks names that
+    can never refer to different bytes, which browsers may then keep for a
+    year without revalidating.
+    """
+    path = storage.path(name)
+    stat = os.stat(path)
+    last_modified = int(stat.st_mtime)
+    if immutable:
+        etag = f'"{hashlib.sha256(name.encode()).hexdigest()[:32]}"'
+        cache_control = f'private, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    else:
+        etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+        cache_control = 'private, no-cache'
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        if settings.MEDIA_SENDFILE_HEADER:
+            response = _sendfile_response(path, name, content_type)
+        else:
+            response = _file_response(request, path, stat.st_size, content_type, etag, last_modified)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = cache_control
+    return response
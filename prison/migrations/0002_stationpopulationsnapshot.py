@@ -0,0 +1,45 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prison', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='physicalcharacteristics',
+            name='marks_tattoos_scars',
+            field=models.CharField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='remandprisoner',
+            name='offense',
+            field=models.CharField(blank=True, choices=[('Abandonment of child at birth contrary to section 232A of the Penal Code', 'Abandonment of child at birth contrary to section 232A of the Penal Code'), ('Abduction contrary to section 135', 'Abduction contrary to section 135'), ('Abduction of girls under 16 contrary to section 136', 'Abduction of girls under 16 contrary to section 136'), ('Abuse of office contrary to section 95', 'Abuse of office contrary to section 95'), ('Accessory after the fact to felony contrary to section 408 of the Penal Code', 'Accessory after the fact to felony contrary to section 408 of the Penal Code'), ('Accessory after the fact to murder contrary to section 225 of the Penal Code', 'Accessory after the fact to murder contrary to section 225 of the Penal Code'), ('Acts intended to cause grievous harm or prevent arrest contrary to section 235 of the Penal Code', 'Acts intended to cause grievous harm or prevent arrest contrary to section 235 of the Penal Code'), ('Administering poison with intent to harm contrary to section 240 of the Penal Code', 'Administering poison with intent to harm contrary to section 240 of the Penal Code'), ('Adulteration of food/drink contrary to sections 193, 193A', 'Adulteration of food/drink contrary to sections 193, 193A'), ('Adulteration/sale of drugs contrary to sections 195, 195A, 196', 'Adulteration/sale of drugs contrary to sections 195, 195A, 196'), ('Advertisements for stolen property contrary to section 112', 'Advertisements for stolen property contrary to section 112'), ('Aiding prisoners of war to escape contrary to section 44', 'Aiding prisoners of war to escape contrary to section 44'), ('Aiding prisoners to escape contrary to section 117', 'Aiding prisoners to escape contrary to section 117'), ('Aiding prostitution contrary to section 146', 'Aiding prostitution contrary to section 146'), ('Aiding soldiers/policemen in acts of mutiny contrary to section 42', 'Aiding soldiers/policemen in acts of mutiny contrary to section 42'), ('Aiding suicide contrary to section 228 of the Penal Code', 'Aiding suicide contrary to section 228 of the Penal Code'), ('Arson contrary to section 337 of the Penal Code', 'Arson contrary to section 337 of the Penal Code'), ('Assault occasioning actual bodily harm contrary to section 254 of the Penal Code', 'Assault occasioning actual bodily harm contrary to section 254 of the Penal Code'), ('Assault occasioning bodily harm contrary to section 254', 'Assault occasioning bodily harm contrary to section 254'), ('Assault with intent to steal contrary to section 303 of the Penal Code', 'Assault with intent to steal contrary to section 303 of the Penal Code'), ('Assaults on persons protecting wreck contrary to section 255 of the Penal Code', 'Assaults on persons protecting wreck contrary to section 255 of the Penal Code'), ('Assembling for smuggling contrary to section 89', 'Assembling for smuggling contrary to section 89'), ('Attempted arson contrary to section 338 of the Penal Code', 'Attempted arson contrary to section 338 of the Penal Code'), ('Attempted murder contrary to section 223', 'Attempted murder contrary to section 223'), ('Attempted rape contrary to section 134', 'Attempted rape contrary to section 134'), ('Attempted robbery contrary to section 302 of the Penal Code', 'Attempted robbery contrary to section 302 of the Penal Code'), ('Attempted unnatural offenses contrary to section 154', 'Attempted unnatural offenses contrary to section 154'), ('Attempting suicide contrary to section 229 of the Penal Code', 'Attempting suicide contrary to section 229 of the Penal Code'), ('Attempting to injure by explosives contrary to section 239 of the Penal Code', 'Attempting to injure by explosives contrary to section 239 of the Penal Code'), ('Attempting to procure abortion contrary to section 149', 'Attempting to procure abortion contrary to section 149'), ('Being a member of an unlawful society contrary to section 66', 'Being a member of an unlawful society contrary to section 66'), ('Betting house offenses contrary to section 170', 'Betting house offenses contrary to section 170'), ('Bigamy contrary to section 162', 'Bigamy contrary to section 162'), ('Breaking into building and committing felony contrary to section 311 of the Penal Code', 'Breaking into building and committing felony contrary to section 311 of the Penal Code'), ('Burglary/housebreaking contrary to section 309 of the Penal Code', 'Burglary/housebreaking contrary to section 309 of the Penal Code'), ('Buying or disposing of a person as a slave contrary to section 267 of the Penal Code', 'Buying or disposing of a person as a slave contrary to section 267 of the Penal Code'), ('Carrying offensive weapons contrary to section 81', 'Carrying offensive weapons contrary to section 81'), ('Chain letters contrary to section 177', 'Chain letters contrary to section 177'), ('Child stealing contrary to section 167', 'Child stealing contrary to section 167'), ('Clipping coin contrary to section 375 of the Penal Code', 'Clipping coin contrary to section 375 of the Penal Code'), ('Common assault contrary to section 253 of the Penal Code', 'Common assault contrary to section 253 of the Penal Code'), ('Common nuisance contrary to section 168', 'Common nuisance contrary to section 168'), ('Compelling another to take an oath contrary to section 56', 'Compelling another to take an oath contrary to section 56'), ('Compounding felonies contrary to section 110', 'Compounding felonies contrary to section 110'), ('Concealing birth of child contrary to section 232 of the Penal Code', 'Concealing birth of child contrary to section 232 of the Penal Code'), ('Concealment of treason contrary to section 39', 'Concealment of treason contrary to section 39'), ('Conduct likely to breach peace contrary to section 181', 'Conduct likely to breach peace contrary to section 181'), ('Conspiracy to commit felony contrary to section 404 of the Penal Code', 'Conspiracy to commit felony contrary to section 404 of the Penal Code'), ('Conspiracy to commit misdemeanor contrary to section 405 of the Penal Code', 'Conspiracy to commit misdemeanor contrary to section 405 of the Penal Code'), ('Conspiracy to defeat justice contrary to section 109', 'Conspiracy to defeat justice contrary to section 109'), ('Conspiracy to defile contrary to section 148', 'Conspiracy to defile contrary to section 148'), ('Conspiracy to murder contrary to section 227 of the Penal Code', 'Conspiracy to murder contrary to section 227 of the Penal Code'), ('Corrupt practices (secret commissions) contrary to section 396 of the Penal Code', 'Corrupt practices (secret commissions) contrary to section 396 of the Penal Code'), ('Counterfeiting coin contrary to section 372 of the Penal Code', 'Counterfeiting coin contrary to section 372 of the Penal Code'), ('Counterfeiting trade marks contrary to section 388 of the Penal Code', 'Counterfeiting trade marks contrary to section 388 of the Penal Code'), ('Criminal recklessness and negligence contrary to sections 246–252 of the Penal Code', 'Criminal recklessness and negligence contrary to sections 246–252 of the Penal Code'), ('Criminal trespass contrary to section 314 of the Penal Code', 'Criminal trespass contrary to section 314 of the Penal Code'), ('Defamation of foreign dignitaries contrary to section 61', 'Defamation of foreign dignitaries contrary to section 61'), ('Defilement of girls under 16 contrary to section 138', 'Defilement of girls under 16 contrary to section 138'), ('Defilement of idiots/imbeciles contrary to section 139', 'Defilement of idiots/imbeciles contrary to section 139'), ('Demanding property by written threats contrary to section 304 of the Penal Code', 'Demanding property by written threats contrary to section 304 of the Penal Code'), ('Desertion of children contrary to section 164', 'Desertion of children contrary to section 164'), ('Destroying evidence contrary to section 108', 'Destroying evidence contrary to section 108'), ('Detention in a brothel contrary to section 143', 'Detention in a brothel contrary to section 143'), ('Disabling to commit felony/misdemeanor contrary to section 233 of the Penal Code', 'Disabling to commit felony/misdemeanor contrary to section 233 of the Penal Code'), ('Disobedience of statutory duty contrary to section 123', 'Disobedience of statutory duty contrary to section 123'), ('Disturbing religious assemblies contrary to section 128', 'Disturbing religious assemblies contrary to section 128'), ('Drunkenness offenses contrary to section 183', 'Drunkenness offenses contrary to section 183'), ('Endangering safety of persons traveling by railway/road contrary to section 237 of the Penal Code', 'Endangering safety of persons traveling by railway/road contrary to section 237 of the Penal Code'), ('Endangering the environment contrary to section 245A of the Penal Code', 'Endangering the environment contrary to section 245A of the Penal Code'), ('Escape from custody contrary to section 115', 'Escape from custody contrary to section 115'), ('Evasion of liability by false pretence contrary to section 319B of the Penal Code', 'Evasion of liability by false pretence contrary to section 319B of the Penal Code'), ('Exhibition of false light/mark/buoy contrary to section 250 of the Penal Code', 'Exhibition of false light/mark/buoy contrary to section 250 of the Penal Code'), ('Exposing offensive material to a child contrary to section 160D', 'Exposing offensive material to a child contrary to section 160D'), ('Extortion by public officers contrary to section 91', 'Extortion by public officers contrary to section 91'), ('Fabricating evidence contrary to section 105', 'Fabricating evidence contrary to section 105'), ('Failure to supply necessaries contrary to section 242 of the Penal Code', 'Failure to supply necessaries contrary to section 242 of the Penal Code'), ('False assumption of authority contrary to section 98', 'False assumption of authority contrary to section 98'), ('False certificates by public officers contrary to section 96', 'False certificates by public officers contrary to section 96'), ('False claims by officials contrary to section 94', 'False claims by officials contrary to section 94'), ('False information to public servants contrary to section 122', 'False information to public servants contrary to section 122'), ('False statements for registers of births, deaths, and marriages contrary to section 370 of the Penal Code', 'False statements for registers of births, deaths, and marriages contrary to section 370 of the Penal Code'), ('False swearing contrary to section 106', 'False swearing contrary to section 106'), ('Falsifying warrants for money payable under public authority contrary to section 367 of the Penal Code', 'Falsifying warrants for money payable under public authority contrary to section 367 of the Penal Code'), ('Felling or damaging trees in forest reserves contrary to section 64 of the Forestry Act', 'Felling or damaging trees in forest reserves contrary to section 64 of the Forestry Act'), ('Fighting in public contrary to section 84', 'Fighting in public contrary to section 84'), ('Forcible detainer contrary to section 83', 'Forcible detainer contrary to section 83'), ('Forcible entry contrary to section 82', 'Forcible entry contrary to section 82'), ('Foreign enlistment contrary to section 62', 'Foreign enlistment contrary to section 62'), ('Forgery contrary to section 356 of the Penal Code', 'Forgery contrary to section 356 of the Penal Code'), ('Forging or altering forestry documents contrary to section 70 of the Forestry Act', 'Forging or altering forestry documents contrary to section 70 of the Forestry Act'), ('Fouling water/air contrary to sections 197, 198', 'Fouling water/air contrary to sections 197, 198'), ('Fraud other than false pretence contrary to section 319A of the Penal Code', 'Fraud other than false pretence contrary to section 319A of the Penal Code'), ('Frauds by public officers contrary to section 120', 'Frauds by public officers contrary to section 120'), ('Fraudulent appropriation of power/water/telecommunication services contrary to sections 298, 298A, and 298B of the Penal Code', 'Fraudulent appropriation of power/water/telecommunication services contrary to sections 298, 298A, and 298B of the Penal Code'), ('Fraudulent pretence of marriage contrary to section 161', 'Fraudulent pretence of marriage contrary to section 161'), ('Fraudulent trading by a company contrary to section 336A of the Penal Code', 'Fraudulent trading by a company contrary to section 336A of the Penal Code'), ('Genocide contrary to section 217A of the Penal Code', 'Genocide contrary to section 217A of the Penal Code'), ('Grievous harm contrary to section 238 of the Penal Code', 'Grievous harm contrary to section 238 of the Penal Code'), ('Habitual dealing in slaves contrary to section 268 of the Penal Code', 'Habitual dealing in slaves contrary to section 268 of the Penal Code'), ('Harming wildlife or collecting eggs contrary to section 66 of the Forestry Act', 'Harming wildlife or collecting eggs contrary to section 66 of the Forestry Act'), ('Hindering burial of a body contrary to section 131', 'Hindering burial of a body contrary to section 131'), ('Idle and disorderly conduct contrary to section 180', 'Idle and disorderly conduct contrary to section 180'), ('Illegal dumping of litter or waste contrary to section 72 of the Forestry Act', 'Illegal dumping of litter or waste contrary to section 72 of the Forestry Act'), ('Illegal possession or trafficking of forest produce contrary to section 68 of the Forestry Act', 'Illegal possession or trafficking of forest produce contrary to section 68 of the Forestry Act'), ('Illegal removal of indigenous timber from private land contrary to section 83 of the Forestry Act', 'Illegal removal of indigenous timber from private land contrary to section 83 of the Forestry Act'), ('Incest by females contrary to section 158', 'Incest by females contrary to section 158'), ('Incest by males contrary to section 157', 'Incest by males contrary to section 157'), ('Inciting to mutiny contrary to section 41', 'Inciting to mutiny contrary to section 41'), ('Indecent assault on boys under 14 contrary to section 155', 'Indecent assault on boys under 14 contrary to section 155'), ('Indecent assault on females contrary to section 137', 'Indecent assault on females contrary to section 137'), ('Indecent assault on idiots/imbeciles contrary to section 155A', 'Indecent assault on idiots/imbeciles contrary to section 155A'), ('Indecent practice with a child contrary to section 160C', 'Indecent practice with a child contrary to section 160C'), ('Indecent practices between females contrary to section 137A', 'Indecent practices between females contrary to section 137A'), ('Indecent practices between males contrary to section 156', 'Indecent practices between males contrary to section 156'), ('Inducing soldiers/policemen to desert contrary to section 43', 'Inducing soldiers/policemen to desert contrary to section 43'), ('Infanticide contrary to section 230 of the Penal Code', 'Infanticide contrary to section 230 of the Penal Code'), ('Insult to religion contrary to section 127', 'Insult to religion contrary to section 127'), ('Insulting language contrary to section 182', 'Insulting language contrary to section 182'), ('Intimidation contrary to section 88', 'Intimidation contrary to section 88'), ('Keeping a brothel contrary to section 147', 'Keeping a brothel contrary to section 147'), ('Keeping a gaming house contrary to section 169', 'Keeping a gaming house contrary to section 169'), ('Kidnapping child under 16 to steal property contrary to section 265 of the Penal Code', 'Kidnapping child under 16 to steal property contrary to section 265 of the Penal Code'), ('Kidnapping from Malawi contrary to section 260 of the Penal Code', 'Kidnapping from Malawi contrary to section 260 of the Penal Code'), ('Kidnapping from lawful guardianship contrary to section 258', 'Kidnapping from lawful guardianship contrary to section 258'), ('Kidnapping or abducting for grievous harm, ransom, slavery, etc. contrary to section 263 of the Penal Code', 'Kidnapping or abducting for grievous harm, ransom, slavery, etc. contrary to section 263 of the Penal Code'), ('Kidnapping or abducting to confine person contrary to section 262 of the Penal Code', 'Kidnapping or abducting to confine person contrary to section 262 of the Penal Code'), ('Kidnapping or abducting to murder contrary to section 261 of the Penal Code', 'Kidnapping or abducting to murder contrary to section 261 of the Penal Code'), ('Killing unborn child contrary to section 231 of the Penal Code', 'Killing unborn child contrary to section 231 of the Penal Code'), ('Libel contrary to section 200', 'Libel contrary to section 200'), ('Libel contrary to section 200 of the Penal Code', 'Libel contrary to section 200 of the Penal Code'), ('Living on earnings of prostitution contrary to section 145', 'Living on earnings of prostitution contrary to section 145'), ('Making off without payment contrary to section 319C of the Penal Code', 'Making off without payment contrary to section 319C of the Penal Code'), ('Managing an unlawful society contrary to section 65', 'Managing an unlawful society contrary to section 65'), ('Manslaughter contrary to section 208 of the Penal Code', 'Manslaughter contrary to section 208 of the Penal Code'), ('Marriage ceremony fraud contrary to section 163', 'Marriage ceremony fraud contrary to section 163'), ('Money laundering contrary to section 331A of the Penal Code', 'Money laundering contrary to section 331A of the Penal Code'), ('Murder contrary to section 209 of the Penal Code', 'Murder contrary to section 209 of the Penal Code'), ('Neglect of official duty contrary to section 121', 'Neglect of official duty contrary to section 121'), ('Neglecting to provide for children contrary to section 165', 'Neglecting to provide for children contrary to section 165'), ('Negligent spread of disease contrary to section 192', 'Negligent spread of disease contrary to section 192'), ('Obscene materials contrary to section 179', 'Obscene materials contrary to section 179'), ('Obstructing forestry officers contrary to section 69 of the Forestry Act', 'Obstructing forestry officers contrary to section 69 of the Forestry Act'), ('Official corruption contrary to section 90', 'Official corruption contrary to section 90'), ('Operating wood processing industries without permit contrary to section 82 of the Forestry Act', 'Operating wood processing industries without permit contrary to section 82 of the Forestry Act'), ('Organizing/managing pools contrary to section 176', 'Organizing/managing pools contrary to section 176'), ('Other', 'Other'), ('Other unlawful oaths to commit offenses contrary to section 55', 'Other unlawful oaths to commit offenses contrary to section 55'), ('Passing valueless cheque contrary to section 319D of the Penal Code', 'Passing valueless cheque contrary to section 319D of the Penal Code'), ('Perjury contrary to section 101', 'Perjury contrary to section 101'), ('Permitting defilement on premises contrary to section 142', 'Permitting defilement on premises contrary to section 142'), ('Permitting prisoners to escape contrary to section 116', 'Permitting prisoners to escape contrary to section 116'), ('Personating public officers contrary to section 99', 'Personating public officers contrary to section 99'), ('Personation contrary to section 389 of the Penal Code', 'Personation contrary to section 389 of the Penal Code'), ('Piracy contrary to section 63', 'Piracy contrary to section 63'), ('Possessing weapons or traps in forest reserves contrary to section 71 of the Forestry Act', 'Possessing weapons or traps in forest reserves contrary to section 71 of the Forestry Act'), ('Possession of housebreaking instruments contrary to section 313 of the Penal Code', 'Possession of housebreaking instruments contrary to section 313 of the Penal Code'), ('Preventing escape from wreck contrary to section 236 of the Penal Code', 'Preventing escape from wreck contrary to section 236 of the Penal Code'), ('Procuration contrary to section 140', 'Procuration contrary to section 140'), ('Procuring child for harmful entertainment contrary to section 160F', 'Procuring child for harmful entertainment contrary to section 160F'), ('Procuring defilement by threats/fraud contrary to section 141', 'Procuring defilement by threats/fraud contrary to section 141'), ('Promoting prostitution contrary to section 147A', 'Promoting prostitution contrary to section 147A'), ('Promoting war among groups contrary to section 40', 'Promoting war among groups contrary to section 40'), ('Proposing violence at assemblies contrary to section 87', 'Proposing violence at assemblies contrary to section 87'), ('Public officers receiving property to show favor contrary to section 92', 'Public officers receiving property to show favor contrary to section 92'), ('Publication of defamatory matter concerning a dead person without consent contrary to section 201 of the Penal Code', 'Publication of defamatory matter concerning a dead person without consent contrary to section 201 of the Penal Code'), ('Publication of false news contrary to section 60', 'Publication of false news contrary to section 60'), ('Rape contrary to section 132', 'Rape contrary to section 132'), ('Receiving stolen property contrary to section 328 of the Penal Code', 'Receiving stolen property contrary to section 328 of the Penal Code'), ('Reckless/negligent acts contrary to section 246', 'Reckless/negligent acts contrary to section 246'), ('Recording a child in prohibited acts contrary to section 160E', 'Recording a child in prohibited acts contrary to section 160E'), ('Rescue contrary to section 114', 'Rescue contrary to section 114'), ('Riot contrary to section 73', 'Riot contrary to section 73'), ('Rioters demolishing buildings contrary to section 78', 'Rioters demolishing buildings contrary to section 78'), ('Rioters injuring property contrary to section 79', 'Rioters injuring property contrary to section 79'), ('Robbery contrary to section 300 of the Penal Code', 'Robbery contrary to section 300 of the Penal Code'), ('Rogues and vagabonds contrary to section 184', 'Rogues and vagabonds contrary to section 184'), ('Sale of noxious food/drink contrary to section 194', 'Sale of noxious food/drink contrary to section 194'), ('Seditious offenses contrary to section 51', 'Seditious offenses contrary to section 51'), ('Self-abortion by a pregnant woman contrary to section 150', 'Self-abortion by a pregnant woman contrary to section 150'), ('Sexual activity with a child contrary to section 160B', 'Sexual activity with a child contrary to section 160B'), ('Sexual intercourse with minors under care contrary to section 159A', 'Sexual intercourse with minors under care contrary to section 159A'), ('Smuggling forest produce (import/export without permit) contrary to section 73 of the Forestry Act', 'Smuggling forest produce (import/export without permit) contrary to section 73 of the Forestry Act'), ('Soliciting public officers to fail duties contrary to section 125', 'Soliciting public officers to fail duties contrary to section 125'), ('Soliciting to break the law contrary to section 124', 'Soliciting to break the law contrary to section 124'), ('Stealing by persons in public service contrary to section 283 of the Penal Code', 'Stealing by persons in public service contrary to section 283 of the Penal Code'), ('Stealing cattle contrary to section 281 of the Penal Code', 'Stealing cattle contrary to section 281 of the Penal Code'), ('Stealing from the person/goods in transit contrary to section 282 of the Penal Code', 'Stealing from the person/goods in transit contrary to section 282 of the Penal Code'), ('Stealing postal matter contrary to section 280 of the Penal Code', 'Stealing postal matter contrary to section 280 of the Penal Code'), ('Stealing wills contrary to section 279 of the Penal Code', 'Stealing wills contrary to section 279 of the Penal Code'), ('Stupefying to commit felony/misdemeanor contrary to section 234 of the Penal Code', 'Stupefying to commit felony/misdemeanor contrary to section 234 of the Penal Code'), ('Subornation of perjury contrary to section 101(3)', 'Subornation of perjury contrary to section 101(3)'), ('Supplying abortion drugs/instruments contrary to section 151', 'Supplying abortion drugs/instruments contrary to section 151'), ('Theft contrary to section 278 of the Penal Code', 'Theft contrary to section 278 of the Penal Code'), ('Threat of injury to public servants contrary to section 100', 'Threat of injury to public servants contrary to section 100'), ('Threatening to burn/destroy property contrary to section 350 of the Penal Code', 'Threatening to burn/destroy property contrary to section 350 of the Penal Code'), ('Threatening violence contrary to section 86', 'Threatening violence contrary to section 86'), ('Treason contrary to section 38', 'Treason contrary to section 38'), ('Trespassing on burial places contrary to section 129', 'Trespassing on burial places contrary to section 129'), ('Unauthorized administration of oaths contrary to section 97', 'Unauthorized administration of oaths contrary to section 97'), ('Unauthorized charcoal production contrary to section 81 of the Forestry Act', 'Unauthorized charcoal production contrary to section 81 of the Forestry Act'), ('Unauthorized fires in forest areas contrary to section 65 of the Forestry Act', 'Unauthorized fires in forest areas contrary to section 65 of the Forestry Act'), ('Unauthorized use of land premises contrary to section 316 of the Penal Code', 'Unauthorized use of land premises contrary to section 316 of the Penal Code'), ('Unlawful assembly contrary to section 71', 'Unlawful assembly contrary to section 71'), ('Unlawful compulsory labour contrary to section 269 of the Penal Code', 'Unlawful compulsory labour contrary to section 269 of the Penal Code'), ('Unlawful drilling contrary to section 59', 'Unlawful drilling contrary to section 59'), ('Unlawful oaths to commit capital offenses contrary to section 54', 'Unlawful oaths to commit capital offenses contrary to section 54'), ('Unlawful use of vehicles/animals contrary to section 299 of the Penal Code', 'Unlawful use of vehicles/animals contrary to section 299 of the Penal Code'), ('Unnatural offenses contrary to section 153', 'Unnatural offenses contrary to section 153'), ('Uttering counterfeit coin contrary to section 379 of the Penal Code', 'Uttering counterfeit coin contrary to section 379 of the Penal Code'), ('Uttering false document contrary to section 360 of the Penal Code', 'Uttering false document contrary to section 360 of the Penal Code'), ('Violating pest and disease control rules contrary to section 67 of the Forestry Act', 'Violating pest and disease control rules contrary to section 67 of the Forestry Act'), ('Wearing uniform without authority contrary to section 191', 'Wearing uniform without authority contrary to section 191'), ('Wilful damage to survey/boundary marks contrary to section 348 of the Penal Code', 'Wilful damage to survey/boundary marks contrary to section 348 of the Penal Code'), ('Wounding contrary to section 241 of the Penal Code', 'Wounding contrary to section 241 of the Penal Code'), ('Wounding religious feelings contrary to section 130', 'Wounding religious feelings contrary to section 130'), ('Written threats to murder contrary to section 226 of the Penal Code', 'Written threats to murder contrary to section 226 of the Penal Code'), ('Wrongfully concealing or confining kidnapped/abducted person contrary to section 264 of the Penal Code', 'Wrongfully concealing or confining kidnapped/abducted person contrary to section 264 of the Penal Code')], max_length=150, null=True),
+        ),
+        migrations.CreateModel(
+            name='StationPopulationSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('convicted', models.PositiveIntegerField(default=0)),
+                ('remand', models.PositiveIntegerField(default=0)),
+                ('male_convicted', models.PositiveIntegerField(default=0)),
+                ('female_convicted', models.PositiveIntegerField(default=0)),
+                ('male_remand', models.PositiveIntegerField(default=0)),
+                ('female_remand', models.PositiveIntegerField(default=0)),
+                ('capacity', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now=True)),
+                ('station', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='population_snapshots', to='prison.prisonstation')),
+            ],
+            options={
+                'ordering': ['date'],
+                'constraints': [models.UniqueConstraint(fields=('station', 'date'), name='unique_station_population_snapshot')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prison', '0002_stationpopulationsnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StationCounters',
+            fields=[
+                ('station', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='counters', serialize=False, to='prison.prisonstation')),
+                ('total', models.IntegerField(default=0)),
+                ('convicted', models.IntegerField(default=0)),
+                ('remand', models.IntegerField(default=0)),
+                ('male', models.IntegerField(default=0)),
+                ('female', models.IntegerField(default=0)),
+                ('other_sex', models.IntegerField(default=0)),
+                ('foreigners', models.IntegerField(default=0)),
+                ('risk_high', models.IntegerField(default=0)),
+                ('risk_medium', models.IntegerField(default=0)),
+                ('risk_low', models.IntegerField(default=0)),
+                ('risk_need_support', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Station Counters',
+                'verbose_name_plural': 'Station Counters',
+            },
+        ),
+    ]
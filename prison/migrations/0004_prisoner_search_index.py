@@ -0,0 +1,133 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:49
+
+import re
+
+import django.db.models.deletion
+import prison.search
+from django.db import migrations, models
+
+# Frozen copies of prison.search as it stood when this migration was
+# written, so later changes there cannot change what this migration does
+
+SEARCH_RANK = 'bm25(10.0, 4.0, 2.0, 5.0, 1.0)'
+
+_PHONETIC_DIGRAPHS = [
+    ('tch', 'X'), ('ch', 'X'), ('sh', 'X'), ('ph', 'F'), ('gh', 'K'), ('ck', 'K'),
+    ('kh', 'K'), ('th', 'T'), ('bh', 'B'), ('dh', 'D'), ('mb', 'M'), ('ng', 'N'),
+]
+_PHONETIC_LETTERS = {
+    'b': 'B', 'p': 'P', 'd': 'T', 't': 'T', 'g': 'K', 'k': 'K', 'c': 'K', 'q': 'K',
+    'j': 'J', 'f': 'F', 'v': 'F', 's': 'S', 'z': 'S', 'x': 'KS', 'l': 'L', 'r': 'L',
+    'm': 'M', 'n': 'N',
+}
+_VOWELS = set('aeiouyhw')
+
+
+def phonetic_key(word):
+    word = re.sub('[^a-z]', '', word.lower())
+    if not word:
+        return ''
+    for digraph, sound in _PHONETIC_DIGRAPHS:
+        word = word.replace(digraph, sound)
+
+    key = 'A' if word[0] in _VOWELS else ''
+    for letter in word:
+        sound = letter if letter.isupper() else _PHONETIC_LETTERS.get(letter, '')
+        if sound and not key.endswith(sound):
+            key += sound
+    return key
+
+
+def phonetic_name(*names):
+    keys = [phonetic_key(word) for name in names if name for word in name.split()]
+    return ' '.join(key for key in keys if key)
+
+
+COLUMNS = 'prisoner_number, first_name, middle_name, surname, phonetic_name'
+
+CREATE_SEARCH_INDEX = [
+    f"""
+    CREATE VIRTUAL TABLE prison_prisoner_fts USING fts5(
+        {COLUMNS}, content='prison_prisoner', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    f"INSERT INTO prison_prisoner_fts(prison_prisoner_fts, rank) VALUES ('rank', '{SEARCH_RANK}')",
+    f"""
+    CREATE TRIGGER prison_prisoner_fts_insert AFTER INSERT ON prison_prisoner BEGIN
+        INSERT INTO prison_prisoner_fts(rowid, {COLUMNS})
+        VALUES (new.id, new.prisoner_number, new.first_name, new.middle_name, new.surname, new.phonetic_name);
+    END
+    """,
+    f"""
+    CREATE TRIGGER prison_prisoner_fts_delete AFTER DELETE ON prison_prisoner BEGIN
+        INSERT INTO prison_prisoner_fts(prison_prisoner_fts, rowid, {COLUMNS})
+        VALUES ('delete', old.id, old.prisoner_number, old.first_name, old.middle_name, old.surname, old.phonetic_name);
+    END
+    """,
+    f"""
+    CREATE TRIGGER prison_prisoner_fts_update AFTER UPDATE OF {COLUMNS} ON prison_prisoner BEGIN
+        INSERT INTO prison_prisoner_fts(prison_prisoner_fts, rowid, {COLUMNS})
+        VALUES ('delete', old.id, old.prisoner_number, old.first_name, old.middle_name, old.surname, old.phonetic_name);
+        INSERT INTO prison_prisoner_fts(rowid, {COLUMNS})
+        VALUES (new.id, new.prisoner_number, new.first_name, new.middle_name, new.surname, new.phonetic_name);
+    END
+    """,
+]
+
+DROP_SEARCH_INDEX = [
+    'DROP TRIGGER IF EXISTS prison_prisoner_fts_insert',
+    'DROP TRIGGER IF EXISTS prison_prisoner_fts_delete',
+    'DROP TRIGGER IF EXISTS prison_prisoner_fts_update',
+    'DROP TABLE IF EXISTS prison_prisoner_fts',
+]
+
+
+def create_search_index(apps, schema_editor):
+    Prisoner = apps.get_model('prison', 'Prisoner')
+    prisoners = list(Prisoner.objects.only('first_name', 'middle_name', 'surname'))
+    for prisoner in prisoners:
+        prisoner.phonetic_name = phonetic_name(prisoner.first_name, prisoner.middle_name, prisoner.surname)
+    Prisoner.objects.bulk_update(prisoners, ['phonetic_name'], batch_size=1000)
+
+    # Full-text search is SQLite-only; other backends fall back to icontains
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in CREATE_SEARCH_INDEX:
+        schema_editor.execute(statement)
+    schema_editor.execute("INSERT INTO prison_prisoner_fts(prison_prisoner_fts) VALUES ('rebuild')")
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP_SEARCH_INDEX:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prison', '0003_stationcounters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrisonerSearchIndex',
+            fields=[
+                ('prisoner', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='prison.prisoner')),
+                ('document', prison.search.SearchDocumentField(db_column='prison_prisoner_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'prison_prisoner_fts',
+                'managed': False,
+            },
+        ),
+        migrations.AddField(
+            model_name='prisoner',
+            name='phonetic_name',
+            field=models.CharField(blank=True, editable=False, max_length=300),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.1 on 2026-10-18 16:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prison', '0004_prisoner_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['-timestamp'], name='activitylog_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['model', 'object_id'], name='activitylog_object_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='convictedprisoner',
+            index=models.Index(fields=['date_of_release_on_remission'], name='convicted_release_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prisoner',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['prison_station', 'prisoner_class', 'sex'], name='prisoner_active_station_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prisoner',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['prison_station', '-date_admitted', '-id'], name='prisoner_station_admitted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prisoner',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-date_admitted', '-id'], name='prisoner_active_admitted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='remandprisoner',
+            index=models.Index(fields=['next_court_date'], name='remand_next_court_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.1 on 2026-10-18 17:06
+
+import prison.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prison', '0006_reportjob'),
+    ]
+
+    # Storage does not touch the schema, and letting SQLite rebuild the
+    # prisoner table here would drop the search index triggers from 0004.
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='prisoner',
+                    name='image',
+                    field=models.ImageField(blank=True, null=True, storage=prison.storage.ContentAddressedStorage(), upload_to='prisoner_images/'),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.1 on 2026-10-18 17:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_release_calendar(apps, schema_editor):
+    ConvictedPrisoner = apps.get_model('prison', 'ConvictedPrisoner')
+    StationReleaseDay = apps.get_model('prison', 'StationReleaseDay')
+    days = (
+        ConvictedPrisoner.objects.filter(prisoner__is_active=True, date_of_release_on_remission__isnull=False)
+        .values('prisoner__prison_station_id', 'date_of_release_on_remission')
+        .annotate(releases=Count('pk'))
+        .order_by()
+    )
+    StationReleaseDay.objects.bulk_create(
+        [
+            StationReleaseDay(
+                station_id=day['prisoner__prison_station_id'], date=day['date_of_release_on_remission'],
+                releases=day['releases'],
+            )
+            for day in days
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prison', '0007_prisoner_image_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StationReleaseDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('releases', models.PositiveIntegerField(default=0)),
+                ('station', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='release_days', to='prison.prisonstation')),
+            ],
+            options={
+                'ordering': ['date'],
+                'indexes': [models.Index(fields=['date', 'station'], name='release_day_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('station', 'date'), name='unique_station_release_day')],
+            },
+        ),
+        migrations.RunPython(fill_release_calendar, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 17:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prison', '0009_reportjob_heartbeat'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reportjob',
+            name='kind',
+            field=models.CharField(choices=[('prisoner_report', 'Prisoner Report'), ('upcoming_releases', 'Upcoming Releases'), ('lockup_list', 'Lockup List'), ('transfer_list', 'Prisoner Transfers')], max_length=30),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 18:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prison', '0010_reportjob_listing_kinds'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='stationpopulationsnapshot',
+            old_name='created_at',
+            new_name='updated_at',
+        ),
+    ]
@@ -1,11 +1,16 @@
 from django.db import models
 from django.utils import timezone
 from django.contrib.auth import get_user_model
-from dateutil.relativedelta import relativedelta
 from django.core.validators import MinValueValidator
 from django.db.models import Count, Sum
 import math
+import uuid
 from django.conf import settings
+from django.db.models.fields.files import FieldFile
+from .images import derivative_name, derivatives_exist, generate_derivatives, normalise_upload
+from .search import SEARCH_TABLE, SearchDocumentField, phonetic_name
+from .sentences import release_dates
+from .storage import prisoner_image_storage
 
 
 User = get_user_model()
@@ -55,11 +60,45 @@ class Prisoner(models.Model):
     prison_station = models.ForeignKey(PrisonStation, on_delete=models.CASCADE)
     block_number = models.CharField(max_length=10)
     cell_number = models.CharField(max_length=10)
-    image = models.ImageField(upload_to='prisoner_images/', blank=True, null=True)
+    image = models.ImageField(upload_to='prisoner_images/', storage=prisoner_image_storage, blank=True, null=True)
     date_admitted = models.DateField(default=timezone.now)
     is_active = models.BooleanField(default=True)
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='created_prisoners')
     last_modified = models.DateTimeField(auto_now=True)
+    phonetic_name = models.CharField(max_length=300, blank=True, editable=False)
+    
+    class Meta:
+        indexes = [
+            # Station-scoped headcounts and lockup aggregates only ever look at active prisoners
+            models.Index(
+                fields=['prison_station', 'prisoner_class', 'sex'],
+                condition=models.Q(is_active=True), name='prisoner_active_station_idx',
+            ),
+            # Keyset pages of the prisoner list, per station and across all stations
+            models.Index(
+                fields=['prison_station', '-date_admitted', '-id'],
+                condition=models.Q(is_active=True), name='prisoner_station_admitted_idx',
+            ),
+            models.Index(
+                fields=['-date_admitted', '-id'],
+                condition=models.Q(is_active=True), name='prisoner_active_admitted_idx',
+            ),
+        ]
+    
+    def save(self, *args, **kwargs):
+        self.phonetic_name = phonetic_name(self.first_name, self.middle_name, self.surname)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'first_name', 'middle_name', 'surname'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'phonetic_name'}
+        
+        # A fresh upload is stored upright and without EXIF, then resized
+        new_image = bool(self.image) and not self.image._committed
+        if new_image:
+            self.image.save(self.image.name, normalise_upload(self.image), save=False)
+        super().save(*args, **kwargs)
+        # Identical photos share one stored file, and so one set of derivatives
+        if new_image and not derivatives_exist(self.image):
+            generate_derivatives(self.image)
     
     def __str__(self):
         return f"{self.prisoner_number} - {self.first_name} {self.surname}"
@@ -67,6 +106,27 @@ class Prisoner(models.Model):
     @property
     def full_name(self):
         return f"{self.first_name} {self.middle_name} {self.surname}".strip()
+    
+    def image_derivative(self, kind):
+        """The resized `kind` copy of the photo, or the original if it has not been generated yet."""
+        if not self.image:
+            return self.image
+        name = derivative_name(self.image.name, kind)
+        if not self.image.storage.exists(name):
+            return self.image
+        return FieldFile(self, self.image.field, name)
+    
+    @property
+    def image_thumbnail(self):
+        return self.image_derivative('thumbnail')
+    
+    @property
+    def image_detail(self):
+        return self.image_derivative('detail')
+    
+    @property
+    def image_report(self):
+        return self.image_derivative('report')
 
 class ConvictedPrisoner(models.Model):
     OFFENSE_CHOICES = sorted([ # Sorted alphabetically for better UX
@@ -306,37 +366,17 @@ class ConvictedPrisoner(models.Model):
     reduction_notes = models.CharField(blank=True)
     
     def save(self, *args, **kwargs):
-        # Average days in a month (365.25 days / 12 months)
-        AVG_DAYS_PER_MONTH = 30.4375
-        
         if self.wef_date and self.sentence:
-            # Step 1: Subtract 1 day from WEF date
-            adjusted_wef = self.wef_date - relativedelta(days=1)
-            
-            # Step 2: Add sentence (handle non-integer months)
-            sentence_months = int(self.sentence)
-            sentence_fraction = self.sentence - sentence_months
-            sentence_days = int(sentence_fraction * AVG_DAYS_PER_MONTH)
-            self.release_date = adjusted_wef + relativedelta(months=sentence_months, days=sentence_days)
-        
-        if self.release_date:
-            # Step 3: Calculate remission (1/3 of sentence)
-            remission_months_total = self.sentence / 3
-            remission_months = int(remission_months_total)
-            remission_fraction = remission_months_total - remission_months
-            remission_days = int(remission_fraction * AVG_DAYS_PER_MONTH)
-            
-            # Step 4: Subtract remission from release_date
-            self.date_of_release_on_remission = self.release_date - relativedelta(months=remission_months, days=remission_days)
-        
-        # If reduction_months is provided, apply it as additional reduction
-        if self.reduction_months and self.date_of_release_on_remission:
-            reduction_months = int(self.reduction_months)
-            reduction_fraction = self.reduction_months - reduction_months
-            reduction_days = int(reduction_fraction * AVG_DAYS_PER_MONTH)
-            self.date_of_release_on_remission -= relativedelta(months=reduction_months, days=reduction_days)
+            self.date_of_release, self.date_of_release_on_remission = release_dates(
+                self.wef_date, self.sentence, self.reduction_months,
+            )
         
         super().save(*args, **kwargs)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['date_of_release_on_remission'], name='convicted_release_idx'),
+        ]
 
 class RemandPrisoner(models.Model):
     OFFENSE_CHOICES = sorted([ # Sorted alphabetically for better UX
@@ -567,6 +607,11 @@ class RemandPrisoner(models.Model):
     remand_extensions = models.PositiveIntegerField(default=0)
     offense = models.CharField(max_length=150, choices=OFFENSE_CHOICES, blank=True, null=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['next_court_date'], name='remand_next_court_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.prisoner.prisoner_number} - {self.court_case_number}"
 
@@ -737,6 +782,10 @@ class ActivityLog(models.Model):
     
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['-timestamp'], name='activitylog_timestamp_idx'),
+            models.Index(fields=['model', 'object_id'], name='activitylog_object_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user} {self.action}d {self.model} {self.object_id} at {self.timestamp}"
@@ -752,4 +801,137 @@ class ReleaseOnRemission(models.Model):
     processed_date = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
-        return f"Release on remission for {self.prisoner.prisoner_number}"
\ No newline at end of file
+        return f"Release on remission for {self.prisoner.prisoner_number}"
+
+
+class StationPopulationSnapshot(models.Model):
+    station = models.ForeignKey(PrisonStation, on_delete=models.CASCADE, related_name='population_snapshots')
+    date = models.DateField()
+    total = models.PositiveIntegerField(default=0)
+    convicted = models.PositiveIntegerField(default=0)
+    remand = models.PositiveIntegerField(default=0)
+    male_convicted = models.PositiveIntegerField(default=0)
+    female_convicted = models.PositiveIntegerField(default=0)
+    male_remand = models.PositiveIntegerField(default=0)
+    female_remand = models.PositiveIntegerField(default=0)
+    capacity = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(fields=['station', 'date'], name='unique_station_population_snapshot'),
+        ]
+    
+    @property
+    def occupancy_rate(self):
+        return round(self.total / self.capacity * 100, 2) if self.capacity else None
+    
+    def __str__(self):
+        return f"{self.station} population on {self.date}: {self.total}/{self.capacity}"
+
+class StationCounters(models.Model):
+    station = models.OneToOneField(PrisonStation, on_delete=models.CASCADE, primary_key=True, related_name='counters')
+    total = models.IntegerField(default=0)
+    convicted = models.IntegerField(default=0)
+    remand = models.IntegerField(default=0)
+    male = models.IntegerField(default=0)
+    female = models.IntegerField(default=0)
+    other_sex = models.IntegerField(default=0)
+    foreigners = models.IntegerField(default=0)
+    risk_high = models.IntegerField(default=0)
+    risk_medium = models.IntegerField(default=0)
+    risk_low = models.IntegerField(default=0)
+    risk_need_support = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Station Counters"
+        verbose_name_plural = "Station Counters"
+    
+    def __str__(self):
+        return f"Counters for {self.station}"
+
+class StationReleaseDay(models.Model):
+    """
+    How many active convicted prisoners at a station are due for release on
+    remission on a given day. Kept in step by prison.signals and rebuilt by
+    the rebuild_release_calendar command (see prison/release_calendar.py).
+    """
+    station = models.ForeignKey(PrisonStation, on_delete=models.CASCADE, related_name='release_days')
+    date = models.DateField()
+    releases = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(fields=['station', 'date'], name='unique_station_release_day'),
+        ]
+        indexes = [
+            models.Index(fields=['date', 'station'], name='release_day_date_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.station} releases on {self.date}: {self.releases}"
+
+class PrisonerSearchIndex(models.Model):
+    """
+    Read-only view of the SQLite FTS5 index over prisoner names and numbers.
+
+    The table is created by migration 0004 and kept in step with
+    prison_prisoner by triggers; `rank` is the bm25 score of the current
+    MATCH (lower is better).
+    """
+    prisoner = models.OneToOneField(
+        Prisoner, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid',
+        db_constraint=False, related_name='search_index',
+    )
+    document = SearchDocumentField(db_column=SEARCH_TABLE)
+    rank = models.FloatField()
+    
+    class Meta:
+        managed = False
+        db_table = SEARCH_TABLE
+
+class ReportJob(models.Model):
+    KIND_CHOICES = [
+        ('prisoner_report', 'Prisoner Report'),
+        ('upcoming_releases', 'Upcoming Releases'),
+        ('lockup_list', 'Lockup List'),
+        ('transfer_list', 'Prisoner Transfers'),
+    ]
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    progress = models.PositiveSmallIntegerField(default=0)
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='report_jobs')
+    output = models.FileField(upload_to='reports/', blank=True)
+    filename = models.CharField(max_length=200, blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    worker = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='reportjob_status_idx'),
+        ]
+    
+    @property
+    def is_finished(self):
+        return self.status in ('done', 'failed')
+    
+    def __str__(self):
+        return f"{self.get_kind_display()} job {self.id} ({self.status})"
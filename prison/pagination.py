@@ -0,0 +1,112 @@
+import base64
+import json
+from dataclasses import dataclass, field
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+PRISONER_LIST_ORDERING = ('-date_admitted', '-id')
+PRISONER_LIST_PAGE_SIZE = 25
+
+
+@dataclass
+class KeysetPage:
+    object_list: list = field(default_factory=list)
+    has_next: bool = False
+    has_previous: bool = False
+    next_cursor: str = None
+    previous_cursor: str = None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+
+def encode_cursor(ordering, values):
+    payload = {'order': ','.join(ordering), 'key': values}
+    return base64.urlsafe_b64encode(json.dumps(payload, cls=DjangoJSONEncoder).encode()).decode().rstrip('=')
+
+
+def decode_cursor(ordering, cursor):
+    """Return the key values in `cursor`, rejecting cursors issued for another ordering."""
+    padded = cursor + '=' * (-len(cursor) % 4)
+    payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    if not isinstance(payload, dict) or payload.get('order') != ','.join(ordering):
+        raise ValueError('Cursor was issued for a different ordering.')
+    return payload['key']
+
+
+def _field_name(ordering):
+    return ordering.lstrip('-')
+
+
+def _reverse(ordering):
+    return tuple(key[1:] if key.startswith('-') else f'-{key}' for key in ordering)
+
+
+def _after(ordering, values):
+    """Q matching rows that sort strictly after `values` under `ordering`."""
+    if len(values) != len(ordering):
+        raise ValueError('Cursor does not match the ordering.')
+    condition = Q()
+    equal = Q()
+    for key, value in zip(ordering, values):
+        lookup = 'lt' if key.startswith('-') else 'gt'
+        condition |= equal & Q(**{f'{_field_name(key)}__{lookup}': value})
+        equal &= Q(**{_field_name(key): value})
+    return condition
+
+
+def _cursor_for(obj, ordering):
+    return encode_cursor(ordering, [getattr(obj, _field_name(key)) for key in ordering])
+
+
+def keyset_page(queryset, after=None, before=None, ordering=PRISONER_LIST_ORDERING, per_page=PRISONER_LIST_PAGE_SIZE):
+    """
+    Return one KeysetPage of `queryset` sorted by `ordering`.
+
+    Pages are addressed by the sort key of the row next to them (`after` the
+    last row of the previous page or `before` the first row of the next one)
+    rather than by number, so a deep page is a range scan on the ordering
+    instead of an OFFSET, and no COUNT(*) is needed. The final key in
+    `ordering` must be unique. An unreadable cursor falls back to the first
+    page.
+    """
+    backwards = bool(before) and not after
+    cursor = before if backwards else after
+    ordering = tuple(ordering)
+    order = _reverse(ordering) if backwards else ordering
+
+    rows = queryset.order_by(*order)
+    if cursor:
+        try:
+            rows = rows.filter(_after(order, decode_cursor(ordering, cursor)))
+        except (ValueError, TypeError, KeyError, ValidationError):
+            cursor = None
+            backwards = False
+            rows = queryset.order_by(*ordering)
+
+    object_list = list(rows[:per_page + 1])
+    has_more = len(object_list) > per_page
+    object_list = object_list[:per_page]
+    if backwards:
+        object_list.reverse()
+
+    page = KeysetPage(
+        object_list=object_list,
+        has_next=True if backwards else has_more,
+        has_previous=has_more if backwards else bool(cursor),
+    )
+    if object_list:
+        if page.has_next:
+            page.next_cursor = _cursor_for(object_list[-1], ordering)
+        if page.has_previous:
+            page.previous_cursor = _cursor_for(object_list[0], ordering)
+    return page
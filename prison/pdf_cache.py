@@ -0,0 +1,150 @@
+import hashlib
+import json
+import os
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.template.loader import get_template
+
+from .dossier import DOSSIER_RELATIONS, related_or_none
+from .storage import name_digest
+
+# Bump to invalidate every cached PDF after a change in how reports render
+PDF_CACHE_FORMAT = 1
+# Eviction trims the cache to this share of PDF_CACHE_MAX_BYTES, so the
+# stores that follow do not each trigger another scan
+EVICT_TO = 0.9
+# Other processes store PDFs too, so rescan after this many stores regardless
+RESCAN_EVERY = 100
+
+# cache directory -> this process's running estimate of its size in bytes
+# and how many PDFs it has stored there since the last scan
+_estimates = {}
+
+
+def cache_dir():
+    return Path(settings.PDF_CACHE_DIR)
+
+
+@lru_cache(maxsize=None)
+def _template_digest(template_name):
+    origin = get_template(template_name).origin.name
+    return hashlib.sha256(Path(origin).read_bytes()).hexdigest()
+
+
+def _file_digest(field_file):
+    if not field_file:
+        return None
+    # Content-addressed photos carry their digest in their name
+    digest = name_digest(field_file.name)
+    if digest and field_file.storage.exists(field_file.name):
+        return digest
+    digest = hashlib.sha256()
+    try:
+        with field_file.open('rb') as photo:
+            for chunk in iter(lambda: photo.read(64 * 1024), b''):
+                digest.update(chunk)
+    except (FileNotFoundError, ValueError):
+        return f'missing:{field_file.name}'
+    return digest.hexdigest()
+
+
+def _row(instance):
+    if instance is None:
+        return None
+    return {field.attname: field.value_from_object(instance) for field in instance._meta.concrete_fields}
+
+
+def report_fingerprint(prisoner, template_name='prison/prisoner_report.html'):
+    """
+    SHA-256 of everything a prisoner report shows: the prisoner row, its
+    station and detail rows, its transfers, the photo's contents and the
+    report template itself. `prisoner` should be a loaded dossier.
+    """
+    data = {
+        'format': PDF_CACHE_FORMAT,
+        'template': _template_digest(template_name),
+        'prisoner': _row(prisoner),
+        'photo': _file_digest(prisoner.image),
+        'relations': {name: _row(related_or_none(prisoner, name)) for name in DOSSIER_RELATIONS},
+        'transfers': [
+            [_row(transfer), transfer.from_prison.name, transfer.to_prison.name,
+             transfer.transferred_by.get_full_name() if transfer.transferred_by else None]
+            for transfer in prisoner.transfers.all()
+        ],
+    }
+    encoded = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def cached_path(fingerprint):
+    return cache_dir() / fingerprint[:2] / f'{fingerprint}.pdf'
+
+
+def get_cached_pdf(fingerprint):
+    """Path of the cached PDF for `fingerprint`, marked as just used, or None."""
+    path = cached_path(fingerprint)
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return path
+
+
+def store_pdf(fingerprint, pdf):
+    """Write `pdf` under `fingerprint` atomically, trimming the cache once it may have outgrown its limit."""
+    path = cached_path(fingerprint)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as output:
+            output.write(pdf)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+    # Scanning the whole cache on every store would make a bulk prewarm
+    # quadratic, so only scan when the estimate says it has outgrown the
+    # limit, or now and then to pick up other processes' writes
+    estimate = _estimates.get(cache_dir())
+    if estimate is None or estimate[0] + len(pdf) > settings.PDF_CACHE_MAX_BYTES or estimate[1] + 1 >= RESCAN_EVERY:
+        evict(keep=path)
+    else:
+        _estimates[cache_dir()] = (estimate[0] + len(pdf), estimate[1] + 1)
+    return path
+
+
+def evict(max_bytes=None, keep=None):
+    """
+    Delete the least recently used PDFs until the cache fits in `max_bytes`;
+    with the default limit, trim to EVICT_TO of it.
+    """
+    if max_bytes is None:
+        max_bytes = int(settings.PDF_CACHE_MAX_BYTES * EVICT_TO)
+    files = []
+    for path in cache_dir().glob('*/*.pdf'):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in files)
+    removed = 0
+    for _, size, path in sorted(files, key=lambda entry: entry[0]):
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    _estimates[cache_dir()] = (total, 0)
+    return removed
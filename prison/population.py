@@ -0,0 +1,158 @@
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db.models import Count, Max, Q, Sum
+from django.utils import timezone
+
+from .models import Prisoner, PrisonerTransfer, PrisonStation, ReleaseOnRemission, StationPopulationSnapshot
+from .statistics import trend_months
+
+SNAPSHOT_FIELDS = [
+    'total', 'convicted', 'remand',
+    'male_convicted', 'female_convicted', 'male_remand', 'female_remand',
+]
+
+POPULATION_AGGREGATES = {
+    'total': Count('id'),
+    'convicted': Count('id', filter=Q(prisoner_class='convicted')),
+    'remand': Count('id', filter=Q(prisoner_class='remand')),
+    'male_convicted': Count('id', filter=Q(sex='male', prisoner_class='convicted')),
+    'female_convicted': Count('id', filter=Q(sex='female', prisoner_class='convicted')),
+    'male_remand': Count('id', filter=Q(sex='male', prisoner_class='remand')),
+    'female_remand': Count('id', filter=Q(sex='female', prisoner_class='remand')),
+}
+
+
+def _categories(sex, prisoner_class):
+    """Snapshot fields a prisoner of the given sex and class is counted in."""
+    fields = ['total', prisoner_class]
+    if sex in ('male', 'female'):
+        fields.append(f'{sex}_{prisoner_class}')
+    return [field for field in fields if field in SNAPSHOT_FIELDS]
+
+
+def _store(snapshots):
+    return StationPopulationSnapshot.objects.bulk_create(
+        snapshots,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['station', 'date'],
+        update_fields=SNAPSHOT_FIELDS + ['capacity', 'updated_at'],
+    )
+
+
+def capture_population(day=None):
+    """Store today's live headcount for every station from one grouped query."""
+    day = day or timezone.localdate()
+    counts = {
+        row['prison_station']: row
+        for row in Prisoner.objects.filter(is_active=True)
+        .values('prison_station')
+        .annotate(**POPULATION_AGGREGATES)
+    }
+    snapshots = [
+        StationPopulationSnapshot(
+            station=station,
+            date=day,
+            capacity=station.capacity,
+            **{field: counts.get(station.id, {}).get(field, 0) for field in SNAPSHOT_FIELDS}
+        )
+        for station in PrisonStation.objects.all()
+    ]
+    return _store(snapshots)
+
+
+def _population_changes():
+    """
+    Replay admissions, transfers and departures into per-day deltas keyed by
+    (station_id, field).
+
+    A prisoner is counted at the end of each day from `date_admitted` until the
+    day they leave. Transfers move them on `transfer_date`. Inactive prisoners
+    leave on their latest release on remission date, or when the record was
+    last modified if no release was processed.
+    """
+    moves = defaultdict(list)
+    for prisoner_id, from_prison, to_prison, transfer_date in PrisonerTransfer.objects.order_by(
+        'transfer_date', 'id'
+    ).values_list('prisoner_id', 'from_prison_id', 'to_prison_id', 'transfer_date'):
+        moves[prisoner_id].append((from_prison, to_prison, transfer_date))
+
+    releases = dict(
+        ReleaseOnRemission.objects.values('prisoner_id')
+        .annotate(latest=Max('release_date'))
+        .values_list('prisoner_id', 'latest')
+    )
+
+    changes = defaultdict(Counter)
+    prisoners = Prisoner.objects.values_list(
+        'id', 'prison_station_id', 'sex', 'prisoner_class', 'date_admitted', 'is_active', 'last_modified'
+    )
+    for prisoner_id, station_id, sex, prisoner_class, admitted, is_active, last_modified in prisoners.iterator():
+        departure = None
+        if not is_active:
+            departure = releases.get(prisoner_id) or timezone.localtime(last_modified).date()
+
+        transfers = moves.get(prisoner_id, [])
+        station = transfers[0][0] if transfers else station_id
+        stays = []
+        begin = admitted
+        for _, to_prison, transfer_date in transfers:
+            stays.append((station, begin, transfer_date))
+            station, begin = to_prison, max(admitted, transfer_date)
+        stays.append((station, begin, departure))
+
+        fields = _categories(sex, prisoner_class)
+        for stay_station, start, finish in stays:
+            if finish is not None and finish <= start:
+                continue
+            for field in fields:
+                changes[start][(stay_station, field)] += 1
+                if finish is not None:
+                    changes[finish][(stay_station, field)] -= 1
+    return changes
+
+
+def backfill_population(start, end):
+    """Rebuild daily snapshots for every station between `start` and `end` inclusive."""
+    stations = list(PrisonStation.objects.all())
+    changes = _population_changes()
+
+    running = Counter()
+    for day in sorted(day for day in changes if day < start):
+        running.update(changes[day])
+
+    snapshots = []
+    day = start
+    while day <= end:
+        running.update(changes.get(day, {}))
+        for station in stations:
+            snapshots.append(StationPopulationSnapshot(
+                station=station,
+                date=day,
+                capacity=station.capacity,
+                **{field: max(running[(station.id, field)], 0) for field in SNAPSHOT_FIELDS}
+            ))
+        day += timedelta(days=1)
+    return _store(snapshots)
+
+
+def population_trend(snapshots, live_counts, today=None):
+    """
+    Return the monthly population series for the dashboard chart.
+
+    Past months read the month-end totals from `snapshots`, which is already
+    scoped to the stations the user may see. Months without a snapshot fall
+    back to the matching entry of `live_counts`, and the current month always
+    uses the live count.
+    """
+    months = trend_months(today)
+    past_month_ends = [month_end for _, month_end in months[:-1]]
+    totals = dict(
+        snapshots.filter(date__in=past_month_ends)
+        .values('date')
+        .annotate(population=Sum('total'))
+        .values_list('date', 'population')
+    )
+    trend = [totals.get(month_end, live) for month_end, live in zip(past_month_ends, live_counts)]
+    return trend + list(live_counts[len(past_month_ends):])
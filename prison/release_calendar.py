@@ -0,0 +1,116 @@
+from datetime import date, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from .models import ConvictedPrisoner, StationReleaseDay
+from .sentences import shift
+
+BUCKETS = ('day', 'week', 'month')
+# Default and longest ranges the calendar API answers, and the longest it lists prisoners for
+CALENDAR_DAYS = 365
+CALENDAR_MAX_DAYS = 5 * 366
+ROSTER_MAX_DAYS = 92
+# Latest day a range may end on, leaving room to step past its last week or month
+CALENDAR_LAST_DAY = date(9999, 11, 30)
+
+
+def release_contribution(prisoner_id):
+    """The (station_id, release date) the stored prisoner counts towards in the calendar, or None."""
+    row = ConvictedPrisoner.objects.filter(
+        pk=prisoner_id, prisoner__is_active=True, date_of_release_on_remission__isnull=False,
+    ).values_list('prisoner__prison_station_id', 'date_of_release_on_remission').first()
+    return tuple(row) if row else None
+
+
+def adjust_release_day(station_id, day, delta):
+    updated = StationReleaseDay.objects.filter(station_id=station_id, date=day).update(releases=F('releases') + delta)
+    if updated or delta < 0:
+        StationReleaseDay.objects.filter(station_id=station_id, date=day, releases__lte=0).delete()
+        return
+    try:
+        with transaction.atomic():
+            StationReleaseDay.objects.create(station_id=station_id, date=day, releases=delta)
+    except IntegrityError:
+        # Another writer created the day first
+        StationReleaseDay.objects.filter(station_id=station_id, date=day).update(releases=F('releases') + delta)
+
+
+def move_release(before, after):
+    """Move one release from the calendar day `before` to `after`; either may be None."""
+    if before == after:
+        return
+    if before is not None:
+        adjust_release_day(*before, -1)
+    if after is not None:
+        adjust_release_day(*after, 1)
+
+
+def rebuild_release_calendar():
+    """Recount every calendar day from ConvictedPrisoner and return how many days have releases."""
+    days = (
+        ConvictedPrisoner.objects.filter(prisoner__is_active=True, date_of_release_on_remission__isnull=False)
+        .values('prisoner__prison_station_id', 'date_of_release_on_remission')
+        .annotate(releases=Count('pk'))
+        .order_by()
+    )
+    with transaction.atomic():
+        StationReleaseDay.objects.all().delete()
+        created = StationReleaseDay.objects.bulk_create(
+            [
+                StationReleaseDay(
+                    station_id=day['prisoner__prison_station_id'], date=day['date_of_release_on_remission'],
+                    releases=day['releases'],
+                )
+                for day in days
+            ],
+            batch_size=1000,
+        )
+    return len(created)
+
+
+def bucket_start(day, bucket):
+    if bucket == 'week':
+        return day - timedelta(days=day.weekday())
+    if bucket == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(start, bucket):
+    if bucket == 'week':
+        return start + timedelta(days=7)
+    if bucket == 'month':
+        return shift(start, 1, 0)
+    return start + timedelta(days=1)
+
+
+def release_calendar(station_ids, start, end, bucket='day'):
+    """
+    Release counts at `station_ids` from `start` to `end` inclusive, per day,
+    ISO week or calendar month, read from StationReleaseDay alone. Every
+    bucket is listed, empty ones with 0; the first and last are clipped to
+    the range.
+    """
+    daily = dict(
+        StationReleaseDay.objects.filter(station_id__in=station_ids, date__range=(start, end))
+        .values_list('date').annotate(total=Sum('releases')).order_by()
+    )
+    buckets = []
+    current = bucket_start(start, bucket)
+    while current <= end:
+        following = next_bucket(current, bucket)
+        first, last = max(current, start), min(following - timedelta(days=1), end)
+        releases = sum(daily.get(first + timedelta(days=offset), 0) for offset in range((last - first).days + 1))
+        buckets.append({'start': first, 'end': last, 'releases': releases})
+        current = following
+    return buckets
+
+
+def release_roster(station_ids, start, end):
+    """The active convicted prisoners at `station_ids` due for release from `start` to `end`, soonest first."""
+    return ConvictedPrisoner.objects.filter(
+        prisoner__is_active=True,
+        prisoner__prison_station_id__in=station_ids,
+        date_of_release_on_remission__range=(start, end),
+    ).select_related('prisoner__prison_station').order_by('date_of_release_on_remission', 'prisoner__prisoner_number')
@@ -0,0 +1,182 @@
+import io
+from datetime import datetime, timedelta
+
+from django.db.models import Q
+from django.template.loader import get_template
+from xhtml2pdf import pisa
+
+from .dossier import load_dossier
+from .models import ConvictedPrisoner, Prisoner, PrisonerTransfer
+from .pdf_cache import get_cached_pdf, report_fingerprint, store_pdf
+from .tabular_pdf import render_table_pdf
+
+
+RELEASE_COLUMNS = [
+    ('Prisoner No.', 1.2),
+    ('Name', 2),
+    ('Prison Station', 1.5),
+    ('Release Date', 1),
+    ('Original Sentence', 1.2),
+    ('Offense', 4),
+]
+
+LOCKUP_COLUMNS = [
+    ('Prisoner No.', 1.2),
+    ('Name', 2),
+    ('Prison Station', 1.5),
+    ('Class', 1),
+    ('Sex', 0.8),
+    ('Block / Cell', 1),
+    ('Admitted', 1),
+]
+
+TRANSFER_COLUMNS = [
+    ('Date', 1),
+    ('Prisoner No.', 1.2),
+    ('Name', 2),
+    ('From', 1.5),
+    ('To', 1.5),
+    ('Reason', 3),
+    ('Transferred By', 1.5),
+]
+
+
+class ReportError(Exception):
+    pass
+
+
+def render_pdf(template_name, context):
+    """Render `template_name` with `context` to PDF bytes."""
+    html = get_template(template_name).render(context)
+    output = io.BytesIO()
+    pisa_status = pisa.CreatePDF(html, dest=output)
+    if pisa_status.err:
+        raise ReportError(f'{template_name} could not be rendered to PDF ({pisa_status.err} errors)')
+    return output.getvalue()
+
+
+def prisoner_report_context(prisoner, today=None):
+    context = {
+        'prisoner': prisoner,
+        'transfers': prisoner.transfers.all(),
+        'today': today or datetime.now().date(),
+    }
+
+    if prisoner.prisoner_class == 'convicted':
+        context.update({
+            'convicted_details': prisoner.convicted_details,
+            'risk_assessment': prisoner.risk_assessment,
+            'rehabilitation': prisoner.rehabilitation,
+        })
+    else:
+        context['remand_details'] = prisoner.remand_details
+
+    context.update({
+        'particulars': prisoner.particulars,
+        'physical': prisoner.physical,
+    })
+    return context
+
+
+def upcoming_releases(station_id=None, today=None, days=30):
+    """Convicted prisoners released on remission in the next `days` days, optionally at one station."""
+    today = today or datetime.now().date()
+    releases = ConvictedPrisoner.objects.filter(
+        prisoner__is_active=True,
+        date_of_release_on_remission__gte=today,
+        date_of_release_on_remission__lte=today + timedelta(days=days),
+    ).select_related('prisoner__prison_station').order_by('date_of_release_on_remission')
+    if station_id is not None:
+        releases = releases.filter(prisoner__prison_station_id=station_id)
+    return releases
+
+
+def prisoner_report_path(prisoner):
+    """Path of the PDF report for the dossier `prisoner`, rendering it only if the cache has no copy."""
+    fingerprint = report_fingerprint(prisoner)
+    path = get_cached_pdf(fingerprint)
+    if path is None:
+        path = store_pdf(fingerprint, render_pdf('prison/prisoner_report.html', prisoner_report_context(prisoner)))
+    return path
+
+
+def render_prisoner_report(prisoner_id):
+    return prisoner_report_path(load_dossier(prisoner_id, cached=False)).read_bytes()
+
+
+def release_row(release):
+    return [
+        release.prisoner.prisoner_number,
+        release.prisoner.full_name,
+        release.prisoner.prison_station.name,
+        release.date_of_release_on_remission.strftime('%Y-%m-%d'),
+        f'{release.sentence} months',
+        release.offense or '',
+    ]
+
+
+def render_upcoming_releases(station_id=None, days=30):
+    today = datetime.now().date()
+    releases = upcoming_releases(station_id, today, days)
+    return render_table_pdf(
+        'Upcoming Releases',
+        RELEASE_COLUMNS,
+        (release_row(release) for release in releases.iterator()),
+        subtitle=f"{today:%d %b %Y} to {today + timedelta(days=days):%d %b %Y}",
+    )
+
+
+def lockup_row(prisoner):
+    return [
+        prisoner.prisoner_number,
+        prisoner.full_name,
+        prisoner.prison_station.name,
+        prisoner.get_prisoner_class_display(),
+        prisoner.get_sex_display(),
+        f'{prisoner.block_number} / {prisoner.cell_number}',
+        prisoner.date_admitted.strftime('%Y-%m-%d'),
+    ]
+
+
+def render_lockup_list(station_id=None):
+    """Every active prisoner, by station, block and cell, optionally at one station."""
+    today = datetime.now().date()
+    prisoners = Prisoner.objects.filter(is_active=True).select_related('prison_station').order_by(
+        'prison_station__name', 'block_number', 'cell_number', 'prisoner_number',
+    )
+    if station_id is not None:
+        prisoners = prisoners.filter(prison_station_id=station_id)
+    return render_table_pdf(
+        'Lockup List',
+        LOCKUP_COLUMNS,
+        (lockup_row(prisoner) for prisoner in prisoners.iterator()),
+        subtitle=f'As of {today:%d %b %Y}',
+    )
+
+
+def transfer_row(transfer):
+    return [
+        transfer.transfer_date.strftime('%Y-%m-%d'),
+        transfer.prisoner.prisoner_number,
+        transfer.prisoner.full_name,
+        transfer.from_prison.name,
+        transfer.to_prison.name,
+        transfer.reason,
+        transfer.transferred_by.get_full_name() if transfer.transferred_by else '',
+    ]
+
+
+def render_transfer_list(station_id=None, days=30):
+    """Transfers in the last `days` days, newest first, optionally into or out of one station."""
+    today = datetime.now().date()
+    transfers = PrisonerTransfer.objects.filter(transfer_date__gte=today - timedelta(days=days)).select_related(
+        'prisoner', 'from_prison', 'to_prison', 'transferred_by',
+    ).order_by('-transfer_date', '-id')
+    if station_id is not None:
+        transfers = transfers.filter(Q(from_prison_id=station_id) | Q(to_prison_id=station_id))
+    return render_table_pdf(
+        'Prisoner Transfers',
+        TRANSFER_COLUMNS,
+        (transfer_row(transfer) for transfer in transfers.iterator()),
+        subtitle=f"{today - timedelta(days=days):%d %b %Y} to {today:%d %b %Y}",
+    )
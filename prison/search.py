@@ -0,0 +1,110 @@
+import re
+
+from django.db import connection, models
+from django.db.models import F, Lookup, Q
+
+SEARCH_TABLE = 'prison_prisoner_fts'
+SEARCH_NAME_COLUMNS = ('prisoner_number', 'first_name', 'middle_name', 'surname')
+SEARCH_ORDERING = ('search_rank', 'id')
+
+# Column weights for bm25(): an exact prisoner number or surname hit
+# outranks a first/middle name hit, which outranks a sound-alike.
+SEARCH_RANK = 'bm25(10.0, 4.0, 2.0, 5.0, 1.0)'
+
+# Spellings that sound the same in intake records: aspirated and plain
+# consonants (Chikhondi/Chikondi, Thoko/Toko), l/r (Lilongwe/Rirongwe),
+# and the usual English digraphs.
+_PHONETIC_DIGRAPHS = [
+    ('tch', 'X'), ('ch', 'X'), ('sh', 'X'), ('ph', 'F'), ('gh', 'K'), ('ck', 'K'),
+    ('kh', 'K'), ('th', 'T'), ('bh', 'B'), ('dh', 'D'), ('mb', 'M'), ('ng', 'N'),
+]
+_PHONETIC_LETTERS = {
+    'b': 'B', 'p': 'P', 'd': 'T', 't': 'T', 'g': 'K', 'k': 'K', 'c': 'K', 'q': 'K',
+    'j': 'J', 'f': 'F', 'v': 'F', 's': 'S', 'z': 'S', 'x': 'KS', 'l': 'L', 'r': 'L',
+    'm': 'M', 'n': 'N',
+}
+_VOWELS = set('aeiouyhw')
+
+
+def phonetic_key(word):
+    """
+    A metaphone-style key for one name: digraphs and sound-alike consonants
+    are folded together, vowels after the first letter are dropped and
+    repeated sounds collapse, so "Chikondi" and "Chikhondi" share "XKNT".
+    """
+    word = re.sub('[^a-z]', '', word.lower())
+    if not word:
+        return ''
+    for digraph, sound in _PHONETIC_DIGRAPHS:
+        word = word.replace(digraph, sound)
+
+    key = 'A' if word[0] in _VOWELS else ''
+    for letter in word:
+        sound = letter if letter.isupper() else _PHONETIC_LETTERS.get(letter, '')
+        if sound and not key.endswith(sound):
+            key += sound
+    return key
+
+
+def phonetic_name(*names):
+    """Space-separated phonetic keys for every word in `names`."""
+    keys = [phonetic_key(word) for name in names if name for word in name.split()]
+    return ' '.join(key for key in keys if key)
+
+
+class SearchDocumentField(models.TextField):
+    """The FTS5 table's hidden column of the same name, which MATCH is run against."""
+
+
+@SearchDocumentField.register_lookup
+class Match(Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', lhs_params + rhs_params
+
+
+def search_index_available():
+    return connection.vendor == 'sqlite'
+
+
+def match_expression(query):
+    """
+    Build an FTS5 query: every word must prefix-match a name or the prisoner
+    number, or sound like one of the names.
+    """
+    terms = []
+    for word in re.findall(r'\w+', query.lower()):
+        term = '{%s} : "%s"*' % (' '.join(SEARCH_NAME_COLUMNS), word)
+        key = phonetic_key(word)
+        if key and not word.isdigit():
+            term = f'({term} OR phonetic_name : "{key}")'
+        terms.append(term)
+    return ' AND '.join(terms)
+
+
+def search_prisoners(prisoners, query):
+    """
+    Filter `prisoners` to those matching `query`, annotated with
+    `search_rank` (lower is better) for ordering by SEARCH_ORDERING.
+
+    Uses the FTS5 index where the database has one and falls back to
+    substring matching elsewhere, where every row ranks equally.
+    """
+    expression = match_expression(query)
+    if not expression:
+        return prisoners.annotate(search_rank=models.Value(0.0))
+
+    if search_index_available():
+        return prisoners.filter(search_index__document__match=expression).annotate(
+            search_rank=F('search_index__rank')
+        )
+
+    return prisoners.filter(
+        Q(prisoner_number__icontains=query) |
+        Q(first_name__icontains=query) |
+        Q(middle_name__icontains=query) |
+        Q(surname__icontains=query)
+    ).annotate(search_rank=models.Value(0.0))
@@ -0,0 +1,76 @@
+from calendar import monthrange
+from datetime import timedelta
+from functools import lru_cache
+
+# Average days in a month (365.25 days / 12 months)
+AVG_DAYS_PER_MONTH = 30.4375
+# Remission is a third of the sentence
+REMISSION_DIVISOR = 3
+
+ONE_DAY = timedelta(days=1)
+
+
+@lru_cache(maxsize=4096)
+def split_months(months):
+    """Whole months and the fractional remainder as whole days, e.g. 4.5 -> (4, 15)."""
+    whole = int(months)
+    return whole, int((months - whole) * AVG_DAYS_PER_MONTH)
+
+
+@lru_cache(maxsize=None)
+def month_length(year, month):
+    return monthrange(year, month)[1]
+
+
+def shift(day, months, days):
+    """
+    `day` moved by `months` calendar months, clamped to the end of a shorter
+    month, then by `days` days: the same as `day + relativedelta(months=months,
+    days=days)` without building a relativedelta.
+    """
+    index = day.year * 12 + day.month - 1 + months
+    year, month = divmod(index, 12)
+    month += 1
+    return day.replace(year=year, month=month, day=min(day.day, month_length(year, month))) + timedelta(days=days)
+
+
+def release_dates(wef_date, sentence, reduction_months=0, remission_divisor=REMISSION_DIVISOR):
+    """
+    (release date, release date on remission) for a sentence of `sentence`
+    months served from `wef_date`, less any `reduction_months` granted.
+
+    The sentence runs from the day before the WEF date; remission takes a
+    third of the sentence off the release date, and a reduction comes off
+    after that. Fractional months count as whole days of an average month.
+    A different `remission_divisor` models another remission rule, and 0
+    none at all.
+    """
+    months, days = split_months(sentence)
+    release = shift(wef_date - ONE_DAY, months, days)
+
+    on_remission = release
+    if remission_divisor:
+        months, days = split_months(sentence / remission_divisor)
+        on_remission = shift(release, -months, -days)
+
+    if reduction_months:
+        months, days = split_months(reduction_months)
+        on_remission = shift(on_remission, -months, -days)
+    return release, on_remission
+
+
+def bulk_release_dates(wef_dates, sentences, reduction_months, remission_divisor=REMISSION_DIVISOR):
+    """
+    release_dates() over three equal-length columns, returned as two
+    columns (release dates, release dates on remission). Rows that share a
+    WEF date, sentence and reduction are only worked out once.
+    """
+    releases, remissions = [], []
+    computed = {}
+    for row in zip(wef_dates, sentences, reduction_months):
+        result = computed.get(row)
+        if result is None:
+            result = computed[row] = release_dates(*row, remission_divisor)
+        releases.append(result[0])
+        remissions.append(result[1])
+    return releases, remissions
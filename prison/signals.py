@@ -0,0 +1,110 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .cache import bump_station_versions
+from .dossier import forget_all_dossiers, forget_dossier
+from .images import delete_image
+from .models import (
+    ConvictedPrisoner, PhysicalCharacteristics, Prisoner, PrisonerParticulars,
+    PrisonerTransfer, PrisonStation, RehabilitationProgram, RemandPrisoner, RiskAssessment,
+)
+from .release_calendar import move_release, release_contribution
+from .typeahead import patch_prisoner
+
+PRISONER_DETAIL_MODELS = (
+    ConvictedPrisoner, RemandPrisoner, RiskAssessment, PrisonerParticulars, PhysicalCharacteristics,
+    RehabilitationProgram,
+)
+
+
+def release_image(name):
+    """Delete a stored photo and its derivatives once no prisoner refers to it."""
+    if name and not Prisoner.objects.filter(image=name).exists():
+        delete_image(Prisoner._meta.get_field('image').storage, name)
+
+
+@receiver(pre_save, sender=Prisoner)
+def remember_previous_prisoner(sender, instance, raw=False, **kwargs):
+    instance._previous_station_id = instance._previous_image = None
+    instance._previous_release = instance._release_date = None
+    if instance.pk and not raw:
+        station_id, image, is_active, release = (
+            Prisoner.objects.filter(pk=instance.pk).values_list(
+                'prison_station_id', 'image', 'is_active', 'convicted_details__date_of_release_on_remission',
+            ).first()
+            or (None, None, False, None)
+        )
+        instance._previous_station_id, instance._previous_image = station_id, image
+        # Kept for inactive prisoners too, so a reactivation can add it back
+        instance._release_date = release
+        if is_active and release:
+            instance._previous_release = (station_id, release)
+
+
+@receiver(post_save, sender=Prisoner)
+@receiver(post_delete, sender=Prisoner)
+def prisoner_changed(sender, instance, signal, **kwargs):
+    saved = None if signal is post_delete else instance
+    # The instance's pk is cleared once a delete completes, so capture it now
+    bump_station_versions(
+        getattr(instance, '_previous_station_id', None), instance.prison_station_id,
+        committed=partial(patch_prisoner, instance.pk, saved),
+    )
+    forget_dossier(instance.pk)
+
+    # Photos are shared between prisoners with identical uploads, so one is
+    # only deleted when its last reference goes
+    previous_image = instance.image.name if saved is None else getattr(instance, '_previous_image', None)
+    if previous_image and previous_image != (saved and saved.image.name):
+        transaction.on_commit(partial(release_image, previous_image))
+
+    # A transfer, deactivation or reactivation moves the prisoner's release in
+    # the calendar; on delete the cascade to ConvictedPrisoner takes it out instead
+    release_date = getattr(instance, '_release_date', None)
+    if saved is not None and release_date:
+        current = (saved.prison_station_id, release_date) if saved.is_active else None
+        move_release(getattr(instance, '_previous_release', None), current)
+
+
+def prisoner_detail_changed(sender, instance, **kwargs):
+    forget_dossier(instance.prisoner_id)
+    try:
+        bump_station_versions(instance.prisoner.prison_station_id)
+    except Prisoner.DoesNotExist:
+        pass
+
+
+for model in PRISONER_DETAIL_MODELS:
+    post_save.connect(prisoner_detail_changed, sender=model, dispatch_uid=f'bump_station_{model.__name__}_save')
+    post_delete.connect(prisoner_detail_changed, sender=model, dispatch_uid=f'bump_station_{model.__name__}_delete')
+
+
+@receiver(pre_save, sender=ConvictedPrisoner)
+@receiver(pre_delete, sender=ConvictedPrisoner)
+def remember_previous_release(sender, instance, raw=False, **kwargs):
+    instance._previous_release = None if raw else release_contribution(instance.pk)
+
+
+@receiver(post_save, sender=ConvictedPrisoner)
+@receiver(post_delete, sender=ConvictedPrisoner)
+def convicted_prisoner_changed(sender, instance, signal, raw=False, **kwargs):
+    if not raw:
+        current = None if signal is post_delete else release_contribution(instance.pk)
+        move_release(getattr(instance, '_previous_release', None), current)
+
+
+@receiver(post_save, sender=PrisonerTransfer)
+@receiver(post_delete, sender=PrisonerTransfer)
+def transfer_changed(sender, instance, **kwargs):
+    forget_dossier(instance.prisoner_id)
+    bump_station_versions(instance.from_prison_id, instance.to_prison_id)
+
+
+@receiver(post_save, sender=PrisonStation)
+@receiver(post_delete, sender=PrisonStation)
+def station_changed(sender, instance, **kwargs):
+    forget_all_dossiers()
+    bump_station_versions(instance.pk)
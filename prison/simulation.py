@@ -0,0 +1,126 @@
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import ConvictedPrisoner, Prisoner, PrisonStation
+from .sentences import REMISSION_DIVISOR, bulk_release_dates
+
+
+@dataclass(frozen=True)
+class RemissionPolicy:
+    """
+    A sentencing rule to project the population under. The defaults are the
+    rule ConvictedPrisoner.save() applies today.
+    """
+    # Remission is 1/remission_divisor of the sentence; 0 grants none
+    remission_divisor: float = REMISSION_DIVISOR
+    # Months taken off every covered sentence on top of remission
+    amnesty_months: float = 0
+    # Offences the amnesty covers; empty covers every offence
+    amnesty_offenses: frozenset = frozenset()
+    # Whether reductions already granted to individual prisoners still apply
+    keep_reductions: bool = True
+
+    def covers(self, offense):
+        return not self.amnesty_offenses or offense in self.amnesty_offenses
+
+
+@dataclass
+class PopulationProjection:
+    dates: list
+    # station id -> projected headcount on each of `dates`
+    stations: dict
+    # station id -> prisoners released on remission within the horizon
+    releases: dict
+
+    @property
+    def totals(self):
+        return [sum(counts) for counts in zip(*self.stations.values())] if self.stations else [0] * len(self.dates)
+
+
+class SentencePopulation:
+    """
+    Every active convicted sentence, read once as parallel columns of
+    cohorts that share a station, WEF date, sentence, reduction and offence,
+    together with each station's other active prisoners, who are held
+    constant. simulate() can then be run for any number of policies without
+    touching the database again.
+    """
+
+    def __init__(self, stations, wef_dates, sentences, reductions, offenses, sizes, held):
+        self.stations = stations
+        self.wef_dates = wef_dates
+        self.sentences = sentences
+        self.reductions = reductions
+        self.offenses = offenses
+        self.sizes = sizes
+        self.held = held
+
+    @classmethod
+    def load(cls, station_ids=None):
+        cohorts = ConvictedPrisoner.objects.filter(prisoner__is_active=True)
+        others = Prisoner.objects.filter(is_active=True, convicted_details__isnull=True)
+        stations = PrisonStation.objects.all()
+        if station_ids is not None:
+            cohorts = cohorts.filter(prisoner__prison_station_id__in=station_ids)
+            others = others.filter(prison_station_id__in=station_ids)
+            stations = stations.filter(pk__in=station_ids)
+
+        held = dict.fromkeys(stations.values_list('pk', flat=True), 0)
+        held.update(others.values_list('prison_station_id').annotate(Count('pk')).order_by())
+        rows = list(
+            cohorts.values_list('prisoner__prison_station_id', 'wef_date', 'sentence', 'reduction_months', 'offense')
+            .annotate(Count('pk')).order_by()
+        )
+        columns = list(zip(*rows)) or [()] * 6
+        return cls(*columns, held=held)
+
+    def __len__(self):
+        return sum(self.sizes)
+
+    def release_dates(self, policy):
+        """Each cohort's release date on remission under `policy`."""
+        reductions = [(months or 0) if policy.keep_reductions else 0 for months in self.reductions]
+        if policy.amnesty_months:
+            reductions = [
+                months + policy.amnesty_months if policy.covers(offense) else months
+                for months, offense in zip(reductions, self.offenses)
+            ]
+        return bulk_release_dates(self.wef_dates, self.sentences, reductions, policy.remission_divisor)[1]
+
+    def simulate(self, policy=RemissionPolicy(), start=None, days=365, step=1):
+        """
+        Headcount per station every `step` days for `days` days from `start`
+        if `policy` had always applied. A prisoner is counted until the day
+        they are released on remission; anyone whose release date has
+        already passed under the policy leaves on `start`.
+        """
+        start = start or timezone.localdate()
+        departures = defaultdict(Counter)
+        convicted = Counter()
+        for station_id, release, size in zip(self.stations, self.release_dates(policy), self.sizes):
+            convicted[station_id] += size
+            offset = (release - start).days
+            if offset < days:
+                departures[station_id][max(offset, 0)] += size
+
+        offsets = range(0, days, step)
+        stations = {}
+        for station_id, held in self.held.items():
+            left = departures[station_id]
+            remaining = held + convicted[station_id]
+            counts = []
+            released = 0
+            for offset in range(days):
+                released += left.get(offset, 0)
+                if offset % step == 0:
+                    counts.append(remaining - released)
+            stations[station_id] = counts
+        return PopulationProjection(
+            dates=[start + timedelta(days=offset) for offset in offsets],
+            stations=stations,
+            releases={station_id: sum(departures[station_id].values()) for station_id in self.held},
+        )
@@ -0,0 +1,128 @@
+from datetime import datetime
+
+from dateutil.relativedelta import relativedelta
+from django.db.models import Count, Q, Sum
+
+from .cache import statistics_cache, station_versions
+from .models import Prisoner
+
+MURDER_OFFENSE = 'Murder contrary to section 209 of the Penal Code'
+
+FOREIGN_NATIONALITIES = [
+    'mozambican', 'zimbabwean', 'congolese', 'zambian', 'tanzanian',
+    'chinese', 'japanese', 'korean', 'indian', 'british', 'south_african',
+    'burundi', 'rwandan', 'botswana',
+]
+
+TREND_MONTHS = 6
+
+CHILDREN_CACHE_KEY = 'prison:children:{}:{}'
+
+
+def trend_months(today=None, months=TREND_MONTHS):
+    """Return (label, month_end) pairs from `months - 1` months ago up to the current month."""
+    today = today or datetime.now().date()
+    result = []
+    for i in range(months - 1, -1, -1):
+        month_start = (today - relativedelta(months=i)).replace(day=1)
+        month_end = month_start + relativedelta(months=1) - relativedelta(days=1)
+        result.append((month_start.strftime('%b %Y'), month_end))
+    return result
+
+
+def lockup_statistics(prisoners, today=None):
+    """
+    Compute the dashboard headline counts, lockup summary and population
+    trend for the `prisoners` queryset with a single conditional aggregate.
+
+    The detail tables are one-to-one with Prisoner, so the LEFT JOINs used by
+    the filtered counts never multiply rows.
+    """
+    male = Q(sex='male')
+    female = Q(sex='female')
+    convicted = Q(prisoner_class='convicted')
+    remand = Q(prisoner_class='remand')
+    foreigner = Q(particulars__nationality__in=FOREIGN_NATIONALITIES)
+    convicted_murder = Q(convicted_details__offense=MURDER_OFFENSE)
+    remand_murder = Q(remand_details__offense=MURDER_OFFENSE)
+
+    months = trend_months(today)
+    aggregates = {
+        'total': Count('id'),
+        'convicted': Count('id', filter=convicted),
+        'remand': Count('id', filter=remand),
+        'recidivists': Count('id', filter=Q(risk_assessment__previous_conviction=True)),
+        'male_convicted': Count('id', filter=male & convicted),
+        'female_convicted': Count('id', filter=female & convicted),
+        'male_remand': Count('id', filter=male & remand),
+        'female_remand': Count('id', filter=female & remand),
+        'male_murder_convicted': Count('id', filter=male & convicted & convicted_murder),
+        'female_murder_convicted': Count('id', filter=female & convicted & convicted_murder),
+        'male_foreigner_remand': Count('id', filter=male & remand & foreigner),
+        'female_foreigner_remand': Count('id', filter=female & remand & foreigner),
+        'male_foreigner_remand_murder': Count('id', filter=male & remand & foreigner & remand_murder),
+        'female_foreigner_remand_murder': Count('id', filter=female & remand & foreigner & remand_murder),
+    }
+    for index, (_, month_end) in enumerate(months):
+        aggregates[f'month_{index}'] = Count('id', filter=Q(date_admitted__lte=month_end))
+
+    counts = prisoners.aggregate(**aggregates)
+
+    total = counts['total']
+    recidivism_rate = (counts['recidivists'] / total * 100) if total > 0 else 0
+
+    return {
+        'total_prisoners': total,
+        'convicted_count': counts['convicted'],
+        'remand_count': counts['remand'],
+        'recidivism_count': counts['recidivists'],
+        'recidivism_rate': round(recidivism_rate, 2),
+        'months': [label for label, _ in months],
+        'prisoner_counts': [counts[f'month_{index}'] for index in range(len(months))],
+        'lockup_summary': {
+            'male_convicted': counts['male_convicted'],
+            'female_convicted': counts['female_convicted'],
+            'male_remand': counts['male_remand'],
+            'female_remand': counts['female_remand'],
+            'male_murder_convicted': counts['male_murder_convicted'],
+            'female_murder_convicted': counts['female_murder_convicted'],
+            'male_foreigner_remand': counts['male_foreigner_remand'],
+            'female_foreigner_remand': counts['female_foreigner_remand'],
+            'male_foreigner_remand_murder': counts['male_foreigner_remand_murder'],
+            'female_foreigner_remand_murder': counts['female_foreigner_remand_murder'],
+            'grand_total': total,
+        },
+    }
+
+
+def station_children_count(station_ids):
+    """
+    Total children living with active female prisoners at `station_ids`.
+
+    Counts are cached per station under the station's version; stations
+    whose entry is missing or stale are summed together with one grouped
+    query and written back.
+    """
+    cache = statistics_cache()
+    station_ids = [station_id for station_id in station_ids if station_id is not None]
+    versions = station_versions(station_ids)
+    keys = {
+        station_id: CHILDREN_CACHE_KEY.format(station_id, versions[station_id])
+        for station_id in station_ids
+    }
+    cached = cache.get_many(keys.values())
+
+    missing = [station_id for station_id, key in keys.items() if key not in cached]
+    if missing:
+        counts = dict.fromkeys(missing, 0)
+        counts.update(
+            Prisoner.objects.filter(is_active=True, sex='female', prison_station__in=missing)
+            .values('prison_station')
+            .annotate(children=Sum('physical__children_count'))
+            .values_list('prison_station', 'children')
+        )
+        fresh = {keys[station_id]: count or 0 for station_id, count in counts.items()}
+        cache.set_many(fresh)
+        cached.update(fresh)
+
+    return sum(cached[key] for key in keys.values())
@@ -0,0 +1,79 @@
+import hashlib
+import posixpath
+import re
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+CONTENT_NAME = re.compile(r'(?:^|/)[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64})\.[a-z0-9]+$')
+
+
+def content_digest(content):
+    """SHA-256 hex digest of a Django File, read in chunks and rewound afterwards."""
+    digest = hashlib.sha256()
+    content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+def content_name(directory, digest, extension):
+    """<directory>/ab/cd/abcd...<extension>: two levels of 256-way sharding keep directories small."""
+    return posixpath.join(directory, digest[:2], digest[2:4], f'{digest}{extension}')
+
+
+def name_digest(name):
+    """The SHA-256 a content-addressed `name` was stored under, or None for any other name."""
+    match = CONTENT_NAME.search(name or '')
+    return match.group(1) if match else None
+
+
+def walk_files(storage, directory):
+    """Every file name under `directory` in `storage`, recursively."""
+    if not storage.exists(directory):
+        return
+    directories, files = storage.listdir(directory)
+    for filename in files:
+        yield posixpath.join(directory, filename)
+    for subdirectory in directories:
+        yield from walk_files(storage, posixpath.join(directory, subdirectory))
+
+
+@deconstructible(path='prison.storage.ContentAddressedStorage')
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Filesystem storage that names every file by the SHA-256 of its
+    contents, inside the directory the field's upload_to asks for.
+
+    Saving bytes that are already stored returns the existing name without
+    writing anything, so any number of prisoners can share one file. A file
+    is only deleted once no row refers to it; see release_image() in
+    prison.signals and the gc_prisoner_images command.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        directory, filename = posixpath.split(name)
+        extension = posixpath.splitext(filename)[1].lower()
+        name = content_name(directory, content_digest(content), extension)
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length=max_length)
+
+    def save_derived(self, name, content):
+        """
+        Store `content` under exactly `name`, replacing any file there. For
+        files such as thumbnails whose names follow from a content-addressed
+        original rather than from their own bytes.
+        """
+        if self.exists(name):
+            self.delete(name)
+        return super().save(name, content)
+
+
+prisoner_image_storage = ContentAddressedStorage()
@@ -0,0 +1,129 @@
+import io
+from itertools import islice
+
+from django.utils import timezone
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.units import mm
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import BaseDocTemplate, Frame, PageTemplate, Table, TableStyle
+
+FONT = 'Helvetica'
+BOLD_FONT = 'Helvetica-Bold'
+FONT_SIZE = 8
+ROW_HEIGHT = 12
+CELL_PADDING = 3
+MARGIN = 12 * mm
+HEADER_HEIGHT = 16 * mm
+FOOTER_HEIGHT = 8 * mm
+
+TABLE_STYLE = TableStyle([
+    ('FONT', (0, 0), (-1, -1), FONT, FONT_SIZE),
+    ('FONT', (0, 0), (-1, 0), BOLD_FONT, FONT_SIZE),
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f9f9f9')),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#dddddd')),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('LEFTPADDING', (0, 0), (-1, -1), CELL_PADDING),
+    ('RIGHTPADDING', (0, 0), (-1, -1), CELL_PADDING),
+    ('TOPPADDING', (0, 0), (-1, -1), 0),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
+])
+
+
+def fit_text(text, width, font=FONT, size=FONT_SIZE):
+    """`text` cut short with '...' so it fits in `width` points on one line."""
+    text = '' if text is None else str(text)
+    full_width = stringWidth(text, font, size)
+    if full_width <= width:
+        return text
+    # Start from a proportional guess so long values need few measurements
+    text = text[:int(len(text) * width / full_width)]
+    while text and stringWidth(text + '...', font, size) > width:
+        text = text[:-1]
+    return text + '...'
+
+
+class _TableDocument(BaseDocTemplate):
+    """
+    Lays a table out one page at a time. Every page gets its own Table
+    holding exactly as many fixed-height rows as fit, so Platypus never has
+    to measure or split a large table, and rows are pulled from the source
+    iterator only when the previous page has been drawn.
+    """
+
+    def __init__(self, output, title, subtitle, columns, rows):
+        super().__init__(
+            output, pagesize=landscape(A4), title=title,
+            leftMargin=MARGIN, rightMargin=MARGIN,
+            topMargin=MARGIN + HEADER_HEIGHT, bottomMargin=MARGIN + FOOTER_HEIGHT,
+        )
+        self.subtitle = subtitle
+        self.generated = timezone.localtime().strftime('%d %b %Y %H:%M')
+        frame = Frame(
+            self.leftMargin, self.bottomMargin, self.width, self.height,
+            leftPadding=0, rightPadding=0, topPadding=0, bottomPadding=0,
+        )
+        self.addPageTemplates([PageTemplate(frames=[frame], onPage=self.draw_page_furniture)])
+
+        scale = self.width / sum(weight for _, weight in columns)
+        self.col_widths = [weight * scale for _, weight in columns]
+        self.headings = [fit_text(heading, width - 2 * CELL_PADDING, BOLD_FONT)
+                         for (heading, _), width in zip(columns, self.col_widths)]
+        self.rows_per_page = int(self.height // ROW_HEIGHT) - 1
+        self.rows = iter(rows)
+        self.row_count = 0
+
+    def next_page_table(self):
+        page = [
+            [fit_text(value, width - 2 * CELL_PADDING) for value, width in zip(row, self.col_widths)]
+            for row in islice(self.rows, self.rows_per_page)
+        ]
+        if not page:
+            if self.row_count:
+                return None
+            page = [['No records.'] + [''] * (len(self.col_widths) - 1)]
+        self.row_count += len(page)
+        return Table(
+            [self.headings] + page, colWidths=self.col_widths,
+            rowHeights=[ROW_HEIGHT] * (len(page) + 1), style=TABLE_STYLE, hAlign='LEFT',
+        )
+
+    def filterFlowables(self, flowables):
+        # Called before each flowable is laid out (also for Platypus's own
+        # internal queue): queue the next page's table only when the current
+        # one is the last left in the story.
+        if flowables is self.story and len(flowables) == 1:
+            table = self.next_page_table()
+            if table is not None:
+                flowables.append(table)
+
+    def draw_page_furniture(self, canvas, doc):
+        canvas.saveState()
+        top = self.pagesize[1] - MARGIN
+        canvas.setFont(BOLD_FONT, 14)
+        canvas.drawString(self.leftMargin, top - 14, self.title)
+        canvas.setFont(FONT, 9)
+        canvas.setFillColor(colors.HexColor('#666666'))
+        if self.subtitle:
+            canvas.drawString(self.leftMargin, top - 28, self.subtitle)
+        canvas.drawString(self.leftMargin, MARGIN, f'Generated on {self.generated}')
+        canvas.drawRightString(self.leftMargin + self.width, MARGIN, f'Page {doc.page}')
+        canvas.restoreState()
+
+
+def render_table_pdf(title, columns, rows, subtitle='', output=None):
+    """
+    Render `rows` as a paginated table straight to PDF with ReportLab.
+
+    `columns` is a list of (heading, relative width) pairs and `rows` any
+    iterable of value sequences in the same order; values are drawn on one
+    line and cut short to fit their column. Pass a queryset's iterator() to
+    keep only one page of rows in memory. Writes to the file object `output`
+    if given, otherwise returns the PDF bytes.
+    """
+    target = output if output is not None else io.BytesIO()
+    document = _TableDocument(target, title, subtitle, columns, rows)
+    document.story = [document.next_page_table()]
+    document.build(document.story)
+    if output is None:
+        return target.getvalue()
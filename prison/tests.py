@@ -1,3 +1,1277 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+import zipfile
+from datetime import date, timedelta
+from io import BytesIO, StringIO
+from pathlib import Path
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.storage import FileSystemStorage
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+from pypdf import PdfReader
+
+from accounts.models import CustomUser
+
+from .cache import cached_station_aggregate, station_versions, statistics_cache
+from .counters import station_counters, tracking_station_counters
+from .dossier import load_dossier
+from .forecast import occupancy_forecasts
+from .forms import ConvictedPrisonerForm
+from .images import DERIVATIVES, derivative_name, derivatives_exist
+from .jobs import claim_next_job, prune_finished_jobs, requeue_stale_jobs
+from .pdf_cache import _estimates, cache_dir, cached_path, evict, get_cached_pdf, report_fingerprint, store_pdf
+from .models import *
+from .release_calendar import rebuild_release_calendar, release_calendar
+from .pagination import keyset_page
+from .population import backfill_population, capture_population, population_trend
+from .reports import render_upcoming_releases
+from .search import SEARCH_ORDERING, phonetic_key, search_prisoners
+from .simulation import RemissionPolicy, SentencePopulation
+from .sentences import release_dates, shift
+from .statistics import MURDER_OFFENSE, lockup_statistics, station_children_count
+from .storage import name_digest, prisoner_image_storage, walk_files
+from .tabular_pdf import render_table_pdf
+from .typeahead import StationPrefixIndex
+
+
+def make_station(name='Zomba', code='ZA', capacity=100):
+    return PrisonStation.objects.create(
+        name=name, code=code, location=name, capacity=capacity,
+        date_established=date(1990, 1, 1),
+    )
+
+
+def make_prisoner(station, number, sex='male', prisoner_class='convicted', **kwargs):
+    kwargs.setdefault('date_admitted', date(2024, 1, 15))
+    kwargs.setdefault('first_name', 'John')
+    kwargs.setdefault('surname', 'Banda')
+    return Prisoner.objects.create(
+        prisoner_number=number, sex=sex, age=30,
+        prisoner_class=prisoner_class, prison_station=station,
+        block_number='A', cell_number='1', **kwargs
+    )
+
+
+def make_physical(prisoner, children_count=0):
+    return PhysicalCharacteristics.objects.create(
+        prisoner=prisoner, height=160, weight=60, body_build='medium',
+        skin_color='dark', eyes_color='brown', has_child=children_count > 0,
+        children_count=children_count,
+    )
+
+
+def make_particulars(prisoner, nationality='malawian'):
+    return PrisonerParticulars.objects.create(
+        prisoner=prisoner, nationality=nationality, district='Zomba', chief='Chief',
+        village='Village', religion='christian', fathers_name='Father',
+        mothers_name='Mother', next_of_kin='Kin', next_of_kin_location='Zomba',
+        education_level='primary',
+    )
+
+
+class LockupStatisticsTests(TestCase):
+    def setUp(self):
+        self.station = make_station()
+        other = make_station(name='Mikuyu', code='MK')
+
+        murderer = make_prisoner(self.station, 'C1')
+        ConvictedPrisoner.objects.create(
+            prisoner=murderer, sentence=120, court='High Court', offense=MURDER_OFFENSE,
+            date_of_committal=date(2024, 1, 1), wef_date=date(2024, 1, 1),
+        )
+        RiskAssessment.objects.create(prisoner=murderer, previous_conviction=True, risk_level='high')
+        make_prisoner(self.station, 'C2', sex='female')
+
+        foreigner = make_prisoner(self.station, 'R1', prisoner_class='remand')
+        make_particulars(foreigner, nationality='zambian')
+        RemandPrisoner.objects.create(
+            prisoner=foreigner, court_case_number='CC-1',
+            next_court_date=date(2030, 1, 1), offense=MURDER_OFFENSE,
+        )
+        make_prisoner(self.station, 'R2', sex='female', prisoner_class='remand')
+        make_prisoner(self.station, 'X1', is_active=False)
+
+        # A murder conviction at another station must not leak into this one
+        outsider = make_prisoner(other, 'O1')
+        ConvictedPrisoner.objects.create(
+            prisoner=outsider, sentence=120, court='High Court', offense=MURDER_OFFENSE,
+            date_of_committal=date(2024, 1, 1), wef_date=date(2024, 1, 1),
+        )
+
+        self.prisoners = Prisoner.objects.filter(is_active=True, prison_station=self.station)
+
+    def test_runs_a_single_query(self):
+        with self.assertNumQueries(1):
+            lockup_statistics(self.prisoners)
+
+    def test_counts(self):
+        stats = lockup_statistics(self.prisoners, today=date(2024, 3, 1))
+
+        self.assertEqual(stats['total_prisoners'], 4)
+        self.assertEqual(stats['convicted_count'], 2)
+        self.assertEqual(stats['remand_count'], 2)
+        self.assertEqual(stats['recidivism_count'], 1)
+        self.assertEqual(stats['recidivism_rate'], 25.0)
+        self.assertEqual(stats['months'][-1], 'Mar 2024')
+        self.assertEqual(stats['prisoner_counts'], [0, 0, 0, 4, 4, 4])
+        self.assertEqual(stats['lockup_summary'], {
+            'male_convicted': 1,
+            'female_convicted': 1,
+            'male_remand': 1,
+            'female_remand': 1,
+            'male_murder_convicted': 1,
+            'female_murder_convicted': 0,
+            'male_foreigner_remand': 1,
+            'female_foreigner_remand': 0,
+            'male_foreigner_remand_murder': 1,
+            'female_foreigner_remand_murder': 0,
+            'grand_total': 4,
+        })
+
+
+class StationPopulationSnapshotTests(TestCase):
+    def setUp(self):
+        self.zomba = make_station()
+        self.mikuyu = make_station(name='Mikuyu', code='MK', capacity=50)
+
+        make_prisoner(self.zomba, 'P1', date_admitted=date(2024, 1, 10))
+        make_prisoner(self.zomba, 'P2', sex='female', prisoner_class='remand', date_admitted=date(2024, 2, 5))
+
+        moved = make_prisoner(self.mikuyu, 'P3', date_admitted=date(2024, 1, 1))
+        PrisonerTransfer.objects.create(
+            prisoner=moved, from_prison=self.zomba, to_prison=self.mikuyu,
+            transfer_date=date(2024, 2, 1), reason='Overcrowding',
+        )
+
+        released = make_prisoner(self.zomba, 'P4', date_admitted=date(2024, 1, 1), is_active=False)
+        ReleaseOnRemission.objects.create(
+            prisoner=released, release_date=date(2024, 1, 20),
+            original_sentence=12, remission_months=4,
+        )
+
+    def snapshot(self, station, day):
+        return StationPopulationSnapshot.objects.get(station=station, date=day)
+
+    def test_capture_counts_active_prisoners(self):
+        capture_population(date(2024, 3, 1))
+
+        zomba = self.snapshot(self.zomba, date(2024, 3, 1))
+        self.assertEqual((zomba.total, zomba.male_convicted, zomba.female_remand), (2, 1, 1))
+        self.assertEqual(zomba.occupancy_rate, 2.0)
+        self.assertEqual(self.snapshot(self.mikuyu, date(2024, 3, 1)).total, 1)
+
+    def test_backfill_replays_transfers_and_releases(self):
+        backfill_population(date(2024, 1, 15), date(2024, 2, 10))
+
+        self.assertEqual(self.snapshot(self.zomba, date(2024, 1, 15)).total, 3)
+        self.assertEqual(self.snapshot(self.zomba, date(2024, 1, 20)).total, 2)
+        self.assertEqual(self.snapshot(self.zomba, date(2024, 2, 1)).total, 1)
+        self.assertEqual(self.snapshot(self.mikuyu, date(2024, 2, 1)).total, 1)
+        self.assertEqual(self.snapshot(self.zomba, date(2024, 2, 10)).remand, 1)
+
+    def test_trend_reads_month_end_snapshots(self):
+        backfill_population(date(2024, 1, 31), date(2024, 1, 31))
+        snapshots = StationPopulationSnapshot.objects.filter(station=self.zomba)
+
+        with self.assertNumQueries(1):
+            trend = population_trend(snapshots, [9, 9, 9, 9, 9, 9], today=date(2024, 3, 5))
+
+        self.assertEqual(trend, [9, 9, 9, 2, 9, 9])
+
+
+class StationChildrenCountTests(TestCase):
+    def setUp(self):
+        statistics_cache().clear()
+        self.zomba = make_station()
+        self.mikuyu = make_station(name='Mikuyu', code='MK')
+        self.mother = make_prisoner(self.zomba, 'F1', sex='female')
+        make_physical(self.mother, children_count=2)
+        make_physical(make_prisoner(self.zomba, 'F2', sex='female'), children_count=1)
+        make_physical(make_prisoner(self.zomba, 'M1'), children_count=4)
+        make_physical(make_prisoner(self.mikuyu, 'F3', sex='female'), children_count=3)
+
+    def test_sums_and_caches_per_station(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(station_children_count([self.zomba.id, self.mikuyu.id]), 6)
+        with self.assertNumQueries(0):
+            self.assertEqual(station_children_count([self.zomba.id]), 3)
+
+    def test_physical_save_invalidates(self):
+        station_children_count([self.zomba.id])
+        physical = self.mother.physical
+        physical.children_count = 5
+        physical.save()
+        self.assertEqual(station_children_count([self.zomba.id]), 6)
+
+    def test_sex_change_and_transfer_invalidate(self):
+        station_children_count([self.zomba.id, self.mikuyu.id])
+
+        self.mother.sex = 'male'
+        self.mother.save()
+        self.assertEqual(station_children_count([self.zomba.id]), 1)
+
+        self.mother.sex = 'female'
+        self.mother.prison_station = self.mikuyu
+        self.mother.save()
+        PrisonerTransfer.objects.create(
+            prisoner=self.mother, from_prison=self.zomba, to_prison=self.mikuyu, reason='Court order',
+        )
+        self.assertEqual(station_children_count([self.zomba.id]), 1)
+        self.assertEqual(station_children_count([self.mikuyu.id]), 5)
+
+
+class VersionedStationCacheTests(TestCase):
+    def setUp(self):
+        statistics_cache().clear()
+        self.zomba = make_station()
+        self.mikuyu = make_station(name='Mikuyu', code='MK')
+        self.prisoner = make_prisoner(self.zomba, 'P1')
+
+    def lockup(self, station):
+        prisoners = Prisoner.objects.filter(is_active=True, prison_station=station)
+        return cached_station_aggregate(
+            'lockup', [station.id], lambda: lockup_statistics(prisoners, date(2024, 3, 1))
+        )
+
+    def test_unchanged_station_is_served_from_cache(self):
+        self.lockup(self.zomba)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.lockup(self.zomba)['total_prisoners'], 1)
+
+    def test_risk_assessment_save_invalidates_only_its_station(self):
+        self.lockup(self.zomba)
+        self.lockup(self.mikuyu)
+
+        RiskAssessment.objects.create(prisoner=self.prisoner, previous_conviction=True, risk_level='low')
+
+        self.assertEqual(self.lockup(self.zomba)['recidivism_count'], 1)
+        with self.assertNumQueries(0):
+            self.lockup(self.mikuyu)
+
+    def test_transfer_invalidates_both_stations(self):
+        self.lockup(self.zomba)
+        self.lockup(self.mikuyu)
+
+        self.prisoner.prison_station = self.mikuyu
+        self.prisoner.save()
+
+        self.assertEqual(self.lockup(self.zomba)['total_prisoners'], 0)
+        self.assertEqual(self.lockup(self.mikuyu)['total_prisoners'], 1)
+
+    def test_aggregate_cached_before_commit_is_not_served_after_it(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            make_prisoner(self.zomba, 'P2')
+            # A concurrent request that cannot see the new row yet caches the old count
+            cached_station_aggregate('headcount', [self.zomba.id], lambda: 1)
+        self.assertEqual(cached_station_aggregate('headcount', [self.zomba.id], lambda: 2), 2)
+
+    def test_versions_survive_culling_of_cached_values(self):
+        version = station_versions([self.zomba.id])[self.zomba.id]
+        # Past the cache's MAX_ENTRIES, so it culls
+        statistics_cache().set_many({f'filler:{index}': index for index in range(1000)})
+        self.assertEqual(station_versions([self.zomba.id])[self.zomba.id], version)
+
+
+class StatisticsApiConditionalGetTests(TestCase):
+    def setUp(self):
+        statistics_cache().clear()
+        self.station = make_station()
+        self.prisoner = make_prisoner(self.station, 'P1')
+        self.user = CustomUser.objects.create_user('officer', password='secret', prison_station=self.station)
+        self.client.force_login(self.user)
+        self.url = reverse('prison_statistics_api')
+
+    def test_unchanged_station_answers_not_modified_without_aggregating(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ETag', response)
+
+        with self.assertNumQueries(2):  # session and user lookups only
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_modification_time_alone_never_validates(self):
+        # Versions change faster than Last-Modified's one-second resolution
+        response = self.client.get(self.url)
+        self.assertNotIn('Last-Modified', response)
+        make_prisoner(self.station, 'P2')
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total_prisoners'], 2)
+
+    def test_change_at_station_produces_new_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        make_prisoner(self.station, 'P2')
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total_prisoners'], 2)
+
+    def test_fields_selects_sections(self):
+        response = self.client.get(self.url, {'fields': 'total_prisoners,children_count'})
+        self.assertEqual(response.json(), {'total_prisoners': 1, 'children_count': 0})
+        self.assertNotEqual(response['ETag'], self.client.get(self.url)['ETag'])
+
+        response = self.client.get(self.url, {'fields': 'total_prisoners,bogus'})
+        self.assertEqual(response.status_code, 400)
+
+
+class StationCountersTests(TestCase):
+    def setUp(self):
+        self.station = make_station()
+        self.other = make_station(name='Mikuyu', code='MK')
+        self.user = CustomUser.objects.create_user('admin', password='secret', is_superuser=True)
+        self.client.force_login(self.user)
+
+    def add_prisoner(self, number, sex='male', **kwargs):
+        prisoner = Prisoner(
+            prisoner_number=number, first_name='John', surname='Banda', sex=sex, age=30,
+            prisoner_class='convicted', prison_station=self.station, date_admitted=date(2024, 1, 15),
+            block_number='A', cell_number='1', **kwargs
+        )
+        with tracking_station_counters(prisoner):
+            prisoner.save()
+        return prisoner
+
+    def test_tracks_admission_detail_changes_and_deletion(self):
+        prisoner = self.add_prisoner('P1')
+        self.add_prisoner('P2', sex='female')
+        with tracking_station_counters(prisoner):
+            make_particulars(prisoner, nationality='zambian')
+            RiskAssessment.objects.create(prisoner=prisoner, risk_level='high')
+
+        counters = StationCounters.objects.get(station=self.station)
+        self.assertEqual((counters.total, counters.male, counters.female), (2, 1, 1))
+        self.assertEqual((counters.foreigners, counters.risk_high), (1, 1))
+
+        self.client.post(reverse('delete_prisoner', args=[prisoner.id]))
+        counters.refresh_from_db()
+        self.assertEqual((counters.total, counters.male, counters.foreigners, counters.risk_high), (1, 0, 0, 0))
+
+    def test_transfer_moves_counts_between_stations(self):
+        prisoner = self.add_prisoner('P1')
+        with tracking_station_counters(prisoner):
+            prisoner.prison_station = self.other
+            prisoner.save()
+
+        counters = station_counters([self.station.id, self.other.id])
+        self.assertEqual(counters[self.station.id].total, 0)
+        self.assertEqual(counters[self.other.id].total, 1)
+
+        with self.assertNumQueries(1):
+            station_counters([self.station.id, self.other.id])
+
+    def test_recount_command_fixes_drift(self):
+        self.add_prisoner('P1')
+        StationCounters.objects.filter(station=self.station).update(total=5)
+
+        out = StringIO()
+        call_command('recount_station_counters', '--dry-run', stdout=out)
+        self.assertIn('total: 5 -> 1', out.getvalue())
+        self.assertEqual(StationCounters.objects.get(station=self.station).total, 5)
+
+        call_command('recount_station_counters', stdout=StringIO())
+        self.assertEqual(StationCounters.objects.get(station=self.station).total, 1)
+        self.assertTrue(StationCounters.objects.filter(station=self.other, total=0).exists())
+
+
+class PrisonerListTests(TestCase):
+    def setUp(self):
+        self.station = make_station()
+        for number, day in [('P1', 1), ('P2', 2), ('P3', 2), ('P4', 3), ('P5', 4)]:
+            make_prisoner(self.station, number, date_admitted=date(2024, 1, day))
+        self.prisoners = Prisoner.objects.all()
+
+    def numbers(self, page):
+        return [prisoner.prisoner_number for prisoner in page]
+
+    def test_walks_forwards_and_backwards(self):
+        first = keyset_page(self.prisoners, per_page=2)
+        self.assertEqual(self.numbers(first), ['P5', 'P4'])
+        self.assertFalse(first.has_previous)
+
+        second = keyset_page(self.prisoners, after=first.next_cursor, per_page=2)
+        self.assertEqual(self.numbers(second), ['P3', 'P2'])
+
+        last = keyset_page(self.prisoners, after=second.next_cursor, per_page=2)
+        self.assertEqual(self.numbers(last), ['P1'])
+        self.assertFalse(last.has_next)
+
+        back = keyset_page(self.prisoners, before=last.previous_cursor, per_page=2)
+        self.assertEqual(self.numbers(back), ['P3', 'P2'])
+        self.assertTrue(back.has_previous)
+
+    def test_bad_cursor_falls_back_to_first_page(self):
+        page = keyset_page(self.prisoners, after='not-a-cursor', per_page=2)
+        self.assertEqual(self.numbers(page), ['P5', 'P4'])
+
+    def test_list_view_keeps_filters_and_never_counts(self):
+        user = CustomUser.objects.create_user('admin', password='secret', is_superuser=True)
+        self.client.force_login(user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('prisoner_list'), {'search_query': 'Banda', 'prisoner_class': 'convicted'})
+        self.assertFalse(any('COUNT(' in query['sql'] or 'OFFSET' in query['sql'] for query in queries))
+        self.assertEqual(len(response.context['prisoners']), 5)
+        self.assertNotContains(response, 'after=')
+
+        page = keyset_page(self.prisoners, per_page=2)
+        response = self.client.get(reverse('prisoner_list'), {'prisoner_class': 'convicted', 'after': page.next_cursor})
+        self.assertEqual(response.context['prisoners'][0].prisoner_number, 'P3')
+        self.assertContains(response, 'prisoner_class=convicted')
+
+    def test_query_count_does_not_grow_with_rows(self):
+        user = CustomUser.objects.create_user('officer', password='secret', prison_station=self.station)
+        RiskAssessment.objects.create(prisoner=Prisoner.objects.get(prisoner_number='P1'), risk_level='high')
+        self.client.force_login(user)
+        url = reverse('prisoner_list')
+
+        # session, user, the station's form choices, and the page itself
+        with self.assertNumQueries(5):
+            self.client.get(url)
+        for number in range(6, 20):
+            make_prisoner(make_station(name=f'Station {number}', code=f'S{number}'), f'X{number}')
+            make_prisoner(self.station, f'P{number}')
+        with self.assertNumQueries(5):
+            response = self.client.get(url, {'risk_level': 'high'})
+        self.assertEqual([prisoner.prisoner_number for prisoner in response.context['prisoners']], ['P1'])
+
+        user.is_superuser = True
+        user.save()
+        with CaptureQueriesContext(connection) as first:
+            self.client.get(url)
+        for number in range(20, 30):
+            make_prisoner(make_station(name=f'Station {number}', code=f'S{number}'), f'X{number}')
+        with self.assertNumQueries(len(first)):
+            response = self.client.get(url)
+        self.assertContains(response, 'Station 29')
+
+
+class PrisonerSearchTests(TestCase):
+    def setUp(self):
+        self.station = make_station()
+        self.chikondi = make_prisoner(self.station, 'ZA/001', first_name='Chikondi', surname='Phiri')
+        self.thoko = make_prisoner(self.station, 'ZA/002', first_name='Thoko', surname='Chikhondi')
+        make_prisoner(self.station, 'ZA/003', first_name='Mphatso', surname='Banda')
+
+    def search(self, query):
+        prisoners = search_prisoners(Prisoner.objects.all(), query).order_by(*SEARCH_ORDERING)
+        return [prisoner.prisoner_number for prisoner in prisoners]
+
+    def test_migrations_leave_the_index_triggers_in_place(self):
+        # A later migration that makes SQLite rebuild prison_prisoner drops
+        # these silently, and the index then stops following edits
+        if connection.vendor != 'sqlite':
+            self.skipTest('The full-text index is SQLite-only')
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'prison_prisoner'")
+            triggers = {name for name, in cursor.fetchall()}
+        self.assertLessEqual(
+            {'prison_prisoner_fts_insert', 'prison_prisoner_fts_delete', 'prison_prisoner_fts_update'}, triggers,
+        )
+
+    def test_phonetic_key_folds_spelling_variants(self):
+        self.assertEqual(phonetic_key('Chikondi'), phonetic_key('Chikhondi'))
+        self.assertEqual(phonetic_key('Lilongwe'), phonetic_key('Rirongwe'))
+        self.assertNotEqual(phonetic_key('Banda'), phonetic_key('Phiri'))
+
+    def test_matches_prefixes_numbers_and_sound_alikes(self):
+        self.assertEqual(self.search('mphat'), ['ZA/003'])
+        self.assertEqual(self.search('ZA 002'), ['ZA/002'])
+        self.assertEqual(set(self.search('Chikhondi')), {'ZA/001', 'ZA/002'})
+        self.assertEqual(self.search('Chikhondi')[0], 'ZA/002')  # exact spelling ranks first
+
+    def test_ranked_results_page_by_rank(self):
+        prisoners = search_prisoners(Prisoner.objects.all(), 'chikhondi')
+        first = keyset_page(prisoners, ordering=SEARCH_ORDERING, per_page=1)
+        second = keyset_page(prisoners, after=first.next_cursor, ordering=SEARCH_ORDERING, per_page=1)
+        self.assertEqual([p.prisoner_number for p in [*first, *second]], ['ZA/002', 'ZA/001'])
+        self.assertFalse(second.has_next)
+
+    def test_index_follows_edits_and_deletes(self):
+        self.chikondi.surname = 'Mwale'
+        self.chikondi.save()
+        self.assertEqual(self.search('mwale'), ['ZA/001'])
+        self.assertEqual(self.search('phiri'), [])
+
+        self.thoko.delete()
+        self.assertEqual(self.search('thoko'), [])
+
+
+class HotQueryIndexTests(TestCase):
+    """EXPLAIN the queries behind the busiest views and check each is answered from an index."""
+
+    def setUp(self):
+        self.station = make_station()
+        self.today = date(2024, 6, 1)
+
+    def assertUsesIndex(self, queryset, index):
+        plan = queryset.explain()
+        if connection.vendor == 'sqlite':
+            self.assertIn(f'USING INDEX {index}', plan)
+        else:
+            self.assertIn(index, plan)
+
+    def test_station_scoped_prisoner_queries(self):
+        active = Prisoner.objects.filter(is_active=True)
+        station = active.filter(prison_station=self.station)
+        self.assertUsesIndex(station.order_by('-date_admitted', '-id')[:26], 'prisoner_station_admitted_idx')
+        self.assertUsesIndex(active.order_by('-date_admitted', '-id')[:26], 'prisoner_active_admitted_idx')
+        self.assertUsesIndex(
+            active.filter(prison_station__name=self.station.name).values('prisoner_class').annotate(n=Count('id')),
+            'prisoner_active_station_idx',
+        )
+
+    def test_release_court_and_activity_queries(self):
+        self.assertUsesIndex(
+            ConvictedPrisoner.objects.filter(
+                date_of_release_on_remission__gte=self.today,
+                date_of_release_on_remission__lte=date(2024, 7, 1),
+            ).order_by('date_of_release_on_remission')[:10],
+            'convicted_release_idx',
+        )
+        self.assertUsesIndex(RemandPrisoner.objects.filter(next_court_date__gte=self.today), 'remand_next_court_idx')
+        self.assertUsesIndex(ActivityLog.objects.order_by('-timestamp')[:10], 'activitylog_timestamp_idx')
+        self.assertUsesIndex(ActivityLog.objects.filter(model='Prisoner', object_id=1), 'activitylog_object_idx')
+
+
+class PrisonerTypeaheadTests(TestCase):
+    def setUp(self):
+        statistics_cache().clear()
+        self.station = make_station()
+        other = make_station(name='Mikuyu', code='MK')
+        self.chikondi = make_prisoner(self.station, 'ZA/010', first_name='Chikondi', surname='Phiri')
+        make_prisoner(self.station, 'ZA/011', first_name='Chisomo', surname='Banda')
+        make_prisoner(other, 'MK/001', first_name='Chimwemwe', surname='Phiri')
+        self.user = CustomUser.objects.create_user('gate', password='secret', prison_station=self.station)
+        self.client.force_login(self.user)
+        self.url = reverse('prisoner_typeahead')
+
+    def lookup(self, q, **params):
+        response = self.client.get(self.url, {'q': q, **params})
+        return [result['prisoner_number'] for result in response.json()['results']]
+
+    def test_prefixes_are_scoped_to_the_station(self):
+        self.assertEqual(self.lookup('chi'), ['ZA/010', 'ZA/011'])
+        self.assertEqual(self.lookup('phiri c'), ['ZA/010'])
+        self.assertEqual(self.lookup('za/011'), ['ZA/011'])
+        self.assertEqual(self.lookup('chi', limit=1), ['ZA/010'])
+        self.assertEqual(self.lookup('mk'), [])
+
+    def test_index_is_patched_on_save_and_delete(self):
+        self.lookup('chi')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.chikondi.first_name = 'Kondwani'
+            self.chikondi.save()
+        with self.assertNumQueries(2):  # session and user only; no rebuild
+            self.assertEqual(self.lookup('kond'), ['ZA/010'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            make_prisoner(self.station, 'ZA/012', first_name='Chifundo')
+            self.chikondi.delete()
+        self.assertEqual(self.lookup('chi'), ['ZA/012', 'ZA/011'])
+        self.assertEqual(self.lookup('kond'), [])
+
+    def test_entries_whose_record_is_gone_are_skipped(self):
+        index = StationPrefixIndex(version=0)
+        for prisoner_id, name in [(1, 'Chikondi'), (2, 'Chisomo')]:
+            index.add({'id': prisoner_id, 'prisoner_number': f'ZA/{prisoner_id}', 'first_name': name,
+                       'middle_name': '', 'surname': 'Phiri', 'prison_station__name': 'Zomba'})
+        del index.records[1]
+        self.assertEqual([record['id'] for _, record in index.matches('chi', 10)], [2])
+        index.remove(2)
+        self.assertEqual(index.records, {})
+        self.assertEqual({prisoner_id for _, prisoner_id in index.entries}, {1})
+
+
+class PrisonerDossierTests(TestCase):
+    def setUp(self):
+        statistics_cache().clear()
+        self.station = make_station()
+        self.other = make_station(name='Mikuyu', code='MK')
+        self.prisoner = make_prisoner(self.station, 'P1', prisoner_class='remand')
+        RemandPrisoner.objects.create(
+            prisoner=self.prisoner, court_case_number='CR/1', next_court_date=date(2024, 7, 1),
+        )
+        make_physical(self.prisoner)
+        make_particulars(self.prisoner)
+        for to_prison in [self.other, self.station]:
+            PrisonerTransfer.objects.create(
+                prisoner=self.prisoner, from_prison=self.station, to_prison=to_prison, reason='Court',
+            )
+        self.user = CustomUser.objects.create_user('admin', password='secret', is_superuser=True)
+        self.client.force_login(self.user)
+
+    def test_loads_every_relation_in_two_queries(self):
+        with self.assertNumQueries(2):
+            prisoner = load_dossier(self.prisoner.id, cached=False)
+            self.assertEqual(prisoner.remand_details.court_case_number, 'CR/1')
+            self.assertEqual(prisoner.particulars.nationality, 'malawian')
+            self.assertEqual(
+                [transfer.to_prison.name for transfer in prisoner.transfers.all()], ['Mikuyu', 'Zomba'],
+            )
+
+    def test_detail_page_is_served_from_cache_until_a_record_changes(self):
+        url = reverse('prisoner_detail', args=[self.prisoner.id])
+        self.client.get(url)
+        with self.assertNumQueries(2):  # session and user only
+            response = self.client.get(url)
+        self.assertContains(response, 'Mikuyu')
+
+        particulars = self.prisoner.particulars
+        particulars.district = 'Mangochi'
+        particulars.save()
+        self.assertEqual(load_dossier(self.prisoner.id).particulars.district, 'Mangochi')
+
+        self.other.name = 'Mikuyu II'
+        self.other.save()
+        self.assertContains(self.client.get(url), 'Mikuyu II')
+
+
+class EditDetailsViewTests(TestCase):
+    def setUp(self):
+        self.station = make_station()
+        self.prisoner = make_prisoner(self.station, 'R1', prisoner_class='remand')
+        make_particulars(self.prisoner)
+        self.user = CustomUser.objects.create_user('admin', password='secret', is_superuser=True)
+        self.client.force_login(self.user)
+        self.url = reverse('edit_remand_details', args=[self.prisoner.id])
+
+    def test_get_reads_once_and_writes_nothing(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        statements = [query['sql'] for query in queries]
+        self.assertFalse([sql for sql in statements if sql.startswith(('INSERT', 'UPDATE', 'DELETE'))])
+        self.assertEqual(len([sql for sql in statements if 'FROM "prison_prisoner"' in sql]), 1)
+        self.assertFalse(RemandPrisoner.objects.exists())
+        self.assertFalse(PhysicalCharacteristics.objects.exists())
+
+    def test_valid_post_creates_missing_records(self):
+        response = self.client.get(self.url)
+        data = {}
+        for name in ['prisoner_form', 'particulars_form']:
+            form = response.context[name]
+            data.update({field: form[field].value() for field in form.fields if form[field].value() is not None})
+        data.update({
+            'court_case_number': 'CR/9', 'next_court_date': '2024-07-01', 'remand_extensions': 0,
+            'height': 170, 'weight': 70, 'body_build': 'medium', 'skin_color': 'dark', 'eyes_color': 'brown',
+            'health_status': 'none',
+        })
+        del data['image']
+
+        response = self.client.post(self.url, data)
+        self.assertRedirects(response, reverse('prisoner_detail', args=[self.prisoner.id]))
+        self.assertEqual(RemandPrisoner.objects.get(prisoner=self.prisoner).court_case_number, 'CR/9')
+        self.assertTrue(PhysicalCharacteristics.objects.filter(prisoner=self.prisoner).exists())
+
+
+class AdmissionTests(TestCase):
+    def setUp(self):
+        self.station = make_station()
+        self.user = CustomUser.objects.create_user('admin', password='secret', is_superuser=True)
+        self.client.force_login(self.user)
+        self.url = reverse('admit_prisoner')
+
+    def admission(self, number, **prisoner):
+        return {
+            'prisoner': {
+                'prisoner_number': number, 'first_name': 'Chikondi', 'surname': 'Phiri', 'sex': 'female',
+                'age': 25, 'prisoner_class': 'remand', 'prison_station': self.station.id,
+                'block_number': 'B', 'cell_number': '4', 'date_admitted': '2024-05-01', **prisoner,
+            },
+            'remand': {'court_case_number': 'CR/5', 'next_court_date': '2024-06-01', 'remand_extensions': 0},
+            'particulars': {
+                'nationality': 'malawian', 'district': 'Zomba', 'chief': 'Chief', 'village': 'Village',
+                'religion': 'christian', 'fathers_name': 'Father', 'mothers_name': 'Mother',
+                'next_of_kin': 'Kin', 'next_of_kin_location': 'Zomba', 'education_level': 'primary',
+            },
+            'physical': {
+                'height': 160, 'weight': 60, 'body_build': 'medium', 'skin_color': 'dark',
+                'eyes_color': 'brown', 'health_status': 'none', 'children_count': 1, 'has_child': True,
+            },
+        }
+
+    def post(self, payload):
+        return self.client.post(self.url, payload, content_type='application/json')
+
+    def test_json_admission_creates_everything_in_one_commit(self):
+        response = self.post(self.admission('R9'))
+        self.assertEqual(response.status_code, 201, response.content)
+        prisoner = Prisoner.objects.get(pk=response.json()['id'])
+        self.assertEqual(prisoner.created_by, self.user)
+        self.assertEqual(prisoner.remand_details.court_case_number, 'CR/5')
+        self.assertEqual(prisoner.physical.children_count, 1)
+        self.assertTrue(ActivityLog.objects.filter(object_id=prisoner.id, action='create').exists())
+        self.assertEqual(StationCounters.objects.get(station=self.station).female, 1)
+
+    def test_invalid_detail_section_saves_nothing(self):
+        payload = self.admission('R9')
+        del payload['physical']['height']
+        response = self.post(payload)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('height', response.json()['errors']['physical'])
+        self.assertFalse(Prisoner.objects.exists())
+
+    def test_batch_is_all_or_nothing(self):
+        response = self.post([self.admission('R1'), self.admission('R2', age='old')])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'][0]['index'], 1)
+        self.assertFalse(Prisoner.objects.exists())
+
+        response = self.post([self.admission('R1'), self.admission('R1')])
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(Prisoner.objects.exists())
+
+        response = self.post([self.admission('R1'), self.admission('R2')])
+        self.assertEqual(len(response.json()['results']), 2)
+
+    def test_form_page_renders_both_classes(self):
+        response = self.client.get(self.url)
+        self.assertContains(response, 'name="convicted-court"')
+        self.assertContains(response, 'name="remand-court_case_number"')
+
+
+class TempMediaTestCase(TestCase):
+    """Points MEDIA_ROOT and the PDF cache at a temporary directory removed after each test."""
+
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=self.media, PDF_CACHE_DIR=f'{self.media}/pdf_cache'))
+
+
+class ReportTestCase(TempMediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.station = make_station()
+        self.prisoner = make_prisoner(self.station, 'R1', prisoner_class='remand')
+        RemandPrisoner.objects.create(prisoner=self.prisoner, court_case_number='CR/1', next_court_date=date(2024, 7, 1))
+        make_physical(self.prisoner)
+        make_particulars(self.prisoner)
+        self.user = CustomUser.objects.create_user('admin', password='secret', is_superuser=True)
+        self.client.force_login(self.user)
+
+
+class ReportJobQueueTests(ReportTestCase):
+    def test_report_is_queued_rendered_by_worker_and_downloaded(self):
+        url = reverse('generate_prisoner_report', args=[self.prisoner.id])
+        response = self.client.get(url, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 202)
+        job = response.json()
+        self.assertEqual((job['status'], job['download_url']), ('queued', None))
+        self.assertEqual(self.client.get(url, HTTP_ACCEPT='application/json').json()['id'], job['id'])
+
+        call_command('run_report_worker', '--once', stdout=StringIO())
+
+        status = self.client.get(job['status_url'], {'format': 'json'}).json()
+        self.assertEqual((status['status'], status['progress']), ('done', 100))
+        response = self.client.get(status['download_url'])
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+
+    def test_failed_render_is_recorded(self):
+        self.prisoner.physical.delete()
+        self.client.get(reverse('generate_prisoner_report', args=[self.prisoner.id]))
+        call_command('run_report_worker', '--once', stdout=StringIO())
+        job = ReportJob.objects.get()
+        self.assertEqual(job.status, 'failed')
+        self.assertTrue(job.error)
+
+    def test_jobs_are_private_and_stale_claims_are_requeued(self):
+        self.client.get(reverse('upcoming_releases_report'), {'format': 'pdf'})
+        job = claim_next_job('worker-1')
+        self.assertIsNone(claim_next_job('worker-2'))
+
+        # A long render is left alone while its worker keeps checking in
+        ReportJob.objects.filter(pk=job.pk).update(started_at=job.started_at - timedelta(hours=1))
+        self.assertEqual(requeue_stale_jobs(), 0)
+        ReportJob.objects.filter(pk=job.pk).update(heartbeat_at=job.heartbeat_at - timedelta(hours=1))
+        self.assertEqual(requeue_stale_jobs(), 1)
+        self.assertEqual(claim_next_job('worker-2').attempts, 2)
+
+        other = CustomUser.objects.create_user('officer', password='secret', prison_station=self.station)
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(reverse('report_job_status', args=[job.pk])).status_code, 404)
+
+    def test_expired_jobs_and_their_pdfs_are_pruned(self):
+        self.client.get(reverse('upcoming_releases_report'), {'format': 'pdf'})
+        call_command('run_report_worker', '--once', stdout=StringIO())
+        job = ReportJob.objects.get()
+        path = job.output.path
+        self.assertTrue(os.path.exists(path))
+
+        self.assertEqual(prune_finished_jobs(), 0)
+        ReportJob.objects.update(finished_at=job.finished_at - timedelta(days=8))
+        self.assertEqual(prune_finished_jobs(), 1)
+        self.assertFalse(ReportJob.objects.exists())
+        self.assertFalse(os.path.exists(path))
+
+    def test_lockup_and_transfer_lists_render_as_tables(self):
+        other = make_station('Mzuzu', 'MZ')
+        make_prisoner(other, 'M1', surname='Mwale')
+        PrisonerTransfer.objects.create(prisoner=self.prisoner, from_prison=other, to_prison=self.station, reason='Court')
+        officer = CustomUser.objects.create_user('officer', password='secret', prison_station=self.station)
+        self.client.force_login(officer)
+        self.client.get(reverse('lockup_list_report'))
+        self.client.get(reverse('transfer_list_report'), {'days': 7})
+        call_command('run_report_worker', '--once', stdout=StringIO())
+
+        texts = {}
+        for job in ReportJob.objects.all():
+            self.assertEqual(job.status, 'done', job.error)
+            with job.output.open('rb') as pdf:
+                texts[job.kind] = ''.join(page.extract_text() for page in PdfReader(pdf).pages)
+        self.assertIn('R1', texts['lockup_list'])
+        self.assertNotIn('M1', texts['lockup_list'])
+        self.assertIn('Mzuzu', texts['transfer_list'])
+
+    def test_release_pdf_is_refused_to_staff_without_a_station(self):
+        self.client.force_login(CustomUser.objects.create_user('clerk', password='secret'))
+        response = self.client.get(reverse('upcoming_releases_report'), {'format': 'pdf'}, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(ReportJob.objects.exists())
+
+
+class PrisonerReportCacheTests(ReportTestCase):
+    def report(self, **headers):
+        return self.client.get(reverse('generate_prisoner_report', args=[self.prisoner.id]), **headers)
+
+    def test_prewarmed_report_is_served_from_cache_with_etag(self):
+        out = StringIO()
+        call_command('prewarm_report_cache', 'ZA', stdout=out)
+        self.assertIn('rendered 1', out.getvalue())
+
+        response = self.report()
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertFalse(ReportJob.objects.exists())
+        self.assertEqual(self.report(HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_detail_change_produces_a_new_fingerprint(self):
+        before = report_fingerprint(load_dossier(self.prisoner.id))
+        self.prisoner.physical.weight = 75
+        self.prisoner.physical.save()
+        self.assertNotEqual(report_fingerprint(load_dossier(self.prisoner.id)), before)
+
+    def test_eviction_removes_least_recently_used(self):
+        store_pdf('a' * 64, b'%PDF' + b'a' * 100)
+        store_pdf('b' * 64, b'%PDF' + b'b' * 100)
+        old = get_cached_pdf('a' * 64)
+        os.utime(old, (0, 0))
+        self.assertEqual(evict(max_bytes=150), 1)
+        self.assertIsNone(get_cached_pdf('a' * 64))
+        self.assertIsNotNone(get_cached_pdf('b' * 64))
+
+    @override_settings(PDF_CACHE_MAX_BYTES=1000)
+    def test_stores_only_rescan_the_cache_once_it_may_be_full(self):
+        for name in 'abcde':
+            store_pdf(name * 64, b'%PDF' + b'x' * 96)
+        # One scan for the first store; the rest only add to the estimate
+        self.assertEqual(_estimates[cache_dir()], (500, 4))
+
+        os.utime(cached_path('a' * 64), (0, 0))
+        store_pdf('f' * 64, b'%PDF' + b'x' * 596)
+        # Trimmed below the limit, least recently used first
+        size, stores = _estimates[cache_dir()]
+        self.assertEqual(stores, 0)
+        self.assertLessEqual(size, 900)
+        self.assertIsNone(get_cached_pdf('a' * 64))
+        self.assertIsNotNone(get_cached_pdf('f' * 64))
+
+
+class StationReportExportTests(ReportTestCase):
+    def test_export_zips_each_report_and_lists_failures(self):
+        broken = make_prisoner(self.station, 'R2', prisoner_class='remand')
+        output = f'{self.media}/reports.zip'
+        call_command('export_station_reports', 'za', '--workers', '0', '--output', output, stdout=StringIO())
+
+        with zipfile.ZipFile(output) as archive:
+            self.assertEqual(sorted(archive.namelist()), ['R1.pdf', 'errors.txt'])
+            self.assertTrue(archive.read('R1.pdf').startswith(b'%PDF'))
+            self.assertIn(broken.prisoner_number, archive.read('errors.txt').decode())
+
+    def test_export_view_is_for_superusers_only(self):
+        self.client.force_login(CustomUser.objects.create_user('clerk', password='secret'))
+        response = self.client.get(reverse('export_station_reports', args=[self.station.id]))
+        self.assertRedirects(response, reverse('manage_prison_stations'), fetch_redirect_response=False)
+
+
+class TablePdfTests(TestCase):
+    def test_rows_are_paginated_with_repeated_headings(self):
+        rows = ([f'P{index:04d}', 'x' * 500] for index in range(100))
+        pdf = render_table_pdf('Lockup', [('Number', 1), ('Note', 3)], rows)
+
+        pages = [page.extract_text() for page in PdfReader(BytesIO(pdf)).pages]
+        self.assertEqual(len(pages), 3)
+        self.assertTrue(all('Number' in text and 'Lockup' in text for text in pages))
+        self.assertEqual(sum(text.count('P0') for text in pages), 100)
+        self.assertIn('...', pages[0])
+
+    def test_upcoming_releases_pdf_lists_releases(self):
+        station = make_station()
+        prisoner = make_prisoner(station, 'C1')
+        ConvictedPrisoner.objects.create(
+            prisoner=prisoner, sentence=12, court='High Court', offense='Theft',
+            date_of_committal=date(2024, 1, 1), wef_date=date(2024, 1, 1),
+        )
+        ConvictedPrisoner.objects.update(date_of_release_on_remission=date.today() + timedelta(days=3))
+        text = PdfReader(BytesIO(render_upcoming_releases(station.id))).pages[0].extract_text()
+        self.assertIn('C1', text)
+        self.assertNotIn('No records.', text)
+
+
+def make_photo(size=(1200, 800), orientation=None):
+    image = Image.new('RGB', size, 'red')
+    exif = Image.Exif()
+    exif[0x0110] = 'Phone'  # Model
+    if orientation:
+        exif[0x0112] = orientation
+    output = BytesIO()
+    image.save(output, 'JPEG', exif=exif)
+    return SimpleUploadedFile('photo.jpg', output.getvalue(), content_type='image/jpeg')
+
+
+class ImageDerivativeTests(TempMediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.station = make_station()
+
+    def test_upload_is_stored_upright_without_exif_with_derivatives(self):
+        # Orientation 6: the camera was rotated, so the stored pixels are sideways
+        prisoner = make_prisoner(self.station, 'P1', image=make_photo(orientation=6))
+
+        with Image.open(prisoner.image.path) as stored:
+            self.assertEqual(stored.size, (800, 1200))
+            self.assertFalse(stored.getexif())
+        with Image.open(prisoner.image_thumbnail.path) as thumbnail:
+            self.assertEqual(thumbnail.size, DERIVATIVES['thumbnail'][0])
+        with Image.open(prisoner.image_report.path) as report:
+            self.assertEqual(report.size, (160, 240))
+        self.assertNotEqual(prisoner.image_detail.name, prisoner.image.name)
+
+    def test_backfill_generates_missing_derivatives(self):
+        prisoner = make_prisoner(self.station, 'P1', image=make_photo())
+        for kind in DERIVATIVES:
+            prisoner.image.storage.delete(derivative_name(prisoner.image.name, kind))
+        self.assertEqual(Prisoner.objects.get().image_thumbnail.name, prisoner.image.name)
+
+        out = StringIO()
+        call_command('backfill_image_derivatives', stdout=out)
+        self.assertIn('Generated derivatives for 1 photo(s)', out.getvalue())
+        self.assertTrue(derivatives_exist(Prisoner.objects.get().image))
+
+
+class ContentAddressedImageTests(TempMediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.station = make_station()
+
+    def stored_files(self):
+        return sorted(walk_files(prisoner_image_storage, 'prisoner_images'))
+
+    def test_identical_uploads_share_a_file_until_the_last_reference_goes(self):
+        first = make_prisoner(self.station, 'P1', image=make_photo())
+        second = make_prisoner(self.station, 'P2', image=make_photo())
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertEqual(len(self.stored_files()), 1 + len(DERIVATIVES))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(derivatives_exist(second.image))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.image = make_photo(size=(600, 600))
+            second.save()
+        self.assertEqual(len(self.stored_files()), 1 + len(DERIVATIVES))
+        self.assertIn(second.image.name, self.stored_files())
+
+    def test_dedupe_moves_legacy_copies_and_gc_removes_orphans(self):
+        photo = make_photo().read()
+        for number, legacy_name in [('P1', 'IMG.jpg'), ('P2', 'IMG_abc1234.jpg'), ('P3', 'IMG_def5678.jpg')]:
+            name = FileSystemStorage().save(f'prisoner_images/{legacy_name}', BytesIO(photo))
+            Prisoner.objects.filter(pk=make_prisoner(self.station, number).pk).update(image=name)
+        Prisoner.objects.filter(prisoner_number='P3').update(image='')
+
+        call_command('dedupe_prisoner_images', stdout=StringIO())
+        names = set(Prisoner.objects.exclude(image='').values_list('image', flat=True))
+        self.assertEqual(len(names), 1)
+        self.assertTrue(name_digest(names.pop()))
+
+        os.utime(os.path.join(self.media, 'prisoner_images', 'IMG_def5678.jpg'), (0, 0))
+        out = StringIO()
+        call_command('gc_prisoner_images', stdout=out)
+        self.assertIn('Deleted 1 orphaned file(s)', out.getvalue())
+        self.assertEqual(len(self.stored_files()), 1 + len(DERIVATIVES))
+
+
+class PrisonerMediaTests(TempMediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.station = make_station()
+        self.prisoner = make_prisoner(self.station, 'P1', image=make_photo())
+        self.client.force_login(CustomUser.objects.create_user('officer', password='secret', prison_station=self.station))
+
+    def test_photo_is_served_with_validators_ranges_and_immutable_caching(self):
+        url = self.prisoner.image_thumbnail.url
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(b''.join(response.streaming_content), Path(self.prisoner.image_thumbnail.path).read_bytes())
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+        partial = self.client.get(url, HTTP_RANGE='bytes=2-11')
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(len(b''.join(partial.streaming_content)), 10)
+        self.assertTrue(partial['Content-Range'].startswith('bytes 2-11/'))
+        self.assertEqual(self.client.get(url, HTTP_RANGE='bytes=999999-').status_code, 416)
+
+    def test_only_photos_of_visible_prisoners_are_served(self):
+        other = make_prisoner(make_station('Mzuzu', 'MZ'), 'P2', image=make_photo(size=(500, 500)))
+        self.assertEqual(self.client.get(other.image.url).status_code, 404)
+        self.assertEqual(self.client.get('/media/reports/secret.pdf').status_code, 404)
+        stale_derivative = self.prisoner.image_thumbnail.url.replace('/v1/', '/v0/')
+        self.assertEqual(self.client.get(stale_derivative).status_code, 404)
+
+    @override_settings(MEDIA_SENDFILE_HEADER='X-Accel-Redirect', MEDIA_ACCEL_REDIRECT_PREFIX='/internal/')
+    def test_transfer_can_be_handed_to_the_front_server(self):
+        response = self.client.get(self.prisoner.image.url)
+        self.assertEqual(response['X-Accel-Redirect'], f'/internal/{self.prisoner.image.name}')
+        self.assertEqual(response.content, b'')
+
+
+class ReleaseDateTests(TestCase):
+    def test_release_dates_follow_the_sentence_rules(self):
+        # 18 months and 15 days from 29 Feb 2024 ends 13 Sep 2025; remission of
+        # 6 months 5 days and a 2 month reduction come off that
+        self.assertEqual(release_dates(date(2024, 3, 1), 18.5, 2), (date(2025, 9, 13), date(2025, 1, 8)))
+        # Month arithmetic clamps to the end of shorter months
+        self.assertEqual(shift(date(2024, 1, 31), 1, 0), date(2024, 2, 29))
+
+    def test_computed_release_dates_are_not_offered_for_editing(self):
+        # save() derives both from the sentence, so an entered value would be lost
+        fields = ConvictedPrisonerForm().fields
+        self.assertNotIn('date_of_release', fields)
+        self.assertNotIn('date_of_release_on_remission', fields)
+
+    def test_recompute_stores_only_drifted_dates(self):
+        station = make_station()
+        for number in ['C1', 'C2']:
+            ConvictedPrisoner.objects.create(
+                prisoner=make_prisoner(station, number), sentence=12, court='High Court',
+                date_of_committal=date(2024, 1, 1), wef_date=date(2024, 1, 1),
+            )
+        dates = ConvictedPrisoner.objects.filter(prisoner__prisoner_number='C1').values_list(
+            'date_of_release', 'date_of_release_on_remission',
+        )
+        self.assertEqual(dates.get(), (date(2024, 12, 31), date(2024, 8, 31)))
+        dates.update(date_of_release=None, date_of_release_on_remission=None)
+
+        out = StringIO()
+        call_command('recompute_release_dates', '--dry-run', stdout=out)
+        self.assertIn('1 of 2 release date(s) would change', out.getvalue())
+        self.assertEqual(dates.get(), (None, None))
+
+        call_command('recompute_release_dates', '--chunk-size', '1', stdout=StringIO())
+        self.assertEqual(dates.get(), (date(2024, 12, 31), date(2024, 8, 31)))
+
+        # A stale release date alone is also rewritten
+        dates.update(date_of_release=date(2030, 1, 1))
+        call_command('recompute_release_dates', stdout=StringIO())
+        self.assertEqual(dates.get(), (date(2024, 12, 31), date(2024, 8, 31)))
+
+
+class ReleaseCalendarTests(TestCase):
+    def setUp(self):
+        self.station = make_station()
+        self.other = make_station('Mzuzu', 'MZ')
+        self.prisoner = self.convict(self.station, 'C1', date(2025, 1, 1))
+        self.convict(self.station, 'C2', date(2025, 1, 10))
+
+    def convict(self, station, number, wef_date, sentence=12):
+        prisoner = make_prisoner(station, number)
+        ConvictedPrisoner.objects.create(
+            prisoner=prisoner, sentence=sentence, court='High Court',
+            date_of_committal=wef_date, wef_date=wef_date,
+        )
+        return prisoner
+
+    def calendar(self):
+        return set(StationReleaseDay.objects.values_list('station__code', 'date', 'releases'))
+
+    def test_calendar_follows_sentences_transfers_and_releases(self):
+        # 12 months from the day before the WEF date, less four months' remission
+        self.assertEqual(self.calendar(), {('ZA', date(2025, 8, 31), 1), ('ZA', date(2025, 9, 9), 1)})
+
+        details = self.prisoner.convicted_details
+        details.wef_date = date(2025, 1, 10)
+        details.save()
+        self.assertEqual(self.calendar(), {('ZA', date(2025, 9, 9), 2)})
+
+        self.prisoner.prison_station = self.other
+        self.prisoner.save()
+        self.assertEqual(self.calendar(), {('ZA', date(2025, 9, 9), 1), ('MZ', date(2025, 9, 9), 1)})
+
+        self.prisoner.is_active = False
+        self.prisoner.save()
+        self.assertEqual(self.calendar(), {('ZA', date(2025, 9, 9), 1)})
+
+        self.prisoner.is_active = True
+        self.prisoner.save()
+        self.assertEqual(self.calendar(), {('ZA', date(2025, 9, 9), 1), ('MZ', date(2025, 9, 9), 1)})
+
+        self.prisoner.delete()
+        Prisoner.objects.get(prisoner_number='C2').delete()
+        self.assertEqual(self.calendar(), set())
+
+    def test_rebuild_matches_incremental_calendar(self):
+        self.convict(self.other, 'C3', date(2025, 1, 1), sentence=24)
+        expected = self.calendar()
+        StationReleaseDay.objects.update(releases=7)
+        self.assertEqual(rebuild_release_calendar(), 3)
+        self.assertEqual(self.calendar(), expected)
+
+    def test_buckets_are_zero_filled_and_clipped_to_the_range(self):
+        station_ids = [self.station.pk]
+        weeks = release_calendar(station_ids, date(2025, 8, 30), date(2025, 9, 10), 'week')
+        self.assertEqual(
+            [(week['start'], week['end'], week['releases']) for week in weeks],
+            [
+                (date(2025, 8, 30), date(2025, 8, 31), 1),
+                (date(2025, 9, 1), date(2025, 9, 7), 0),
+                (date(2025, 9, 8), date(2025, 9, 10), 1),
+            ],
+        )
+        months = release_calendar(station_ids, date(2025, 1, 1), date(2025, 12, 31), 'month')
+        self.assertEqual(len(months), 12)
+        self.assertEqual([month['releases'] for month in months if month['releases']], [1, 1])
+
+    def test_api_is_scoped_to_the_users_station(self):
+        self.convict(self.other, 'C3', date(2025, 1, 1))
+        user = CustomUser.objects.create_user('officer', password='secret', prison_station=self.station)
+        self.client.force_login(user)
+        url = reverse('release_calendar_api')
+
+        response = self.client.get(url, {'start': '2025-08-01', 'end': '2025-09-30', 'bucket': 'month', 'roster': '1'})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['total'], 2)
+        self.assertEqual([len(month['roster']) for month in data['buckets']], [1, 1])
+        self.assertEqual(data['buckets'][0]['roster'][0]['prisoner_number'], 'C1')
+
+        repeat = self.client.get(
+            url, {'start': '2025-08-01', 'end': '2025-09-30', 'bucket': 'month', 'roster': '1'},
+            HTTP_IF_NONE_MATCH=response['ETag'],
+        )
+        self.assertEqual(repeat.status_code, 304)
+
+        self.assertEqual(self.client.get(url, {'bucket': 'year'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'station': self.other.pk}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'end': '2026-01-01', 'start': '2020-01-01'}).status_code, 400)
+        for params in [{'start': '9999-12-30'}, {'start': '9999-12-25', 'days': '3', 'bucket': 'week'}]:
+            self.assertEqual(self.client.get(url, params).status_code, 400)
+        # An oversized day count is clamped to the longest range
+        response = self.client.get(url, {'start': '2025-01-01', 'days': '99999999999', 'bucket': 'month'})
+        self.assertEqual(len(response.json()['buckets']), 61)
+
+
+class RemissionSimulationTests(TestCase):
+    def setUp(self):
+        self.station = make_station()
+        self.murder, self.libel = [value for value, _ in ConvictedPrisoner.OFFENSE_CHOICES[:2]]
+        for number, offense, wef_date in [
+            ('C1', self.murder, date(2025, 1, 1)),
+            ('C2', self.libel, date(2025, 1, 1)),
+            ('C3', self.libel, date(2025, 1, 1)),
+        ]:
+            ConvictedPrisoner.objects.create(
+                prisoner=make_prisoner(self.station, number), sentence=12, offense=offense,
+                court='High Court', date_of_committal=wef_date, wef_date=wef_date,
+            )
+        make_prisoner(self.station, 'R1', prisoner_class='remand')
+
+    def test_current_rule_reproduces_stored_release_dates(self):
+        population = SentencePopulation.load()
+        self.assertEqual(len(population), 3)
+        self.assertEqual(population.release_dates(RemissionPolicy()), [date(2025, 8, 31)] * len(population.sizes))
+
+        with self.assertNumQueries(0):
+            projection = population.simulate(start=date(2025, 8, 30), days=3)
+        # Everyone convicted leaves on 31 Aug; the remand prisoner stays
+        self.assertEqual(projection.stations[self.station.pk], [4, 1, 1])
+        self.assertEqual(projection.releases[self.station.pk], 3)
+
+    def test_policies_change_the_projection_without_writing(self):
+        population = SentencePopulation.load()
+        quarter = population.simulate(RemissionPolicy(remission_divisor=4), start=date(2025, 8, 30), days=41, step=10)
+        # A quarter off instead of a third moves release to 30 Sep
+        self.assertEqual(quarter.totals, [4, 4, 4, 4, 1])
+
+        amnesty = RemissionPolicy(amnesty_months=6, amnesty_offenses=frozenset([self.libel]))
+        self.assertEqual(population.simulate(amnesty, start=date(2025, 8, 30), days=1).totals, [2])
+        self.assertEqual(
+            set(ConvictedPrisoner.objects.values_list('date_of_release_on_remission', flat=True)), {date(2025, 8, 31)},
+        )
+
+        out = StringIO()
+        call_command('simulate_remission', '--divisor', '4', '--days', '30', stdout=out)
+        self.assertIn('Projected 3 sentence(s)', out.getvalue())
+
+
+class OccupancyForecastTests(TestCase):
+    def setUp(self):
+        statistics_cache().clear()
+        self.today = date(2025, 6, 1)
+        self.station = make_station(capacity=3)
+        self.other = make_station('Mzuzu', 'MZ', capacity=50)
+        # Admitted long ago, so the station has no recent admission rate
+        for number in ['C1', 'C2']:
+            ConvictedPrisoner.objects.create(
+                prisoner=make_prisoner(self.station, number, date_admitted=date(2020, 1, 1)), sentence=12,
+                court='High Court', date_of_committal=date(2025, 1, 1), wef_date=date(2025, 1, 1),
+            )
+        for number in ['R1', 'R2']:
+            RemandPrisoner.objects.create(
+                prisoner=make_prisoner(self.station, number, prisoner_class='remand', date_admitted=date(2020, 1, 1)),
+                court_case_number=number, next_court_date=date(2025, 7, 1),
+            )
+
+    def test_forecast_combines_releases_court_dates_and_admissions(self):
+        forecast, = occupancy_forecasts([self.station.pk], months=6, today=self.today)
+        self.assertEqual(forecast['current'], 4)
+        self.assertEqual(len(forecast['series']), 183)
+        # Half the remand prisoners leave at court on 1 Jul, the convicted on 31 Aug
+        series = dict(zip([self.today + timedelta(days=offset) for offset in range(1, 184)], forecast['series']))
+        self.assertEqual([series[date(2025, 6, 30)], series[date(2025, 7, 1)], series[date(2025, 8, 31)]], [4, 3, 1])
+        self.assertEqual(forecast['over_capacity_from'], date(2025, 6, 2))
+
+        # Three admissions in the last 180 days add one prisoner every 60 days
+        for number in ['N1', 'N2', 'N3']:
+            make_prisoner(self.station, number, date_admitted=date(2025, 5, 1))
+        forecast, = occupancy_forecasts([self.station.pk], months=6, today=self.today)
+        self.assertEqual(forecast['current'], 7)
+        self.assertEqual(forecast['series'][-1], 7 - 3 + 3)
+
+    def test_forecasts_are_cached_per_station(self):
+        occupancy_forecasts([self.station.pk, self.other.pk], today=self.today)
+        make_prisoner(self.other, 'M1')
+        with CaptureQueriesContext(connection) as queries:
+            forecasts = occupancy_forecasts([self.station.pk, self.other.pk], today=self.today)
+        # Only the station that admitted someone is recomputed
+        self.assertEqual(sum('prison_stationreleaseday' in query['sql'] for query in queries.captured_queries), 1)
+        self.assertEqual([forecast['current'] for forecast in forecasts], [4, 1])
+
+    def test_view_lists_overflowing_stations_first(self):
+        user = CustomUser.objects.create_user('admin', password='secret', is_superuser=True)
+        self.client.force_login(user)
+        response = self.client.get(reverse('occupancy_forecast'), {'months': 3})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([forecast['name'] for forecast in response.context['forecasts']], ['Zomba', 'Mzuzu'])
+        self.assertEqual(response.context['over_capacity'], 1)
+        self.assertContains(response, 'table-danger', count=1)
@@ -0,0 +1,137 @@
+import threading
+from bisect import bisect_left, insort
+
+from .cache import station_versions
+from .models import Prisoner
+
+TYPEAHEAD_LIMIT = 10
+TYPEAHEAD_MAX_LIMIT = 50
+
+
+def _normalise(text):
+    return ' '.join(text.lower().split())
+
+
+class StationPrefixIndex:
+    """
+    Sorted (key, prisoner_id) pairs for one station's active prisoners.
+
+    Every prisoner is listed under their number, each name and their full
+    name, so a prefix of any of them is found with one bisect and a short
+    forward scan.
+    """
+
+    def __init__(self, version):
+        self.version = version
+        self.entries = []
+        self.records = {}
+
+    @staticmethod
+    def keys_for(record):
+        names = [record['first_name'], record['middle_name'], record['surname']]
+        keys = {_normalise(record['prisoner_number'])}
+        keys.update(_normalise(name) for name in names if name)
+        keys.add(_normalise(f"{record['first_name']} {record['surname']}"))
+        keys.add(_normalise(f"{record['surname']} {record['first_name']}"))
+        keys.discard('')
+        return keys
+
+    def add(self, record):
+        self.records[record['id']] = record
+        for key in self.keys_for(record):
+            insort(self.entries, (key, record['id']))
+
+    def remove(self, prisoner_id):
+        # Entries go before the record, so an entry never points at a missing record
+        record = self.records.get(prisoner_id)
+        if record is None:
+            return
+        for key in self.keys_for(record):
+            position = bisect_left(self.entries, (key, prisoner_id))
+            if position < len(self.entries) and self.entries[position] == (key, prisoner_id):
+                del self.entries[position]
+        del self.records[prisoner_id]
+
+    def matches(self, prefix, limit):
+        """Return up to `limit` (key, record) pairs whose key starts with `prefix`, in key order."""
+        found = {}
+        position = bisect_left(self.entries, (prefix,))
+        while position < len(self.entries) and len(found) < limit:
+            key, prisoner_id = self.entries[position]
+            if not key.startswith(prefix):
+                break
+            found.setdefault(prisoner_id, key)
+            position += 1
+        records = ((key, self.records.get(prisoner_id)) for prisoner_id, key in found.items())
+        return [(key, record) for key, record in records if record is not None]
+
+
+_indexes = {}
+_lock = threading.Lock()
+
+RECORD_FIELDS = ('id', 'prisoner_number', 'first_name', 'middle_name', 'surname', 'prison_station__name')
+
+
+def _build(station_id, version):
+    index = StationPrefixIndex(version)
+    records = Prisoner.objects.filter(is_active=True, prison_station_id=station_id).values(*RECORD_FIELDS)
+    entries = []
+    for record in records:
+        index.records[record['id']] = record
+        entries.extend((key, record['id']) for key in index.keys_for(record))
+    entries.sort()
+    index.entries = entries
+    return index
+
+
+def station_index(station_id, version):
+    """The prefix index for `station_id`, rebuilt if it was built at another version."""
+    index = _indexes.get(station_id)
+    if index is None or index.version != version:
+        index = _build(station_id, version)
+        with _lock:
+            _indexes[station_id] = index
+    return index
+
+
+def typeahead(station_ids, query, limit=TYPEAHEAD_LIMIT):
+    """Active prisoners at `station_ids` whose number or a name starts with `query`."""
+    prefix = _normalise(query)
+    if not prefix or not station_ids:
+        return []
+
+    matches = []
+    for station_id, version in station_versions(station_ids).items():
+        index = station_index(station_id, version)
+        # patch_prisoner() edits indexes in place under the same lock
+        with _lock:
+            matches.extend(index.matches(prefix, limit))
+    matches.sort(key=lambda match: (match[0], match[1]['id']))
+    return [record for _, record in matches[:limit]]
+
+
+def patch_prisoner(prisoner_id, prisoner, version_changes):
+    """
+    Bring this process's indexes up to date after prisoner `prisoner_id`
+    was saved (`prisoner` is the saved instance) or deleted (`prisoner` is
+    None), without a rebuild.
+
+    `version_changes` is what bump_station_versions() passed to its
+    `committed` callback for the change. An index is patched only if it was
+    built at one of the versions the change moved through; otherwise it
+    missed something else and is dropped to be rebuilt.
+    """
+    with _lock:
+        for station_id, (previous, current) in version_changes.items():
+            index = _indexes.get(station_id)
+            if index is None:
+                continue
+            if index.version not in previous:
+                del _indexes[station_id]
+                continue
+            index.remove(prisoner_id)
+            if prisoner is not None and prisoner.is_active and station_id == prisoner.prison_station_id:
+                record = {field: getattr(prisoner, field) for field in RECORD_FIELDS[:-1]}
+                record['prison_station__name'] = prisoner.prison_station.name
+                index.add(record)
+            index.version = current
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
@@ -5,6 +6,8 @@ urlpatterns = [
     path('', views.dashboard, name='dashboard'),
     path('prisoners/', views.prisoner_list, name='prisoner_list'),
     path('prisoners/add/', views.add_prisoner, name='add_prisoner'),
+    path('prisoners/admit/', views.admit_prisoner, name='admit_prisoner'),
+    path('prisoners/typeahead/', views.prisoner_typeahead, name='prisoner_typeahead'),
     path('prisoners/<int:prisoner_id>/', views.prisoner_detail, name='prisoner_detail'),
     path('prisoners/<int:prisoner_id>/edit/', views.edit_prisoner, name='edit_prisoner'),
     path('prisoners/<int:prisoner_id>/delete/', views.delete_prisoner, name='delete_prisoner'),
@@ -16,9 +19,17 @@ urlpatterns = [
     path('prisoners/<int:prisoner_id>/reduce-sentence/', views.apply_sentence_reduction, name='apply_sentence_reduction'),
     path('prisoners/<int:prisoner_id>/report/', views.generate_prisoner_report, name='generate_prisoner_report'),
     path('releases/', views.upcoming_releases_report, name='upcoming_releases_report'),
+    path('releases/calendar/', views.release_calendar_api, name='release_calendar_api'),
+    path('forecast/', views.occupancy_forecast, name='occupancy_forecast'),
+    path(f"{settings.MEDIA_URL.lstrip('/')}<path:name>", views.prisoner_media, name='prisoner_media'),
+    path('reports/lockup/', views.lockup_list_report, name='lockup_list_report'),
+    path('reports/transfers/', views.transfer_list_report, name='transfer_list_report'),
+    path('reports/jobs/<uuid:job_id>/', views.report_job_status, name='report_job_status'),
+    path('reports/jobs/<uuid:job_id>/download/', views.report_job_download, name='report_job_download'),
     path('stations/', views.manage_prison_stations, name='manage_prison_stations'),
     path('stations/<int:station_id>/edit/', views.edit_prison_station, name='edit_prison_station'),
     path('stations/<int:station_id>/delete/', views.delete_prison_station, name='delete_prison_station'),
+    path('stations/<int:station_id>/reports/', views.export_station_reports, name='export_station_reports'),
     path('statistics/api/', views.prison_statistics_api, name='prison_statistics_api'),
     path('releases/', views.upcoming_releases_report, name='upcoming_releases_report'),
     path('stations/create/', views.create_prison_station, name='create_prison_station'),
@@ -1,24 +1,56 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import HttpResponse, JsonResponse
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.db import IntegrityError, transaction
 from django.db.models import Count, Q, Sum
-from django.template.loader import get_template
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.views.decorators.http import condition
 from django.views.generic import ListView
-from xhtml2pdf import pisa
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from dateutil.relativedelta import relativedelta
 from .models import *
 from .forms import *
+from .admission import Admission, flatten_admission
+from .bulk_reports import station_reports_zip
+from .counters import station_counters, tracking_station_counters
+from .dossier import get_dossier_or_404, related_or_none
+from .forecast import occupancy_forecasts
+from .images import original_name
+from .jobs import enqueue_report, queue_position
+from .media import serve_stored_file
+from .pdf_cache import get_cached_pdf, report_fingerprint
+from .cache import cached_station_aggregate, station_versions, versioned_key
+from .pagination import PRISONER_LIST_ORDERING, keyset_page
+from .population import population_trend
+from .release_calendar import (
+    BUCKETS, CALENDAR_DAYS, CALENDAR_LAST_DAY, CALENDAR_MAX_DAYS, ROSTER_MAX_DAYS, release_calendar, release_roster,
+)
+from .reports import upcoming_releases
+from .search import SEARCH_ORDERING, search_prisoners
+from .sentences import shift
+from .typeahead import TYPEAHEAD_LIMIT, TYPEAHEAD_MAX_LIMIT, typeahead
+from .statistics import lockup_statistics, station_children_count
+from .storage import name_digest
 from accounts.models import CustomUser
 import io
 import csv
-from django.core.exceptions import ObjectDoesNotExist
+import json
+import hashlib
+from django.core.exceptions import ObjectDoesNotExist, PermissionDenied
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def user_station_ids(user):
+    """Ids of the prison stations whose prisoners `user` may see."""
+    if user.is_superuser:
+        return list(PrisonStation.objects.values_list('id', flat=True))
+    return [user.prison_station_id] if user.prison_station_id else []
+
+
 @login_required
 def dashboard(request):
     # Prisoner statistics
@@ -27,46 +59,27 @@ def dashboard(request):
     if not request.user.is_superuser:
         prisoners = prisoners.filter(prison_station__name=request.user.prison_station)
     
-    total_prisoners = prisoners.count()
-    convicted_count = prisoners.filter(prisoner_class='convicted').count()
-    remand_count = prisoners.filter(prisoner_class='remand').count()
+    station_ids = user_station_ids(request.user)
+    today = datetime.now().date()
+    stats = cached_station_aggregate(f'lockup:{today}', station_ids, lambda: lockup_statistics(prisoners, today))
     
     # Children count (from female prisoners)
-    female_prisoners = prisoners.filter(sex='female')
-    children_count = sum([p.physical.children_count for p in female_prisoners if hasattr(p, 'physical') and p.physical.children_count]) if female_prisoners.exists() else 0
-    
-    # Recidivism rate
-    risk_assessments = RiskAssessment.objects.filter(prisoner__in=prisoners)
-    recidivism_count = risk_assessments.filter(previous_conviction=True).count()
-    recidivism_rate = (recidivism_count / total_prisoners * 100) if total_prisoners > 0 else 0
+    children_count = station_children_count(station_ids)
     
-    # Prisoner population for current month and last 5 months
-    months = []
-    prisoner_counts = []
-    today = datetime.now().date()
-    
-    for i in range(5, -1, -1):  # From 5 months ago to current month
-        month_start = (today - relativedelta(months=i)).replace(day=1)
-        month_end = (month_start + relativedelta(months=1) - relativedelta(days=1))
-        month_name = month_start.strftime('%b %Y')
-        
-        count = prisoners.filter(
-            date_admitted__lte=month_end,
-            is_active=True
-        ).count()
-        
-        months.append(month_name)
-        prisoner_counts.append(count)
+    # Prisoner population for current month and last 5 months, from nightly snapshots
+    snapshots = StationPopulationSnapshot.objects.all()
+    if not request.user.is_superuser:
+        snapshots = snapshots.filter(station__name=request.user.prison_station)
+    prisoner_counts = population_trend(snapshots, stats['prisoner_counts'])
     
     # Debug: Log the population data
-    logger.debug(f"Months: {months}, Prisoner Counts: {prisoner_counts}")
+    logger.debug(f"Months: {stats['months']}, Prisoner Counts: {prisoner_counts}")
     
     # Upcoming releases (next 30 days)
-    today = datetime.now().date()
     next_month = today + timedelta(days=30)
     
     upcoming_releases = []
-    if request.user.is_superuser or prisoners.exists():
+    if request.user.is_superuser or stats['total_prisoners'] > 0:
         convicted_prisoners = ConvictedPrisoner.objects.filter(
             Q(date_of_release_on_remission__gte=today) & 
             Q(date_of_release_on_remission__lte=next_month)
@@ -81,56 +94,15 @@ def dashboard(request):
     recent_activities = ActivityLog.objects.all().order_by('-timestamp')[:10] if request.user.is_superuser else None
     
     # Lockup summary
-    lockup_summary = {
-        'male_convicted': prisoners.filter(sex='male', prisoner_class='convicted').count(),
-        'female_convicted': prisoners.filter(sex='female', prisoner_class='convicted').count(),
-        'male_remand': prisoners.filter(sex='male', prisoner_class='remand').count(),
-        'female_remand': prisoners.filter(sex='female', prisoner_class='remand').count(),
-        'male_murder_convicted': ConvictedPrisoner.objects.filter(
-            prisoner__sex='male', 
-            prisoner__prisoner_class='convicted',
-            offense__in=['Murder contrary to section 209 of the Penal Code']
-        ).count(),
-        'female_murder_convicted': ConvictedPrisoner.objects.filter(
-            prisoner__sex='female', 
-            prisoner__prisoner_class='convicted',
-            offense__in=['Murder contrary to section 209 of the Penal Code']
-        ).count(),
-        'male_foreigner_remand': prisoners.filter(sex='male', prisoner_class='remand', 
-            particulars__nationality__in=['mozambican', 'zimbabwean', 'congolese', 'zambian', 'tanzanian', 
-                                        'chinese', 'japanese', 'korean', 'indian', 'british', 'south_african', 
-                                        'burundi', 'rwandan', 'botswana']).count(),
-        'female_foreigner_remand': prisoners.filter(sex='female', prisoner_class='remand', 
-            particulars__nationality__in=['mozambican', 'zimbabwean', 'congolese', 'zambian', 'tanzanian', 
-                                        'chinese', 'japanese', 'korean', 'indian', 'british', 'south_african', 
-                                        'burundi', 'rwandan', 'botswana']).count(),
-        'male_foreigner_remand_murder': ConvictedPrisoner.objects.filter(
-            prisoner__sex='male', 
-            prisoner__prisoner_class='remand',
-            offense__in=['Murder contrary to section 209 of the Penal Code'],
-            prisoner__particulars__nationality__in=['mozambican', 'zimbabwean', 'congolese', 'zambian', 'tanzanian', 
-                                                  'chinese', 'japanese', 'korean', 'indian', 'british', 'south_african', 
-                                                  'burundi', 'rwandan', 'botswana']
-        ).count(),
-        'female_foreigner_remand_murder': ConvictedPrisoner.objects.filter(
-            prisoner__sex='female', 
-            prisoner__prisoner_class='remand',
-            offense__in=['Murder contrary to section 209 of the Penal Code'],
-            prisoner__particulars__nationality__in=['mozambican', 'zimbabwean', 'congolese', 'zambian', 'tanzanian', 
-                                                  'chinese', 'japanese', 'korean', 'indian', 'british', 'south_african', 
-                                                  'burundi', 'rwandan', 'botswana']
-        ).count(),
-        'children': children_count,
-        'grand_total': total_prisoners,
-    }
+    lockup_summary = dict(stats['lockup_summary'], children=children_count)
     
     context = {
-        'total_prisoners': total_prisoners,
-        'convicted_count': convicted_count,
-        'remand_count': remand_count,
+        'total_prisoners': stats['total_prisoners'],
+        'convicted_count': stats['convicted_count'],
+        'remand_count': stats['remand_count'],
         'children_count': children_count,
-        'recidivism_rate': round(recidivism_rate, 2),
-        'months': months,
+        'recidivism_rate': stats['recidivism_rate'],
+        'months': stats['months'],
         'prisoner_counts': prisoner_counts,
         'upcoming_releases': upcoming_releases,
         'recent_activities': recent_activities,
@@ -139,12 +111,17 @@ def dashboard(request):
     
     return render(request, 'prison/dashboard.html', context)
 
+PRISONER_LIST_COLUMNS = (
+    'id', 'prisoner_number', 'first_name', 'middle_name', 'surname',
+    'prisoner_class', 'date_admitted', 'prison_station__name', 'image',
+)
+
 @login_required
 def prisoner_list(request):
     form = SearchForm(request.GET or None, user=request.user)
     
-    # Base queryset
-    prisoners = Prisoner.objects.filter(is_active=True)
+    # Base queryset, narrowed to the columns the list renders
+    prisoners = Prisoner.objects.filter(is_active=True).select_related('prison_station').only(*PRISONER_LIST_COLUMNS)
     
     # Filter by station for non-superusers
     if not request.user.is_superuser:
@@ -154,6 +131,8 @@ def prisoner_list(request):
             prisoners = Prisoner.objects.none()
             messages.warning(request, "You haven't been assigned to a prison station.")
     
+    ordering = PRISONER_LIST_ORDERING
+    
     # Apply search filters if form is valid
     if form.is_valid():
         search_query = form.cleaned_data.get('search_query')
@@ -161,24 +140,21 @@ def prisoner_list(request):
         risk_level = form.cleaned_data.get('risk_level')
         
         if search_query:
-            prisoners = prisoners.filter(
-                Q(prisoner_number__icontains=search_query) |
-                Q(first_name__icontains=search_query) |
-                Q(middle_name__icontains=search_query) |
-                Q(surname__icontains=search_query)
-            )
+            prisoners = search_prisoners(prisoners, search_query)
+            ordering = SEARCH_ORDERING
         
         if prisoner_class:
             prisoners = prisoners.filter(prisoner_class=prisoner_class)
         
         if risk_level:
-            prisoner_ids = RiskAssessment.objects.filter(
-                risk_level=risk_level
-            ).values_list('prisoner_id', flat=True)
-            prisoners = prisoners.filter(id__in=prisoner_ids)
+            prisoners = prisoners.filter(risk_assessment__risk_level=risk_level)
+    
+    page = keyset_page(prisoners, after=request.GET.get('after'), before=request.GET.get('before'), ordering=ordering)
     
     context = {
-        'prisoners': prisoners,
+        'prisoners': page.object_list,
+        'page_obj': page,
+        'is_paginated': page.has_other_pages,
         'form': form,
     }
     return render(request, 'prison/prisoner_list.html', context)
@@ -191,7 +167,8 @@ def add_prisoner(request):
         if prisoner_form.is_valid():
             prisoner = prisoner_form.save(commit=False)
             prisoner.created_by = request.user
-            prisoner.save()
+            with tracking_station_counters(prisoner):
+                prisoner.save()
             
             # Create related records based on prisoner class
             if prisoner.prisoner_class == 'convicted':
@@ -206,6 +183,66 @@ def add_prisoner(request):
     }
     return render(request, 'prison/add_prisoner.html', context)
 
+@login_required
+def admit_prisoner(request):
+    """
+    Admit a prisoner with all their detail records in one request.
+
+    Browsers post the sectioned form; API clients post JSON, either one
+    admission ({"prisoner": {...}, "particulars": {...}, ...}) or a list of
+    them. A list is all-or-nothing: every admission is validated first and
+    then all are saved in one transaction.
+    """
+    if request.method == 'POST' and request.content_type == 'application/json':
+        return admit_prisoners_json(request)
+    
+    if request.method == 'POST':
+        admission = Admission(request.POST, request.FILES, user=request.user)
+        if admission.is_valid():
+            prisoner = admission.save()
+            messages.success(request, f'Prisoner {prisoner.prisoner_number} admitted successfully.')
+            return redirect('prisoner_detail', prisoner_id=prisoner.id)
+        messages.error(request, 'Please correct the errors in the form.')
+    else:
+        admission = Admission(user=request.user)
+    
+    return render(request, 'prison/admit_prisoner.html', {'admission': admission})
+
+
+def admit_prisoners_json(request):
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'error': 'Request body must be JSON'}, status=400)
+    
+    batch = isinstance(payload, list)
+    payloads = payload if batch else [payload]
+    if not all(isinstance(item, dict) for item in payloads):
+        return JsonResponse({'error': 'Each admission must be a JSON object'}, status=400)
+    
+    admissions = [Admission(flatten_admission(item), user=request.user) for item in payloads]
+    invalid = [index for index, admission in enumerate(admissions) if not admission.is_valid()]
+    if invalid:
+        errors = [{'index': index, 'errors': admissions[index].errors} for index in invalid]
+        return JsonResponse({'errors': errors} if batch else errors[0], status=400)
+    
+    try:
+        with transaction.atomic():
+            prisoners = [admission.save() for admission in admissions]
+    except IntegrityError as error:
+        # e.g. the same prisoner number twice in one batch
+        return JsonResponse({'error': f'Admission conflicts with an existing record: {error}'}, status=409)
+    
+    results = [
+        {
+            'id': prisoner.id,
+            'prisoner_number': prisoner.prisoner_number,
+            'url': reverse('prisoner_detail', args=[prisoner.id]),
+        }
+        for prisoner in prisoners
+    ]
+    return JsonResponse({'results': results} if batch else results[0], status=201)
+
 @login_required
 def add_convicted_details(request, prisoner_id):
     prisoner = get_object_or_404(Prisoner, id=prisoner_id)
@@ -224,39 +261,40 @@ def add_convicted_details(request, prisoner_id):
             risk_form.is_valid(),
             rehab_form.is_valid()
         ]):
-            # Save convicted details
-            convicted = form.save(commit=False)
-            convicted.prisoner = prisoner
-            convicted.save()
+            with tracking_station_counters(prisoner):
+                # Save convicted details
+                convicted = form.save(commit=False)
+                convicted.prisoner = prisoner
+                convicted.save()
             
-            # Save particulars
-            particulars = particulars_form.save(commit=False)
-            particulars.prisoner = prisoner
-            particulars.save()
+                # Save particulars
+                particulars = particulars_form.save(commit=False)
+                particulars.prisoner = prisoner
+                particulars.save()
             
-            # Save physical characteristics
-            physical = physical_form.save(commit=False)
-            physical.prisoner = prisoner
-            physical.save()
+                # Save physical characteristics
+                physical = physical_form.save(commit=False)
+                physical.prisoner = prisoner
+                physical.save()
             
-            # Save risk assessment
-            risk = risk_form.save(commit=False)
-            risk.prisoner = prisoner
-            risk.save()
+                # Save risk assessment
+                risk = risk_form.save(commit=False)
+                risk.prisoner = prisoner
+                risk.save()
             
-            # Save rehabilitation program
-            rehab = rehab_form.save(commit=False)
-            rehab.prisoner = prisoner
-            rehab.save()
+                # Save rehabilitation program
+                rehab = rehab_form.save(commit=False)
+                rehab.prisoner = prisoner
+                rehab.save()
             
-            # Log activity
-            ActivityLog.objects.create(
-                user=request.user,
-                action='create',
-                model='ConvictedPrisoner',
-                object_id=prisoner.id,
-                details=f'Added convicted prisoner {prisoner.prisoner_number}'
-            )
+                # Log activity
+                ActivityLog.objects.create(
+                    user=request.user,
+                    action='create',
+                    model='ConvictedPrisoner',
+                    object_id=prisoner.id,
+                    details=f'Added convicted prisoner {prisoner.prisoner_number}'
+                )
             
             messages.success(request, 'Convicted prisoner details added successfully.')
             return redirect('prisoner_detail', prisoner_id=prisoner.id)
@@ -299,29 +337,30 @@ def add_remand_details(request, prisoner_id):
             particulars_form.is_valid(),
             physical_form.is_valid(),
         ]):
-            # Save remand details
-            remand = form.save(commit=False)
-            remand.prisoner = prisoner
-            remand.save()
+            with tracking_station_counters(prisoner):
+                # Save remand details
+                remand = form.save(commit=False)
+                remand.prisoner = prisoner
+                remand.save()
             
-            # Save particulars
-            particulars = particulars_form.save(commit=False)
-            particulars.prisoner = prisoner
-            particulars.save()
+                # Save particulars
+                particulars = particulars_form.save(commit=False)
+                particulars.prisoner = prisoner
+                particulars.save()
             
-            # Save physical characteristics
-            physical = physical_form.save(commit=False)
-            physical.prisoner = prisoner
-            physical.save()
+                # Save physical characteristics
+                physical = physical_form.save(commit=False)
+                physical.prisoner = prisoner
+                physical.save()
             
-            # Log activity
-            ActivityLog.objects.create(
-                user=request.user,
-                action='create',
-                model='RemandPrisoner',
-                object_id=prisoner.id,
-                details=f'Added remand prisoner {prisoner.prisoner_number}'
-            )
+                # Log activity
+                ActivityLog.objects.create(
+                    user=request.user,
+                    action='create',
+                    model='RemandPrisoner',
+                    object_id=prisoner.id,
+                    details=f'Added remand prisoner {prisoner.prisoner_number}'
+                )
             
             messages.success(request, 'Remand prisoner details added successfully.')
             return redirect('prisoner_detail', prisoner_id=prisoner.id)
@@ -346,7 +385,7 @@ def add_remand_details(request, prisoner_id):
 
 @login_required
 def prisoner_detail(request, prisoner_id):
-    prisoner = get_object_or_404(Prisoner, id=prisoner_id)
+    prisoner = get_dossier_or_404(prisoner_id)
     transfers = prisoner.transfers.all()
 
     context = {
@@ -386,7 +425,7 @@ def prisoner_detail(request, prisoner_id):
 
 @login_required
 def edit_prisoner(request, prisoner_id):
-    prisoner = get_object_or_404(Prisoner, id=prisoner_id)
+    prisoner = get_dossier_or_404(prisoner_id, cached=False, transfers=False)
     
     # Check if user has permission to edit this prisoner
     if not request.user.is_superuser and prisoner.prison_station.name != request.user.prison_station:
@@ -397,16 +436,17 @@ def edit_prisoner(request, prisoner_id):
         form = PrisonerForm(request.POST, request.FILES, instance=prisoner, user=request.user)
         
         if form.is_valid():
-            form.save()
+            with tracking_station_counters(prisoner):
+                form.save()
             
-            # Log activity
-            ActivityLog.objects.create(
-                user=request.user,
-                action='update',
-                model='Prisoner',
-                object_id=prisoner.id,
-                details=f'Updated prisoner {prisoner.prisoner_number}'
-            )
+                # Log activity
+                ActivityLog.objects.create(
+                    user=request.user,
+                    action='update',
+                    model='Prisoner',
+                    object_id=prisoner.id,
+                    details=f'Updated prisoner {prisoner.prisoner_number}'
+                )
             
             messages.success(request, 'Prisoner updated successfully.')
             return redirect('prisoner_detail', prisoner_id=prisoner.id)
@@ -421,18 +461,19 @@ def edit_prisoner(request, prisoner_id):
 
 @login_required
 def edit_convicted_details(request, prisoner_id):
-    prisoner = get_object_or_404(Prisoner, id=prisoner_id)
+    prisoner = get_dossier_or_404(prisoner_id, cached=False, transfers=False)
 
     if prisoner.prisoner_class != 'convicted':
         messages.error(request, 'This prisoner is not a convicted prisoner.')
         return redirect('prisoner_detail', prisoner_id=prisoner.id)
 
-    # Use get_or_create to handle cases where related objects might not exist yet
-    convicted, _ = ConvictedPrisoner.objects.get_or_create(prisoner=prisoner)
-    particulars, _ = PrisonerParticulars.objects.get_or_create(prisoner=prisoner)
-    physical, _ = PhysicalCharacteristics.objects.get_or_create(prisoner=prisoner)
-    risk, _ = RiskAssessment.objects.get_or_create(prisoner=prisoner)
-    rehab, _ = RehabilitationProgram.objects.get_or_create(prisoner=prisoner)
+    # Records that don't exist yet are edited as unsaved instances and only
+    # inserted when a valid form is saved
+    convicted = related_or_none(prisoner, 'convicted_details') or ConvictedPrisoner(prisoner=prisoner)
+    particulars = related_or_none(prisoner, 'particulars') or PrisonerParticulars(prisoner=prisoner)
+    physical = related_or_none(prisoner, 'physical') or PhysicalCharacteristics(prisoner=prisoner)
+    risk = related_or_none(prisoner, 'risk_assessment') or RiskAssessment(prisoner=prisoner)
+    rehab = related_or_none(prisoner, 'rehabilitation') or RehabilitationProgram(prisoner=prisoner)
 
     if request.method == 'POST':
         prisoner_form = PrisonerForm(request.POST, request.FILES, instance=prisoner, user=request.user)
@@ -450,20 +491,21 @@ def edit_convicted_details(request, prisoner_id):
             risk_form.is_valid(),
             rehab_form.is_valid()
         ]):
-            prisoner_form.save()
-            convicted_form.save()
-            particulars_form.save()
-            physical_form.save()
-            risk_form.save()
-            rehab_form.save()
+            with tracking_station_counters(prisoner):
+                prisoner_form.save()
+                convicted_form.save()
+                particulars_form.save()
+                physical_form.save()
+                risk_form.save()
+                rehab_form.save()
 
-            ActivityLog.objects.create(
-                user=request.user,
-                action='update',
-                model='ConvictedPrisoner',
-                object_id=prisoner.id,
-                details=f'Updated all details for convicted prisoner {prisoner.prisoner_number}'
-            )
+                ActivityLog.objects.create(
+                    user=request.user,
+                    action='update',
+                    model='ConvictedPrisoner',
+                    object_id=prisoner.id,
+                    details=f'Updated all details for convicted prisoner {prisoner.prisoner_number}'
+                )
 
             messages.success(request, 'Convicted prisoner details updated successfully.')
             return redirect('prisoner_detail', prisoner_id=prisoner.id)
@@ -491,16 +533,17 @@ def edit_convicted_details(request, prisoner_id):
 
 @login_required
 def edit_remand_details(request, prisoner_id):
-    prisoner = get_object_or_404(Prisoner, id=prisoner_id)
+    prisoner = get_dossier_or_404(prisoner_id, cached=False, transfers=False)
 
     if prisoner.prisoner_class != 'remand':
         messages.error(request, 'This prisoner is not a remand prisoner.')
         return redirect('prisoner_detail', prisoner_id=prisoner.id)
     
-    # Use get_or_create to handle cases where related objects might not exist yet
-    remand, _ = RemandPrisoner.objects.get_or_create(prisoner=prisoner)
-    particulars, _ = PrisonerParticulars.objects.get_or_create(prisoner=prisoner)
-    physical, _ = PhysicalCharacteristics.objects.get_or_create(prisoner=prisoner)
+    # Records that don't exist yet are edited as unsaved instances and only
+    # inserted when a valid form is saved
+    remand = related_or_none(prisoner, 'remand_details') or RemandPrisoner(prisoner=prisoner)
+    particulars = related_or_none(prisoner, 'particulars') or PrisonerParticulars(prisoner=prisoner)
+    physical = related_or_none(prisoner, 'physical') or PhysicalCharacteristics(prisoner=prisoner)
 
     if request.method == 'POST':
         prisoner_form = PrisonerForm(request.POST, request.FILES, instance=prisoner, user=request.user)
@@ -514,18 +557,19 @@ def edit_remand_details(request, prisoner_id):
             particulars_form.is_valid(),
             physical_form.is_valid(),
         ]):
-            prisoner_form.save()
-            remand_form.save()
-            particulars_form.save()
-            physical_form.save()
+            with tracking_station_counters(prisoner):
+                prisoner_form.save()
+                remand_form.save()
+                particulars_form.save()
+                physical_form.save()
 
-            ActivityLog.objects.create(
-                user=request.user,
-                action='update',
-                model='RemandPrisoner',
-                object_id=prisoner.id,
-                details=f'Updated all details for remand prisoner {prisoner.prisoner_number}'
-            )
+                ActivityLog.objects.create(
+                    user=request.user,
+                    action='update',
+                    model='RemandPrisoner',
+                    object_id=prisoner.id,
+                    details=f'Updated all details for remand prisoner {prisoner.prisoner_number}'
+                )
 
             messages.success(request, 'Remand prisoner details updated successfully.')
             return redirect('prisoner_detail', prisoner_id=prisoner.id)
@@ -556,17 +600,18 @@ def delete_prisoner(request, prisoner_id):
         return redirect('prisoner_list')
     
     if request.method == 'POST':
-        prisoner.is_active = False
-        prisoner.save()
+        with tracking_station_counters(prisoner):
+            prisoner.is_active = False
+            prisoner.save()
         
-        # Log activity
-        ActivityLog.objects.create(
-            user=request.user,
-            action='delete',
-            model='Prisoner',
-            object_id=prisoner.id,
-            details=f'Deleted prisoner {prisoner.prisoner_number}'
-        )
+            # Log activity
+            ActivityLog.objects.create(
+                user=request.user,
+                action='delete',
+                model='Prisoner',
+                object_id=prisoner.id,
+                details=f'Deleted prisoner {prisoner.prisoner_number}'
+            )
         
         messages.success(request, 'Prisoner deleted successfully.')
         return redirect('prisoner_list')
@@ -586,24 +631,25 @@ def transfer_prisoner(request, prisoner_id):
         form = PrisonerTransferForm(request.POST, prisoner=prisoner, user=request.user)
         
         if form.is_valid():
-            transfer = form.save(commit=False)
-            transfer.prisoner = prisoner
-            transfer.from_prison = prisoner.prison_station
-            transfer.transferred_by = request.user
-            transfer.save()
+            with tracking_station_counters(prisoner):
+                transfer = form.save(commit=False)
+                transfer.prisoner = prisoner
+                transfer.from_prison = prisoner.prison_station
+                transfer.transferred_by = request.user
+                transfer.save()
             
-            # Update prisoner's prison station
-            prisoner.prison_station = transfer.to_prison
-            prisoner.save()
+                # Update prisoner's prison station
+                prisoner.prison_station = transfer.to_prison
+                prisoner.save()
             
-            # Log activity
-            ActivityLog.objects.create(
-                user=request.user,
-                action='transfer',
-                model='Prisoner',
-                object_id=prisoner.id,
-                details=f'Transferred prisoner {prisoner.prisoner_number} from {transfer.from_prison} to {transfer.to_prison}'
-            )
+                # Log activity
+                ActivityLog.objects.create(
+                    user=request.user,
+                    action='transfer',
+                    model='Prisoner',
+                    object_id=prisoner.id,
+                    details=f'Transferred prisoner {prisoner.prisoner_number} from {transfer.from_prison} to {transfer.to_prison}'
+                )
             
             messages.success(request, 'Prisoner transferred successfully.')
             return redirect('prisoner_detail', prisoner_id=prisoner.id)
@@ -670,82 +716,99 @@ def apply_sentence_reduction(request, prisoner_id):
 
 @login_required
 def generate_prisoner_report(request, prisoner_id):
-    prisoner = get_object_or_404(Prisoner, id=prisoner_id)
+    prisoner = get_dossier_or_404(prisoner_id)
     
     # Check if user has permission to view this prisoner
     if not request.user.is_superuser and prisoner.prison_station.name != request.user.prison_station:
         messages.error(request, 'You do not have permission to view this prisoner.')
         return redirect('prisoner_list')
     
-    template = get_template('prison/prisoner_report.html')
-    
-    context = {
-        'prisoner': prisoner,
-        'today': datetime.now().date(),
-    }
-    
-    if prisoner.prisoner_class == 'convicted':
-        context.update({
-            'convicted_details': prisoner.convicted_details,
-            'particulars': prisoner.particulars,
-            'risk_assessment': prisoner.risk_assessment,
-            'rehabilitation': prisoner.rehabilitation,
-        })
-    else:
-        context['remand_details'] = prisoner.remand_details
-    
-    context.update({
-        'particulars': prisoner.particulars,
-        'physical': prisoner.physical,
-    })
-    
-    html = template.render(context)
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="prisoner_{prisoner.prisoner_number}_report.pdf"'
-    
-    pisa_status = pisa.CreatePDF(html, dest=response)
+    # Serve an unchanged report straight from the PDF cache
+    fingerprint = report_fingerprint(prisoner)
+    etag = f'"{fingerprint}"'
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+    
+    path = get_cached_pdf(fingerprint)
+    if path is not None:
+        response = FileResponse(
+            path.open('rb'), as_attachment=True, content_type='application/pdf',
+            filename=f'prisoner_{prisoner.prisoner_number}_report.pdf',
+        )
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
     
-    if pisa_status.err:
-        return HttpResponse('We had some errors generating the PDF')
+    # Otherwise rendering runs in a report worker; hand back the job to poll
+    job = enqueue_report(
+        'prisoner_report', {'prisoner_id': prisoner.id, 'prisoner_number': prisoner.prisoner_number}, request.user,
+    )
+    return report_job_response(request, job)
+
+@login_required
+def export_station_reports(request, station_id):
+    """Stream a ZIP of every active prisoner's report at a station, rendered in parallel."""
+    if not request.user.is_superuser:
+        messages.error(request, 'Only administrators can export station reports.')
+        return redirect('manage_prison_stations')
     
+    station = get_object_or_404(PrisonStation, id=station_id)
+    response = StreamingHttpResponse(station_reports_zip(station), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="{station.code}_reports.zip"'
     return response
 
+UPCOMING_RELEASES_DAYS = 30
+TRANSFER_LIST_DAYS = 30
+
+
+def report_station_id(user):
+    """
+    The station a listing report for `user` covers, or None for every
+    station. Report renderers read None as every station, which only
+    superusers may see.
+    """
+    if user.is_superuser:
+        return None
+    if user.prison_station_id is None:
+        raise PermissionDenied('You are not assigned to a prison station.')
+    return user.prison_station_id
+
+
+@login_required
+def lockup_list_report(request):
+    job = enqueue_report('lockup_list', {'station_id': report_station_id(request.user)}, request.user)
+    return report_job_response(request, job)
+
+
+@login_required
+def transfer_list_report(request):
+    try:
+        days = min(max(int(request.GET.get('days', TRANSFER_LIST_DAYS)), 1), CALENDAR_MAX_DAYS)
+    except ValueError:
+        days = TRANSFER_LIST_DAYS
+    job = enqueue_report('transfer_list', {'station_id': report_station_id(request.user), 'days': days}, request.user)
+    return report_job_response(request, job)
+
+
+
 @login_required
 def upcoming_releases_report(request):
     today = datetime.now().date()
-    next_month = today + timedelta(days=30)
+    try:
+        days = min(max(int(request.GET.get('days', UPCOMING_RELEASES_DAYS)), 1), CALENDAR_MAX_DAYS)
+    except ValueError:
+        days = UPCOMING_RELEASES_DAYS
+    next_month = today + timedelta(days=days)
     
-    prisoners = Prisoner.objects.filter(is_active=True)
+    convicted_prisoners = upcoming_releases(None, today, days)
     
     if not request.user.is_superuser:
-        prisoners = prisoners.filter(prison_station__name=request.user.prison_station)
-    
-    convicted_prisoners = ConvictedPrisoner.objects.filter(
-        prisoner__in=prisoners,
-        date_of_release_on_remission__gte=today,
-        date_of_release_on_remission__lte=next_month
-    ).order_by('date_of_release_on_remission')
+        convicted_prisoners = convicted_prisoners.filter(prisoner__prison_station_id__in=user_station_ids(request.user))
     
     if request.GET.get('format') == 'pdf':
-        template = get_template('prison/upcoming_releases_pdf.html')
-        
-        context = {
-            'releases': convicted_prisoners,
-            'today': today,
-            'next_month': next_month,
-            'user': request.user,
-        }
-        
-        html = template.render(context)
-        response = HttpResponse(content_type='application/pdf')
-        response['Content-Disposition'] = 'attachment; filename="upcoming_releases_report.pdf"'
-        
-        pisa_status = pisa.CreatePDF(html, dest=response)
-        
-        if pisa_status.err:
-            return HttpResponse('We had some errors generating the PDF')
-        
-        return response
+        job = enqueue_report('upcoming_releases', {'station_id': report_station_id(request.user), 'days': days}, request.user)
+        return report_job_response(request, job)
     elif request.GET.get('format') == 'csv':
         response = HttpResponse(content_type='text/csv')
         response['Content-Disposition'] = 'attachment; filename="upcoming_releases_report.csv"'
@@ -757,7 +820,7 @@ def upcoming_releases_report(request):
             'Remission Months', 'Reduction Months', 'Offense'
         ])
         
-        for cp in convicted_prisoners:
+        for cp in convicted_prisoners.iterator():
             writer.writerow([
                 cp.prisoner.prisoner_number,
                 cp.prisoner.full_name,
@@ -775,9 +838,45 @@ def upcoming_releases_report(request):
         'releases': convicted_prisoners,
         'today': today,
         'next_month': next_month,
+        'days': days,
     }
     return render(request, 'prison/upcoming_releases.html', context)
 
+FORECAST_MONTHS = 6
+FORECAST_MAX_MONTHS = 24
+
+
+@login_required
+def occupancy_forecast(request):
+    """Projected occupancy of the user's station(s) against capacity, stations forecast to overflow first."""
+    today = datetime.now().date()
+    try:
+        months = min(max(int(request.GET.get('months', FORECAST_MONTHS)), 1), FORECAST_MAX_MONTHS)
+    except ValueError:
+        months = FORECAST_MONTHS
+    
+    checkpoints = [shift(today, month, 0) for month in range(1, months + 1)]
+    forecasts = []
+    for forecast in occupancy_forecasts(user_station_ids(request.user), months, today):
+        capacity = forecast['capacity']
+        forecasts.append(dict(
+            forecast,
+            checkpoints=[forecast['series'][(day - today).days - 1] for day in checkpoints],
+            peak_percent=round(100 * forecast['peak'] / capacity) if capacity else None,
+        ))
+    forecasts.sort(key=lambda forecast: (
+        forecast['over_capacity_from'] is None, forecast['over_capacity_from'] or today, forecast['name'],
+    ))
+    
+    context = {
+        'forecasts': forecasts,
+        'checkpoints': checkpoints,
+        'months': months,
+        'over_capacity': sum(forecast['over_capacity_from'] is not None for forecast in forecasts),
+        'today': today,
+    }
+    return render(request, 'prison/occupancy_forecast.html', context)
+
 @login_required
 def create_prison_station(request):
     if request.method == 'POST':
@@ -799,7 +898,7 @@ def manage_prison_stations(request):
         messages.error(request, 'You do not have permission to access this page.')
         return redirect('dashboard')
     
-    stations = PrisonStation.objects.all()
+    stations = PrisonStation.objects.select_related('created_by', 'counters')
     
     if request.method == 'POST':
         form = PrisonStationForm(request.POST)
@@ -861,48 +960,275 @@ def delete_prison_station(request, station_id):
     
     return render(request, 'prison/delete_prison_station.html', {'station': station})
 
+STATISTICS_API_FIELDS = (
+    'counts_by_class', 'counts_by_station', 'risk_distribution',
+    'recidivism_rate', 'total_prisoners', 'children_count',
+)
+
+
+def requested_statistics_fields(request):
+    fields = request.GET.get('fields')
+    if not fields:
+        return list(STATISTICS_API_FIELDS)
+    return [field.strip() for field in fields.split(',') if field.strip()]
+
+
+def statistics_versions(request):
+    # Shared by the ETag and view bodies of a single request
+    if not hasattr(request, '_statistics_versions'):
+        request._statistics_versions = station_versions(user_station_ids(request.user))
+    return request._statistics_versions
+
+
+def statistics_etag(request):
+    if not request.user.is_authenticated:
+        return None
+    scope = 'all' if request.user.is_superuser else 'station'
+    fields = ','.join(sorted(requested_statistics_fields(request)))
+    key = versioned_key(f'api:{scope}:{fields}', statistics_versions(request))
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+# No Last-Modified: it has one-second resolution, so a client sending only
+# If-Modified-Since would get a 304 after a second change in the same second
+@condition(etag_func=statistics_etag)
 def prison_statistics_api(request):
     if not request.user.is_authenticated:
         return JsonResponse({'error': 'Authentication required'}, status=401)
     
+    fields = requested_statistics_fields(request)
+    unknown = [field for field in fields if field not in STATISTICS_API_FIELDS]
+    if unknown:
+        return JsonResponse({'error': f"Unknown fields: {', '.join(unknown)}"}, status=400)
+    
     prisoners = Prisoner.objects.filter(is_active=True)
     
     if not request.user.is_superuser:
         prisoners = prisoners.filter(prison_station__name=request.user.prison_station)
     
-    # Prisoner counts by class
-    counts_by_class = prisoners.values('prisoner_class').annotate(count=Count('id'))
+    station_ids = list(statistics_versions(request))
+    today = datetime.now().date()
+    data = {}
+    
+    if {'counts_by_class', 'recidivism_rate', 'total_prisoners'} & set(fields):
+        stats = cached_station_aggregate(f'lockup:{today}', station_ids, lambda: lockup_statistics(prisoners, today))
+        
+        # Prisoner counts by class
+        data['counts_by_class'] = [
+            {'prisoner_class': prisoner_class, 'count': stats[f'{prisoner_class}_count']}
+            for prisoner_class, _ in Prisoner.PRISONER_CLASS_CHOICES
+            if stats[f'{prisoner_class}_count']
+        ]
+        data['recidivism_rate'] = stats['recidivism_rate']
+        data['total_prisoners'] = stats['total_prisoners']
     
     # Prisoner counts by station (for admin)
-    counts_by_station = []
-    if request.user.is_superuser:
-        counts_by_station = PrisonStation.objects.annotate(
-            prisoner_count=Count('prisoner', filter=Q(prisoner__is_active=True))
-        ).values('name', 'prisoner_count')
+    if 'counts_by_station' in fields:
+        data['counts_by_station'] = []
+        if request.user.is_superuser:
+            counters = station_counters(station_ids)
+            data['counts_by_station'] = [
+                {'name': counters[station_id].station.name, 'prisoner_count': counters[station_id].total}
+                for station_id in station_ids
+            ]
     
     # Risk level distribution
-    risk_distribution = RiskAssessment.objects.filter(
-        prisoner__in=prisoners
-    ).values('risk_level').annotate(count=Count('id'))
-    
-    # Recidivism rate
-    recidivism_count = RiskAssessment.objects.filter(
-        prisoner__in=prisoners,
-        previous_conviction=True
-    ).count()
-    recidivism_rate = (recidivism_count / prisoners.count() * 100) if prisoners.count() > 0 else 0
+    if 'risk_distribution' in fields:
+        data['risk_distribution'] = cached_station_aggregate('risk', station_ids, lambda: list(
+            RiskAssessment.objects.filter(
+                prisoner__in=prisoners
+            ).values('risk_level').annotate(count=Count('pk'))
+        ))
     
     # Children count (from female prisoners)
-    female_prisoners = prisoners.filter(sex='female')
-    children_count = sum([p.physical.children_count for p in female_prisoners if hasattr(p, 'physical') and p.physical.children_count])
-    
-    data = {
-        'counts_by_class': list(counts_by_class),
-        'counts_by_station': list(counts_by_station),
-        'risk_distribution': list(risk_distribution),
-        'recidivism_rate': round(recidivism_rate, 2),
-        'total_prisoners': prisoners.count(),
-        'children_count': children_count,
-    }
+    if 'children_count' in fields:
+        data['children_count'] = station_children_count(station_ids)
     
-    return JsonResponse(data)
\ No newline at end of file
+    response = JsonResponse({field: data[field] for field in STATISTICS_API_FIELDS if field in fields})
+    # Clients may reuse their copy but must revalidate it with the ETag first
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def release_calendar_query(request):
+    """
+    The validated (station ids, start, end, bucket, roster) a calendar request
+    asks for, shared by the ETag and the view body. Raises ValueError with a
+    message for the client on bad input.
+    """
+    if hasattr(request, '_release_calendar_query'):
+        return request._release_calendar_query
+    
+    station_ids = user_station_ids(request.user)
+    if request.GET.get('station'):
+        station_ids = [station_id for station_id in station_ids if str(station_id) == request.GET['station']]
+        if not station_ids:
+            raise ValueError('Unknown station')
+    
+    try:
+        start = date.fromisoformat(request.GET['start']) if request.GET.get('start') else datetime.now().date()
+        if request.GET.get('end'):
+            end = date.fromisoformat(request.GET['end'])
+        else:
+            days = min(max(int(request.GET.get('days', CALENDAR_DAYS)), 1), CALENDAR_MAX_DAYS)
+            end = start + timedelta(days=days - 1)
+    except ValueError:
+        raise ValueError('start and end must be YYYY-MM-DD dates and days a number') from None
+    except OverflowError:
+        raise ValueError(f'The range must end by {CALENDAR_LAST_DAY}') from None
+    if end > CALENDAR_LAST_DAY:
+        raise ValueError(f'The range must end by {CALENDAR_LAST_DAY}')
+    if end < start or (end - start).days >= CALENDAR_MAX_DAYS:
+        raise ValueError(f'The range must run forwards and span at most {CALENDAR_MAX_DAYS} days')
+    
+    bucket = request.GET.get('bucket', 'day')
+    if bucket not in BUCKETS:
+        raise ValueError(f"bucket must be one of {', '.join(BUCKETS)}")
+    
+    roster = request.GET.get('roster') in ('1', 'true')
+    if roster and (end - start).days >= ROSTER_MAX_DAYS:
+        raise ValueError(f'Rosters are limited to ranges of {ROSTER_MAX_DAYS} days')
+    
+    request._release_calendar_query = (station_ids, start, end, bucket, roster)
+    return request._release_calendar_query
+
+
+def release_calendar_etag(request):
+    if not request.user.is_authenticated:
+        return None
+    try:
+        station_ids, start, end, bucket, roster = release_calendar_query(request)
+    except ValueError:
+        return None
+    # Releases already past drop out of rosters as the day changes
+    name = f'releases:{start}:{end}:{bucket}:{roster}:{datetime.now().date()}'
+    return hashlib.md5(versioned_key(name, station_versions(station_ids)).encode()).hexdigest()
+
+
+@condition(etag_func=release_calendar_etag)
+def release_calendar_api(request):
+    """
+    Release counts per day, week or month over any range of up to
+    CALENDAR_MAX_DAYS at the user's station(s), read from the
+    StationReleaseDay calendar; `roster=1` lists the prisoners in each bucket.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+    
+    try:
+        station_ids, start, end, bucket, roster = release_calendar_query(request)
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+    
+    buckets = release_calendar(station_ids, start, end, bucket)
+    if roster:
+        releases = iter(release_roster(station_ids, start, end))
+        release = next(releases, None)
+        for entry in buckets:
+            entry['roster'] = []
+            while release is not None and release.date_of_release_on_remission <= entry['end']:
+                entry['roster'].append({
+                    'id': release.prisoner_id,
+                    'prisoner_number': release.prisoner.prisoner_number,
+                    'name': release.prisoner.full_name,
+                    'station': release.prisoner.prison_station.name,
+                    'release_date': release.date_of_release_on_remission,
+                    'url': reverse('prisoner_detail', args=[release.prisoner_id]),
+                })
+                release = next(releases, None)
+    
+    response = JsonResponse({
+        'start': start,
+        'end': end,
+        'bucket': bucket,
+        'total': sum(entry['releases'] for entry in buckets),
+        'buckets': buckets,
+    })
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+@login_required
+def prisoner_typeahead(request):
+    """Top matches by prisoner number or name prefix at the user's station(s), as JSON."""
+    try:
+        limit = min(max(int(request.GET.get('limit', TYPEAHEAD_LIMIT)), 1), TYPEAHEAD_MAX_LIMIT)
+    except ValueError:
+        return JsonResponse({'error': 'limit must be a number'}, status=400)
+    
+    records = typeahead(user_station_ids(request.user), request.GET.get('q', ''), limit)
+    response = JsonResponse({'results': [
+        {
+            'id': record['id'],
+            'prisoner_number': record['prisoner_number'],
+            'name': ' '.join(filter(None, [record['first_name'], record['middle_name'], record['surname']])),
+            'station': record['prison_station__name'],
+            'url': reverse('prisoner_detail', args=[record['id']]),
+        }
+        for record in records
+    ]})
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def wants_json(request):
+    return request.GET.get('format') == 'json' or request.headers.get('Accept', '').startswith('application/json')
+
+
+def report_job_data(job):
+    return {
+        'id': str(job.id),
+        'kind': job.kind,
+        'status': job.status,
+        'progress': job.progress,
+        'queue_position': queue_position(job),
+        'error': job.error or None,
+        'status_url': reverse('report_job_status', args=[job.id]),
+        'download_url': reverse('report_job_download', args=[job.id]) if job.status == 'done' else None,
+    }
+
+
+def report_job_response(request, job):
+    if wants_json(request):
+        return JsonResponse(report_job_data(job), status=202)
+    return redirect('report_job_status', job_id=job.id)
+
+
+def get_report_job_or_404(request, job_id):
+    job = get_object_or_404(ReportJob, id=job_id)
+    if not request.user.is_superuser and job.requested_by_id != request.user.id:
+        raise Http404('No ReportJob matches the given query.')
+    return job
+
+
+@login_required
+def report_job_status(request, job_id):
+    job = get_report_job_or_404(request, job_id)
+    if wants_json(request):
+        return JsonResponse(report_job_data(job))
+    return render(request, 'prison/report_job.html', {'job': job, 'data': report_job_data(job)})
+
+
+@login_required
+def report_job_download(request, job_id):
+    job = get_report_job_or_404(request, job_id)
+    if job.status != 'done' or not job.output:
+        raise Http404('This report is not ready.')
+    return FileResponse(job.output.open('rb'), as_attachment=True, filename=job.filename, content_type='application/pdf')
+
+
+@login_required
+def prisoner_media(request, name):
+    """
+    Serve a prisoner photo or one of its derivatives to users who may see a
+    prisoner it belongs to. Nothing else under MEDIA_ROOT is served.
+    """
+    storage = Prisoner._meta.get_field('image').storage
+    original = original_name(name)
+    prisoners = Prisoner.objects.filter(image=original)
+    if not request.user.is_superuser:
+        prisoners = prisoners.filter(prison_station_id__in=user_station_ids(request.user))
+    if not original or not prisoners.exists() or not storage.exists(name):
+        raise Http404('No such file.')
+    # Content-addressed names, and derivatives named after them, never change contents
+    return serve_stored_file(request, storage, name, immutable=name_digest(original) is not None)
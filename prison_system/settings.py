@@ -105,6 +105,65 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+#
+# Dashboard and statistics aggregates are cached per prison station and
+# invalidated by a per-station version counter (see prison/cache.py). The
+# in-memory caches suit a single process; set STATISTICS_CACHE_DIR to a
+# directory shared by all workers when running several processes.
+#
+# The version counters live in their own cache so that culling the
+# aggregates and prisoner dossiers, which can far outnumber the default
+# MAX_ENTRIES, never evicts a counter. Every station keeps one counter.
+
+STATISTICS_CACHE_DIR = os.environ.get('STATISTICS_CACHE_DIR')
+STATISTICS_CACHE_TIMEOUT = int(os.environ.get('STATISTICS_CACHE_TIMEOUT', 15 * 60))
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'statistics': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': STATISTICS_CACHE_DIR,
+        'TIMEOUT': STATISTICS_CACHE_TIMEOUT,
+    } if STATISTICS_CACHE_DIR else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'prison-statistics',
+        'TIMEOUT': STATISTICS_CACHE_TIMEOUT,
+    },
+    'station_versions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(STATISTICS_CACHE_DIR, 'versions'),
+        'TIMEOUT': None,
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    } if STATISTICS_CACHE_DIR else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'prison-station-versions',
+        'TIMEOUT': None,
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+}
+
+# Rendered prisoner report PDFs, keyed by a hash of the data they show
+# (see prison/pdf_cache.py). The least recently used files are removed
+# once the directory grows past PDF_CACHE_MAX_BYTES.
+
+PDF_CACHE_DIR = os.environ.get('PDF_CACHE_DIR', BASE_DIR / 'pdf_cache')
+PDF_CACHE_MAX_BYTES = int(os.environ.get('PDF_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+
+# Media files are only served to signed-in users allowed to see them (see
+# prison/media.py). Once access is checked, the transfer is handed to the
+# front server when MEDIA_SENDFILE_HEADER is 'X-Sendfile' (Apache, lighttpd)
+# or 'X-Accel-Redirect' (nginx, with an internal location at
+# MEDIA_ACCEL_REDIRECT_PREFIX aliased to MEDIA_ROOT); left empty, Django
+# streams the file itself.
+
+MEDIA_SENDFILE_HEADER = os.environ.get('MEDIA_SENDFILE_HEADER', '')
+MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get('MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 